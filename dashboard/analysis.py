@@ -0,0 +1,399 @@
+import pandas as pd
+
+from cohorts import aggregate_unique_customers, cohort_retention, repeat_purchase_summary, unique_customer_order_rows, unique_customer_rows
+from cube import DAY_NAMES, filter_cube, slice_cube
+from geo import distance_category
+from ingest import iter_csv_tail
+from ranking import Ranking
+from rfm import aggregate_customer_facts, quantile_bins, rfm_sketches, score_rfm, summarize_segments
+from sketches import HyperLogLog
+from star import dimension_values, filter_facts, id_keys, lookup_by_key, values_by_key
+from timeseries import resample_order_counts
+
+# Fungsi-fungsi analisis dashboard tanpa ketergantungan pada Streamlit, sehingga bisa diimpor
+# dan diukur secara headless (lihat benchmark.py). Setiap fungsi menerima Dataset (lihat
+# datasets.py); parameter aggregates diisi IncrementalAggregates pada mode inkremental, dan
+# parameter engine diisi SqlEngine jika analysis dijalankan dengan mesin SQL (lihat sql_engine.py).
+# Parameter sketch_error (galat relatif) mengaktifkan mode sketch: jumlah nilai unik dan batas
+# kuantil diperkirakan dengan sketch yang dapat digabungkan (lihat sketches.py).
+# Hasil analisis dibagikan tanpa salinan oleh dashboard, sehingga tidak boleh diubah in-place
+
+
+# Tabel yang dibutuhkan oleh setiap halaman
+PAGE_TABLES = {
+    "Beranda": ['customers', 'orders', 'products', 'order_items', 'order_reviews', 'delivered_orders', 'fact_items', 'dim_categories', 'dim_customers', 'order_cube'],
+    "Pola Pembelian": ['order_cube'],
+    "Analisis Kategori Produk": ['fact_items', 'dim_categories', 'dim_customers', 'order_cube'],
+    "Performa Penjual": ['fact_items', 'dim_sellers', 'dim_customers', 'order_reviews', 'delivered_orders', 'order_cube'],
+    "Segmentasi Pelanggan (RFM)": ['fact_items', 'dim_customers', 'order_cube'],
+    "Insight & Kesimpulan": []
+}
+
+# Seluruh tabel yang dimuat oleh halaman dashboard
+ALL_TABLES = sorted({name for tables in PAGE_TABLES.values() for name in tables})
+
+# Tabel yang dimuat setiap halaman pada mode streaming: hanya tabel dimensi, sedangkan orders,
+# order_items, dan order_reviews hanya dibaca per potongan oleh agregat inkremental
+STREAMING_PAGE_TABLES = {
+    "Beranda": ['customers', 'products_with_category'],
+    "Pola Pembelian": [],
+    "Analisis Kategori Produk": ['products_with_category'],
+    "Performa Penjual": ['sellers'],
+    "Segmentasi Pelanggan (RFM)": [],
+    "Insight & Kesimpulan": []
+}
+
+# Kategori waktu pengiriman (hari) untuk analisis rating
+DELIVERY_TIME_BINS = [0, 7, 14, 21, 28, float('inf')]
+DELIVERY_TIME_LABELS = ['1 week', '2 weeks', '3 weeks', '4 weeks', '> 4 weeks']
+
+
+# Fungsi untuk mengelompokkan waktu pengiriman menjadi kategori DELIVERY_TIME_LABELS
+def delivery_time_category(delivery_time_days):
+    return pd.cut(delivery_time_days, bins=DELIVERY_TIME_BINS, labels=DELIVERY_TIME_LABELS)
+
+
+# Fungsi untuk mengambil cube jumlah pesanan: dari agregat inkremental atau mesin SQL jika ada,
+# jika tidak dari dataset
+def order_cube(data, aggregates=None, engine=None):
+    if aggregates is not None:
+        return aggregates.order_cube()
+    if engine is not None:
+        return engine.order_cube()
+    return data['order_cube']
+
+
+# Fungsi untuk mengambil pilihan filter: rentang tanggal pembelian dan daftar negara bagian pelanggan
+def filter_options(data, aggregates=None, engine=None):
+    cube = order_cube(data, aggregates, engine)
+    purchase_dates = cube['purchase_date']
+    return {
+        'min_date': purchase_dates.min().date(),
+        'max_date': purchase_dates.max().date(),
+        'states': list(cube['customer_state'].cat.categories)
+    }
+
+
+# Fungsi untuk memperkirakan jumlah pelanggan unik dengan HyperLogLog. Dengan agregat inkremental,
+# tabel customers dibaca per potongan dan sketch-nya digabungkan, sehingga tabel tersebut tidak
+# perlu dimuat utuh (mode streaming)
+def approximate_unique_customers(data, error, aggregates=None):
+    sketch = HyperLogLog.for_error(error)
+    if aggregates is None:
+        return sketch.update(data['customers']['customer_unique_id']).estimate()
+    for customers, _ in iter_csv_tail('customers', 0, data.data_dir, final=True):
+        sketch.merge(HyperLogLog.for_error(error).update(customers['customer_unique_id']))
+    return sketch.estimate()
+
+
+# Fungsi untuk menghitung metrik utama
+def calculate_metrics(data, aggregates=None, engine=None, sketch_error=None):
+    if aggregates is None and engine is not None:
+        return engine.metrics(approximate=sketch_error is not None)
+    
+    # Jumlah pelanggan unik (eksak, atau perkiraan pada mode sketch)
+    if sketch_error is None:
+        unique_customers = data['customers']['customer_unique_id'].nunique()
+    else:
+        unique_customers = approximate_unique_customers(data, sketch_error, aggregates)
+    
+    # Pada mode inkremental, metrik lainnya diambil dari agregat (rata-rata dari pasangan sum/count)
+    if aggregates is not None:
+        return {
+            'unique_customers': unique_customers,
+            'total_products': len(data['products']),
+            **aggregates.metric_totals()
+        }
+    
+    # Jumlah pesanan
+    total_orders = len(data['orders'])
+    
+    # Jumlah produk
+    total_products = len(data['products'])
+    
+    # Total pendapatan (kolom total_price sudah dihitung saat data dimuat)
+    total_revenue = data['order_items']['total_price'].sum()
+    
+    # Rating rata-rata
+    avg_rating = data['order_reviews']['review_score'].mean()
+    
+    # Waktu pengiriman rata-rata (dalam hari)
+    avg_delivery_time = data['delivered_orders']['delivery_time_days'].mean()
+    
+    return {
+        'unique_customers': unique_customers,
+        'total_orders': total_orders,
+        'total_products': total_products,
+        'total_revenue': total_revenue,
+        'avg_rating': avg_rating,
+        'avg_delivery_time': avg_delivery_time
+    }
+
+
+# Fungsi untuk analisis pola pembelian berdasarkan waktu
+def time_analysis(data, start_date=None, end_date=None, states=None, aggregates=None, engine=None):
+    # Agregat inkremental tidak memiliki dimensi negara bagian, sehingga hanya dipakai tanpa filter
+    if aggregates is not None and start_date is None and end_date is None and not states:
+        results = aggregates.time_results()
+    else:
+        results = cube_time_results(filter_cube(order_cube(data, aggregates, engine), start_date, end_date, states))
+    
+    # Agregat tren harian/mingguan/bulanan dihitung sekali di sini sehingga grafik cukup memilih
+    # salah satunya (lihat timeseries.py)
+    results['order_count_resamples'] = resample_order_counts(results['daily_order_counts'])
+    return results
+
+
+# Fungsi untuk menghitung hasil analisis waktu dari cube jumlah pesanan
+def cube_time_results(cube):
+    # Seluruh analisis waktu diambil dari irisan cube jumlah pesanan (lihat cube.py)
+    # Analisis pola pembelian berdasarkan jam
+    hourly_orders = slice_cube(cube, 'purchase_hour').rename('count')
+    
+    # Analisis pola pembelian berdasarkan hari
+    daily_orders = slice_cube(cube, 'purchase_day_num').reindex(range(7))
+    daily_orders = daily_orders.set_axis(pd.Index(DAY_NAMES, name='purchase_day')).rename('count')
+    
+    # Analisis pola pembelian berdasarkan bulan
+    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+    monthly_orders = cube.groupby(cube['purchase_date'].dt.month_name())['order_count'].sum().reindex(month_order)
+    monthly_orders = monthly_orders.rename_axis('purchase_month').rename('count')
+    
+    # Analisis tren pembelian berdasarkan waktu (time series)
+    daily_order_counts = slice_cube(cube, 'purchase_date').reset_index()
+    
+    return {
+        'hourly_orders': hourly_orders,
+        'daily_orders': daily_orders,
+        'monthly_orders': monthly_orders,
+        'daily_order_counts': daily_order_counts
+    }
+
+
+# Fungsi untuk analisis pola pembelian per jam vs hari dan per lokasi pelanggan
+def purchase_pattern_analysis(data, start_date=None, end_date=None, states=None, aggregates=None, engine=None):
+    cube = filter_cube(order_cube(data, aggregates, engine), start_date, end_date, states)
+    
+    # Jumlah pesanan per jam (baris) dan hari (kolom, 0 = Senin)
+    hour_day_pivot = slice_cube(cube, ['purchase_hour', 'purchase_day_num']).unstack(fill_value=0)
+    hour_day_pivot = hour_day_pivot.reindex(columns=range(7), fill_value=0)
+    
+    # Jumlah pesanan per negara bagian pelanggan
+    state_orders = slice_cube(cube, 'customer_state').sort_values(ascending=False, kind='stable').reset_index()
+    state_orders.columns = ['customer_state', 'order_count']
+    
+    return {
+        'hour_day_pivot': hour_day_pivot,
+        'state_orders': state_orders
+    }
+
+
+# Fungsi untuk analisis kategori produk
+def product_category_analysis(data, start_date=None, end_date=None, states=None, aggregates=None, engine=None):
+    if aggregates is not None and start_date is None and end_date is None and not states:
+        category_stats = aggregates.category_stats(data['products_with_category'])
+    elif engine is not None:
+        category_stats = engine.category_stats(start_date, end_date, states)
+    else:
+        # Item terjual dengan kategori yang dikenal, langsung dari tabel fakta (tanpa join)
+        fact = filter_facts(data['fact_items'], data['dim_customers'], start_date, end_date, states)
+        items_with_category = fact[fact['has_item'] & (fact['category_key'] >= 0)]
+        
+        # Menghitung jumlah penjualan, total pendapatan, dan harga rata-rata per kategori produk
+        category_stats = items_with_category.groupby('category_key').agg(
+            sales_count=('price', 'size'),
+            total_price=('total_price', 'sum'),
+            price=('price', 'mean')
+        ).reset_index()
+        category_stats.insert(0, 'product_category_name_english',
+                              dimension_values(data['dim_categories'], 'product_category_name_english', category_stats.pop('category_key')))
+    
+    # Peringkat kategori menurut jumlah penjualan, total pendapatan, dan harga rata-rata; halaman
+    # hanya menampilkan beberapa teratas sehingga tabel tidak diurutkan penuh (lihat ranking.py)
+    return {
+        'category_stats': category_stats,
+        'category_rankings': {col: Ranking(category_stats, col) for col in ['sales_count', 'total_price', 'price']}
+    }
+
+
+# Fungsi untuk analisis performa penjual
+def seller_performance_analysis(data, start_date=None, end_date=None, states=None, aggregates=None, engine=None):
+    filtered = start_date is not None or end_date is not None or bool(states)
+    
+    if aggregates is not None and not filtered:
+        seller_performance = aggregates.seller_performance(data['sellers'])
+        delivery_time_ratings = aggregates.delivery_time_ratings()
+        
+        # Prefix peringkat penjual diambil dari top-k yang dipelihara secara inkremental
+        seller_ids = pd.Index(seller_performance['seller_id'])
+        ranking_orders = {col: seller_ids.get_indexer(aggregates.top_sellers(col).index)
+                          for col in ['sales_count', 'total_revenue']}
+    elif engine is not None:
+        ranking_orders = {}
+        seller_performance = engine.seller_performance(start_date, end_date, states)
+        delivery_time_ratings = engine.delivery_time_ratings(start_date, end_date, states)
+    else:
+        ranking_orders = {}
+        fact = filter_facts(data['fact_items'], data['dim_customers'], start_date, end_date, states)
+        
+        # Rating berdasarkan waktu pengiriman; dengan filter, hanya dari pesanan pada tabel fakta terfilter
+        delivery_time_ratings = delivery_time_rating_analysis(data, fact if filtered else None)
+        
+        # Item terjual per penjual, langsung dari tabel fakta (rating pesanan sudah tersedia)
+        items_with_seller = fact[fact['has_item'] & (fact['seller_key'] >= 0)]
+        
+        # Menghitung jumlah penjualan, pendapatan, dan rating rata-rata per penjual
+        seller_performance = items_with_seller.groupby('seller_key').agg(
+            sales_count=('price', 'size'),
+            total_revenue=('price', 'sum'),
+            avg_price=('price', 'mean'),
+            review_score=('order_rating', 'mean')
+        ).reset_index()
+        
+        # Menambahkan identitas dan lokasi penjual dari tabel dimensi
+        seller_keys = seller_performance.pop('seller_key')
+        seller_performance.insert(0, 'seller_id', dimension_values(data['dim_sellers'], 'seller_id', seller_keys))
+        seller_performance.insert(4, 'seller_state', dimension_values(data['dim_sellers'], 'seller_state', seller_keys))
+        seller_performance.insert(5, 'seller_city', dimension_values(data['dim_sellers'], 'seller_city', seller_keys))
+    
+    # Analisis performa penjual berdasarkan lokasi
+    state_performance = seller_performance.groupby('seller_state').agg(
+        seller_count=('seller_id', 'nunique'),
+        avg_sales=('sales_count', 'mean'),
+        avg_revenue=('total_revenue', 'mean'),
+        avg_rating=('review_score', 'mean')
+    ).reset_index()
+    
+    # Menambahkan kategori berdasarkan volume penjualan
+    # (setara pd.qcut, tetapi tetap berjalan jika batas kuantil duplikat pada data yang difilter)
+    seller_performance['sales_category'] = pd.Categorical.from_codes(quantile_bins(seller_performance['sales_count'], 4),
+                                                                     categories=['Low', 'Medium-Low', 'Medium-High', 'High'], ordered=True)
+    
+    return {
+        'seller_performance': seller_performance,
+        'state_performance': state_performance,
+        'delivery_time_ratings': delivery_time_ratings,
+        'seller_rankings': {col: Ranking(seller_performance, col, order=ranking_orders.get(col))
+                            for col in ['sales_count', 'total_revenue', 'review_score']}
+    }
+
+
+# Fungsi untuk menghitung rating rata-rata per kategori waktu pengiriman. Jika fact diisi (tabel
+# fakta yang sudah difilter), hanya ulasan dari pesanan pada tabel tersebut yang dihitung
+def delivery_time_rating_analysis(data, fact=None):
+    # Rating setiap ulasan dipasangkan dengan waktu pengiriman pesanannya (lookup berdasarkan
+    # kode order_id, setara dengan inner join delivered_orders dan order_reviews)
+    delivered_orders = data['delivered_orders']
+    delivery_time_days = values_by_key(id_keys(delivered_orders['order_id']), delivered_orders['delivery_time_days'],
+                                       len(delivered_orders['order_id'].cat.categories))
+    review_keys = id_keys(data['order_reviews']['order_id'])
+    delivery_reviews = pd.DataFrame({
+        'delivery_time_days': lookup_by_key(delivery_time_days, review_keys),
+        'review_score': data['order_reviews']['review_score']
+    })
+    
+    # Dengan filter, hanya ulasan dari pesanan yang termasuk dalam tabel fakta terfilter
+    if fact is not None:
+        order_keys = fact.loc[fact['is_order_row'] & (fact['order_key'] >= 0), 'order_key']
+        selected_orders = values_by_key(order_keys, True, len(delivered_orders['order_id'].cat.categories), False)
+        delivery_reviews = delivery_reviews[lookup_by_key(selected_orders, review_keys, False).astype(bool)]
+    
+    # Mengelompokkan waktu pengiriman menjadi beberapa kategori
+    delivery_reviews['delivery_time_category'] = delivery_time_category(delivery_reviews['delivery_time_days'])
+    
+    # Menghitung rating rata-rata per kategori waktu pengiriman
+    return delivery_reviews.groupby('delivery_time_category')['review_score'].agg(['mean', 'count']).reset_index()
+
+
+# Fungsi untuk analisis jarak pengiriman: jumlah item, jarak rata-rata, waktu pengiriman rata-rata,
+# dan rating rata-rata per kategori jarak penjual ke pelanggan (jarak sudah dihitung per item
+# saat tabel fakta dibangun, lihat star.build_fact_items)
+def delivery_distance_analysis(data, start_date=None, end_date=None, states=None, engine=None):
+    if engine is not None:
+        distance_ratings = engine.delivery_distance(start_date, end_date, states)
+    else:
+        fact = filter_facts(data['fact_items'], data['dim_customers'], start_date, end_date, states)
+        items = fact[fact['has_item'] & fact['distance_km'].notna()]
+        
+        # Waktu pengiriman pesanan setiap item (NaN jika pesanan belum dikirim)
+        delivered_orders = data['delivered_orders']
+        delivery_time_days = values_by_key(id_keys(delivered_orders['order_id']), delivered_orders['delivery_time_days'],
+                                           len(delivered_orders['order_id'].cat.categories))
+        items = pd.DataFrame({
+            'distance_category': distance_category(items['distance_km']),
+            'distance_km': items['distance_km'],
+            'delivery_time_days': lookup_by_key(delivery_time_days, items['order_key']),
+            'review_score': items['order_rating']
+        })
+        
+        distance_ratings = items.groupby('distance_category', observed=True).agg(
+            item_count=('distance_km', 'size'),
+            avg_distance_km=('distance_km', 'mean'),
+            avg_delivery_time_days=('delivery_time_days', 'mean'),
+            avg_rating=('review_score', 'mean')
+        ).reset_index()
+    
+    return {
+        'distance_ratings': distance_ratings
+    }
+
+
+# Fungsi untuk analisis RFM
+def rfm_analysis(data, reference_date=None, bins=5, start_date=None, end_date=None, states=None, aggregates=None, engine=None,
+                 sketch_error=None):
+    # Agregat per pelanggan (dari agregat inkremental, mesin SQL, atau dihitung ulang secara tervektorisasi)
+    if aggregates is not None and start_date is None and end_date is None and not states:
+        customers = aggregates.customer_aggregates()
+    elif engine is not None:
+        customers = engine.customer_aggregates(start_date, end_date, states)
+    else:
+        fact = filter_facts(data['fact_items'], data['dim_customers'], start_date, end_date, states)
+        customers = aggregate_customer_facts(fact, data['dim_customers'])
+    
+    # Menghitung skor RFM untuk setiap pelanggan; pada mode sketch batas skor diambil dari sketch kuantil
+    sketches = rfm_sketches(customers, sketch_error) if sketch_error is not None else None
+    rfm = score_rfm(customers, reference_date=reference_date, bins=bins, sketches=sketches)
+    
+    # Menghitung jumlah pelanggan dan karakteristik setiap segmen pelanggan
+    segment_counts, segment_analysis = summarize_segments(rfm)
+    
+    return {
+        'rfm': rfm,
+        'segment_counts': segment_counts,
+        'segment_analysis': segment_analysis
+    }
+
+
+# Fungsi untuk analisis kohort dan pembelian ulang per customer_unique_id (lihat cohorts.py):
+# kohort akuisisi bulanan, matriks retensi, distribusi jumlah pesanan, dan RFM dengan frequency
+# pembelian ulang yang sebenarnya. Dengan filter rentang tanggal, pembelian pertama adalah
+# pembelian pertama di dalam rentang tersebut. Agregat inkremental tidak menyimpan
+# customer_unique_id, sehingga parameter aggregates diabaikan dan hasilnya selalu dihitung dari
+# mesin SQL atau tabel fakta
+def cohort_analysis(data, reference_date=None, bins=5, start_date=None, end_date=None, states=None, aggregates=None, engine=None,
+                    sketch_error=None):
+    if engine is not None:
+        rows = unique_customer_order_rows(engine.unique_customer_orders(start_date, end_date, states))
+    else:
+        fact = filter_facts(data['fact_items'], data['dim_customers'], start_date, end_date, states)
+        rows = unique_customer_rows(fact, data['dim_customers'])
+    customers = aggregate_unique_customers(rows)
+
+    # Skor RFM per pelanggan unik, dengan cara yang sama seperti rfm_analysis
+    sketches = rfm_sketches(customers, sketch_error) if sketch_error is not None else None
+    rfm = score_rfm(customers, reference_date=reference_date, bins=bins, sketches=sketches, id_column='customer_unique_id')
+    segment_counts, segment_analysis = summarize_segments(rfm, id_column='customer_unique_id')
+
+    cohort_sizes, active_customers, retention = cohort_retention(rows)
+    order_frequency, repeat_summary = repeat_purchase_summary(rows, customers)
+
+    return {
+        'rfm': rfm,
+        'segment_counts': segment_counts,
+        'segment_analysis': segment_analysis,
+        'cohort_sizes': cohort_sizes,
+        'active_customers': active_customers,
+        'retention': retention,
+        'order_frequency': order_frequency,
+        'repeat_summary': repeat_summary
+    }
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from analysis import ALL_TABLES
+from datasets import Dataset
+from ingest import CACHE_DIR_NAME, DATA_DIR
+from sql_engine import ENGINES, SqlEngine
+from synthetic import BASE_SIZES, generate_dataset
+
+# Modul resource hanya tersedia di Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Skala dataset sintetis default (1 = ukuran dataset Olist asli)
+DEFAULT_SCALES = [1, 10, 100]
+
+# Fungsi analisis yang diukur (lihat analysis.py)
+BENCHMARK_FUNCTIONS = ['calculate_metrics', 'time_analysis', 'product_category_analysis',
+                       'seller_performance_analysis', 'delivery_distance_analysis', 'rfm_analysis', 'cohort_analysis']
+
+
+# Fungsi untuk menyiapkan dataset sintetis satu skala; dataset yang sudah lengkap dipakai ulang
+def prepare_dataset(work_dir, scale, seed=0):
+    data_dir = os.path.join(work_dir, f'scale-{scale:g}')
+    marker = os.path.join(data_dir, 'synthetic.json')
+    params = {'scale': scale, 'seed': seed}
+
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == params:
+                return data_dir
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    generate_dataset(data_dir, scale, seed)
+    with open(marker, 'w') as f:
+        json.dump(params, f)
+    return data_dir
+
+
+# Fungsi untuk memuat seluruh tabel halaman dashboard; cold=True menghapus cache kolumnar
+# terlebih dahulu sehingga seluruh CSV di-parse ulang
+def load_data(data_dir, cold=False):
+    if cold:
+        shutil.rmtree(os.path.join(data_dir, CACHE_DIR_NAME), ignore_errors=True)
+    dataset = Dataset(data_dir)
+    dataset.tables(ALL_TABLES)
+    return dataset
+
+
+# Fungsi untuk mengukur waktu (min dan median dari beberapa pengulangan) dan puncak memori
+# (alokasi Python/NumPy yang tercatat tracemalloc, diukur pada satu eksekusi terpisah agar
+# overhead tracemalloc tidak memengaruhi waktu)
+def measure(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_time_min_s': min(times),
+        'wall_time_median_s': statistics.median(times),
+        'peak_memory_mb': peak / 2**20
+    }
+
+
+# Fungsi untuk menjalankan benchmark pada satu skala. Dengan engine='duckdb', fungsi analisis
+# dijalankan oleh mesin SQL langsung atas cache kolumnar (lihat sql_engine.py)
+def run_scale(work_dir, scale, repeat=3, seed=0, engine='pandas'):
+    data_dir = prepare_dataset(work_dir, scale, seed)
+    n_orders = max(int(BASE_SIZES['orders'] * scale), 1)
+    results = []
+
+    def record(name, func):
+        result = {'scale': scale, 'orders': n_orders, 'engine': engine, 'function': name, **measure(func, repeat)}
+        results.append(result)
+        print(f"{scale:>6g}x  {engine:<7} {name:<30} {result['wall_time_median_s']:>9.3f} s  {result['peak_memory_mb']:>9.1f} MB")
+
+    if engine == 'duckdb':
+        # Mesin SQL tidak memuat tabel ke pandas; yang diukur adalah pembukaan cache kolumnar
+        record('load_data', lambda: SqlEngine(data_dir))
+        dataset, sql_engine = Dataset(data_dir), SqlEngine(data_dir)
+    else:
+        record('load_data_cold', lambda: load_data(data_dir, cold=True))
+        record('load_data', lambda: load_data(data_dir))
+        dataset, sql_engine = load_data(data_dir), None
+
+    # Fungsi analisis diukur pada tabel yang sudah dimuat (tanpa cache hasil Streamlit)
+    for name in BENCHMARK_FUNCTIONS:
+        record(name, lambda func=getattr(analysis, name): func(dataset, engine=sql_engine))
+
+    return results
+
+
+# Fungsi untuk membandingkan hasil dengan baseline; mengembalikan daftar fungsi yang waktunya
+# (median) naik lebih dari tolerance dibanding baseline pada skala yang sama
+def find_regressions(results, baseline, tolerance=0.25):
+    baseline_times = {(r['scale'], r.get('engine', 'pandas'), r['function']): r['wall_time_median_s']
+                      for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = baseline_times.get((result['scale'], result['engine'], result['function']))
+        if before is not None and result['wall_time_median_s'] > before * (1 + tolerance):
+            regressions.append({**result, 'baseline_wall_time_median_s': before,
+                                'ratio': result['wall_time_median_s'] / before})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark headless fungsi-fungsi analisis dashboard")
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=ENGINES, default='pandas')
+    parser.add_argument('--work-dir', default=os.path.join(DATA_DIR, CACHE_DIR_NAME, 'benchmark'),
+                        help="Direktori dataset sintetis (dibuat sekali per skala lalu dipakai ulang)")
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=None, help="File hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(args.work_dir, scale, args.repeat, args.seed, args.engine))
+
+    report = {
+        'meta': {
+            'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+        },
+        'results': results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = find_regressions(results, json.load(f), args.tolerance)
+        for regression in report['regressions']:
+            print(f"REGRESI {regression['scale']:g}x {regression['engine']} {regression['function']}: "
+                  f"{regression['baseline_wall_time_median_s']:.3f} s -> {regression['wall_time_median_s']:.3f} s "
+                  f"({regression['ratio']:.2f}x)")
+        exit_code = 1 if report['regressions'] else 0
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil ditulis ke {args.output}")
+
+    raise SystemExit(exit_code)
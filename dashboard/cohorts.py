@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from star import id_keys, lookup_by_key
+
+# Analisis tingkat pelanggan yang dikunci dengan customer_unique_id: kohort akuisisi bulanan,
+# matriks retensi, dan agregat pembelian ulang untuk RFM. Pada dataset ini customer_id unik per
+# pesanan, sehingga pengelompokan per customer_id hampir selalu menghasilkan satu pesanan per
+# pelanggan. Seluruh pengelompokan memakai satu radix sort stabil lalu run-length (batas grup dari
+# perubahan kunci pada array terurut), sehingga waktunya linear terhadap jumlah baris
+
+# Jumlah bit setiap digit radix sort; np.argsort stabil pada uint16 berupa radix sort (linear)
+RADIX_BITS = 16
+
+
+# Fungsi untuk mengurutkan kunci integer non-negatif secara stabil dalam waktu linear: radix sort
+# LSD per digit 16-bit, mulai dari digit terendah
+def radix_order(keys):
+    keys = np.asarray(keys, dtype='uint64')
+    order = np.arange(len(keys))
+    max_key = int(keys.max()) if len(keys) else 0
+    shift = 0
+    while True:
+        digits = ((keys[order] >> np.uint64(shift)) & np.uint64((1 << RADIX_BITS) - 1)).astype('uint16')
+        order = order[np.argsort(digits, kind='stable')]
+        shift += RADIX_BITS
+        if max_key >> shift == 0:
+            return order
+
+
+# Fungsi untuk mencari posisi awal setiap run (baris berurutan dengan nilai yang sama pada seluruh
+# array) pada array yang sudah terurut
+def run_starts(*arrays):
+    changed = np.zeros(len(arrays[0]), dtype=bool)
+    changed[:1] = True
+    for values in arrays:
+        changed[1:] |= values[1:] != values[:-1]
+    return np.flatnonzero(changed)
+
+
+# Fungsi untuk mengubah posisi awal run menjadi nomor run setiap baris
+def run_index(starts, n):
+    return np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+
+# Fungsi untuk menghitung nomor bulan (jumlah bulan sejak epoch) dari timestamp
+def month_number(timestamps):
+    return np.asarray(timestamps).astype('datetime64[M]').astype('int64')
+
+
+# Fungsi untuk mengambil baris tabel fakta (lihat star.py) milik pelanggan yang diketahui
+# customer_unique_id-nya, diurutkan menurut kunci customer_unique_id. Tabel fakta sudah terurut
+# menurut waktu pembelian dan radix sort bersifat stabil, sehingga baris setiap pelanggan tetap
+# berurutan menurut waktu. unique_ids adalah lookup kunci ke customer_unique_id
+def unique_customer_rows(fact_items, dim_customers):
+    unique_keys = lookup_by_key(id_keys(dim_customers['customer_unique_id']), fact_items['customer_key'].to_numpy(), -1)
+    rows = np.flatnonzero(unique_keys >= 0)
+    order = rows[radix_order(unique_keys[rows])]
+    return {
+        'unique_ids': dim_customers['customer_unique_id'].cat.categories.to_numpy(),
+        'unique_key': unique_keys[order],
+        'timestamp': fact_items['order_purchase_timestamp'].to_numpy()[order],
+        'total_price': np.nan_to_num(fact_items['total_price'].to_numpy()[order]),
+        'is_order_row': fact_items['is_order_row'].to_numpy()[order]
+    }
+
+
+# Fungsi untuk menyusun baris yang sama dengan unique_customer_rows dari pesanan yang sudah
+# terurut menurut customer_unique_id lalu waktu pembelian (lihat SqlEngine.unique_customer_orders);
+# setiap baris adalah satu pesanan dan kuncinya adalah nomor run customer_unique_id
+def unique_customer_order_rows(orders):
+    unique_ids = orders['customer_unique_id'].to_numpy()
+    starts = run_starts(unique_ids)
+    return {
+        'unique_ids': unique_ids[starts],
+        'unique_key': run_index(starts, len(unique_ids)),
+        'timestamp': orders['order_purchase_timestamp'].to_numpy(),
+        'total_price': orders['total_price'].to_numpy(),
+        'is_order_row': np.ones(len(orders), dtype=bool)
+    }
+
+
+# Fungsi untuk menghitung agregat per customer_unique_id: waktu pembelian pertama dan terakhir,
+# jumlah pesanan, dan total nilai pesanan (setara rfm.aggregate_customer_facts)
+def aggregate_unique_customers(rows):
+    starts = run_starts(rows['unique_key'])
+    if len(starts) == 0:
+        return pd.DataFrame({'customer_unique_id': pd.Series(dtype='str'),
+                             'first_purchase': pd.Series(dtype=rows['timestamp'].dtype),
+                             'last_purchase': pd.Series(dtype=rows['timestamp'].dtype),
+                             'frequency': pd.Series(dtype='int64'), 'monetary': pd.Series(dtype='float64')})
+
+    ends = np.append(starts[1:], len(rows['unique_key']))
+    return pd.DataFrame({
+        'customer_unique_id': rows['unique_ids'][rows['unique_key'][starts]],
+        'first_purchase': rows['timestamp'][starts],
+        'last_purchase': rows['timestamp'][ends - 1],
+        'frequency': np.add.reduceat(rows['is_order_row'].astype('int64'), starts),
+        'monetary': np.add.reduceat(rows['total_price'], starts)
+    })
+
+
+# Fungsi untuk menghitung kohort akuisisi bulanan (bulan pembelian pertama setiap pelanggan) dan
+# jumlah pelanggan kohort yang berbelanja pada bulan ke-0, 1, 2, ... setelah akuisisi. Retensi
+# adalah jumlah tersebut dibagi ukuran kohort; sel yang bulannya melewati data terakhir bernilai NaN
+def cohort_retention(rows):
+    if len(rows['unique_key']) == 0:
+        index = pd.DatetimeIndex([], dtype=rows['timestamp'].dtype, name='cohort_month')
+        periods = pd.Index([], dtype='int64', name='months_since_first_purchase')
+        cohort_sizes = pd.DataFrame({'cohort_month': index, 'customers': pd.Series(dtype='int64')})
+        return cohort_sizes, pd.DataFrame(index=index, columns=periods, dtype='int64'), pd.DataFrame(index=index, columns=periods, dtype='float64')
+
+    months = month_number(rows['timestamp'])
+    starts = run_starts(rows['unique_key'])
+    first_month, last_month = months[starts].min(), months.max()
+    n_months = last_month - first_month + 1
+    customer_cohorts = months[starts] - first_month
+
+    # Pasangan (pelanggan, bulan ke-) yang unik dari baris pesanan: baris setiap pelanggan sudah
+    # berurutan menurut waktu, sehingga cukup mencari perubahan pelanggan atau bulan
+    order_rows = rows['is_order_row']
+    customers = run_index(starts, len(months))[order_rows]
+    offsets = months[order_rows] - first_month - customer_cohorts[customers]
+    active = run_starts(customers, offsets)
+    cells = customer_cohorts[customers[active]] * n_months + offsets[active]
+    active_counts = np.bincount(cells, minlength=n_months * n_months).reshape(n_months, n_months)
+    sizes = np.bincount(customer_cohorts, minlength=n_months)
+
+    # Hanya bulan yang memiliki pelanggan baru yang menjadi kohort
+    cohorts = np.flatnonzero(sizes)
+    observed = (cohorts[:, None] + np.arange(n_months)) < n_months
+    index = pd.DatetimeIndex((first_month + cohorts).astype('datetime64[M]').astype(rows['timestamp'].dtype), name='cohort_month')
+    periods = pd.Index(np.arange(n_months), name='months_since_first_purchase')
+
+    cohort_sizes = pd.DataFrame({'cohort_month': index, 'customers': sizes[cohorts]})
+    active_customers = pd.DataFrame(active_counts[cohorts], index=index, columns=periods)
+    retention = pd.DataFrame(np.where(observed, active_counts[cohorts] / sizes[cohorts, None], np.nan),
+                             index=index, columns=periods)
+    return cohort_sizes, active_customers, retention
+
+
+# Fungsi untuk meringkas pembelian ulang: distribusi jumlah pesanan per pelanggan, proporsi
+# pelanggan yang berbelanja lebih dari sekali, dan median jarak pesanan pertama ke pesanan kedua
+def repeat_purchase_summary(rows, customers):
+    frequency_counts = np.bincount(customers['frequency'], minlength=2)
+    frequencies = np.flatnonzero(frequency_counts[1:]) + 1
+    order_frequency = pd.DataFrame({'frequency': frequencies, 'customer_count': frequency_counts[frequencies]})
+
+    # Pesanan kedua adalah baris pesanan berikutnya milik pelanggan yang sama
+    order_rows = rows['is_order_row']
+    keys, timestamps = rows['unique_key'][order_rows], rows['timestamp'][order_rows]
+    firsts = run_starts(keys)
+    firsts = firsts[(firsts + 1 < len(keys)) & (keys[np.minimum(firsts + 1, len(keys) - 1)] == keys[firsts])]
+    days_to_second = (timestamps[firsts + 1] - timestamps[firsts]) / np.timedelta64(1, 'D')
+
+    n_customers = len(customers)
+    repeat_customers = int((customers['frequency'] > 1).sum())
+    return order_frequency, {
+        'customers': n_customers,
+        'repeat_customers': repeat_customers,
+        'repeat_rate': repeat_customers / n_customers if n_customers else 0.0,
+        'avg_orders': float(customers['frequency'].mean()) if n_customers else 0.0,
+        'median_days_to_second_purchase': float(np.median(days_to_second)) if len(days_to_second) else None
+    }
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from star import id_keys, lookup_by_key, time_range
+
+# Dimensi cube jumlah pesanan; seluruh grafik pada halaman Pola Pembelian diambil dari
+# irisan cube ini sehingga ukurannya dibatasi jumlah tanggal x 24 jam x negara bagian x status,
+# bukan jumlah pesanan
+CUBE_DIMENSIONS = ['purchase_date', 'purchase_hour', 'purchase_day_num', 'customer_state', 'order_status']
+
+# Nama hari untuk purchase_day_num (0 = Senin)
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+# Fungsi untuk membuat cube jumlah pesanan per kombinasi dimensi. Lokasi pelanggan diambil dari
+# dimensi pelanggan berdasarkan kode customer_id (tanpa join)
+def build_order_cube(dataset):
+    orders = dataset['orders']
+    dim_customers = dataset['dim_customers']
+
+    state_codes = lookup_by_key(dim_customers['customer_state'].cat.codes.to_numpy(), id_keys(orders['customer_id']), -1)
+    cube = pd.DataFrame({
+        'purchase_date': orders['order_purchase_timestamp'].dt.normalize(),
+        'purchase_hour': orders['purchase_hour'],
+        'purchase_day_num': orders['purchase_day_num'],
+        'customer_state': pd.Categorical.from_codes(state_codes.astype('int32'), dtype=dim_customers['customer_state'].dtype),
+        'order_status': orders['order_status']
+    })
+
+    # Kombinasi dengan nilai kosong tetap disimpan agar total setiap irisan tetap sama dengan jumlah pesanan.
+    # Hasil group-by terurut menurut purchase_date sehingga filter tanggal cukup berupa binary search
+    cube = cube.groupby(CUBE_DIMENSIONS, observed=True, dropna=False).size().reset_index(name='order_count')
+    cube['order_count'] = cube['order_count'].astype(np.int64)
+    return cube
+
+
+# Fungsi untuk mengambil irisan cube: jumlah pesanan per dimensi `by` (nilai kosong diabaikan)
+def slice_cube(cube, by):
+    return cube.groupby(by, observed=True)['order_count'].sum()
+
+
+# Fungsi untuk memfilter cube menurut rentang tanggal pembelian dan negara bagian pelanggan
+def filter_cube(cube, start_date=None, end_date=None, states=None):
+    if start_date is not None or end_date is not None:
+        start, end = time_range(cube['purchase_date'], start_date, end_date)
+        cube = cube.iloc[start:end]
+
+    if states:
+        cube = cube[cube['customer_state'].isin(states)]
+
+    return cube
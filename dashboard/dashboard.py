@@ -5,10 +5,26 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import datetime as dt
+import functools
+import inspect
+import os
+import time
 from datetime import datetime
 
+import analysis
+import figures
+from analysis import PAGE_TABLES, STREAMING_PAGE_TABLES
+from datasets import Dataset, StreamingDataset
+from export import PrecomputedResults
+from incremental import IncrementalAggregates
+from ingest import dataset_fingerprint
+from instrumentation import MetricsRegistry, cache_miss, instrumented, stage, start_rerun
+from shared_store import SharedDataset, read_manifest
+from sql_engine import ENGINES, SqlEngine, duckdb
+from timeseries import RESAMPLE_RULES, chart_series
+from warmup import WARMUP_WORKERS, Warmup
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="E-Commerce Dashboard",
@@ -17,236 +33,372 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Fungsi untuk memuat data
-@st.cache_data
-def load_data():
-    # Membaca file CSV dari dataset e-commerce
-    customers_df = pd.read_csv('data/customers_dataset.csv')
-    geolocation_df = pd.read_csv('data/geolocation_dataset.csv')
-    order_items_df = pd.read_csv('data/order_items_dataset.csv')
-    order_payments_df = pd.read_csv('data/order_payments_dataset.csv')
-    order_reviews_df = pd.read_csv('data/order_reviews_dataset.csv')
-    orders_df = pd.read_csv('data/orders_dataset.csv')
-    products_df = pd.read_csv('data/products_dataset.csv')
-    sellers_df = pd.read_csv('data/sellers_dataset.csv')
-    category_name_translation_df = pd.read_csv('data/product_category_name_translation.csv')
-    
-    # Mengkonversi kolom timestamp pada dataset orders menjadi format datetime
-    timestamp_columns = ['order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date', 
-                        'order_delivered_customer_date', 'order_estimated_delivery_date']
-
-    for col in timestamp_columns:
-        orders_df[col] = pd.to_datetime(orders_df[col])
-    
-    # Mengkonversi kolom timestamp pada dataset order_reviews menjadi format datetime
-    review_timestamp_columns = ['review_creation_date', 'review_answer_timestamp']
-
-    for col in review_timestamp_columns:
-        order_reviews_df[col] = pd.to_datetime(order_reviews_df[col])
-    
-    # Menangani nilai yang hilang pada dataset products
-    products_df['product_category_name'] = products_df['product_category_name'].fillna('unknown')
-    
-    # Menggabungkan dataset products dengan category_name_translation
-    products_with_category_df = products_df.merge(category_name_translation_df, on='product_category_name', how='left')
-    products_with_category_df['product_category_name_english'] = products_with_category_df['product_category_name_english'].fillna(products_with_category_df['product_category_name'])
-    
-    # Menghitung waktu pengiriman untuk pesanan yang telah dikirim
-    delivered_orders_df = orders_df[orders_df['order_status'] == 'delivered'].copy()
-    delivered_orders_df['delivery_time_days'] = (delivered_orders_df['order_delivered_customer_date'] - 
-                                                delivered_orders_df['order_purchase_timestamp']).dt.days
-    delivered_orders_df['delivery_vs_estimate_days'] = (delivered_orders_df['order_delivered_customer_date'] - 
-                                                      delivered_orders_df['order_estimated_delivery_date']).dt.days
-    
-    # Ekstrak informasi waktu dari order_purchase_timestamp
-    orders_df['purchase_hour'] = orders_df['order_purchase_timestamp'].dt.hour
-    orders_df['purchase_day'] = orders_df['order_purchase_timestamp'].dt.day_name()
-    orders_df['purchase_month'] = orders_df['order_purchase_timestamp'].dt.month_name()
-    orders_df['purchase_year'] = orders_df['order_purchase_timestamp'].dt.year
-    orders_df['purchase_date'] = orders_df['order_purchase_timestamp'].dt.date
-    
+# Instrumentasi rerun ini: waktu setiap tahap selalu dicatat, memori hanya saat panel debug aktif
+recorder = start_rerun(trace_memory=st.session_state.get('debug_panel', False))
+
+# Agregat instrumentasi kumulatif untuk seluruh sesi di proses ini
+@st.cache_resource
+def get_metrics_registry():
+    return MetricsRegistry()
+
+# File teks Prometheus yang diperbarui setiap rerun (untuk textfile collector), jika diisi
+METRICS_FILE = os.environ.get('DASHBOARD_METRICS_FILE')
+
+# Direktori penyimpanan bersama; jika diisi, tabel dibaca dari dataset yang dipublikasikan oleh
+# satu proses loader (lihat shared_store.py) alih-alih dimuat sendiri oleh setiap proses
+SHARED_DIR = os.environ.get('DASHBOARD_SHARED_DIR')
+
+# Registry dataset bersama untuk seluruh sesi; tabel dimuat secara lazy.
+# Registry baru dibuat setiap kali fingerprint file sumber (atau versi yang dipublikasikan) berubah
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_dataset(version):
+    if SHARED_DIR:
+        return SharedDataset(SHARED_DIR, read_manifest(SHARED_DIR))
+    if STREAMING_MODE:
+        return StreamingDataset(version=version)
+    return Dataset(version=version)
+
+# Fungsi untuk membaca versi sumber data (None jika belum ada dataset yang dipublikasikan)
+def source_version():
+    if SHARED_DIR:
+        manifest = read_manifest(SHARED_DIR)
+        return manifest['version'] if manifest is not None else None
+    return dataset_fingerprint()
+
+# Fungsi untuk menentukan versi dataset saat ini
+def current_version():
+    version = source_version()
+    if version is None:
+        st.error(f"Belum ada dataset yang dipublikasikan di {SHARED_DIR}. Jalankan `python dashboard/shared_store.py` terlebih dahulu.")
+        st.stop()
+    return version
+
+# Fungsi untuk memuat data: hanya tabel yang dibutuhkan oleh halaman yang dibuka
+@instrumented('load')
+def load_data(tables):
+    dataset = serving_dataset()
+    if any(name not in dataset for name in tables):
+        cache_miss()
+    dataset.tables(tables)
+    return dataset
+
+# Cache hasil analisis dikunci dengan versi dataset, bukan dengan hash seluruh isi DataFrame.
+# Hasil analisis disimpan dengan cache_resource sehingga dibagikan tanpa salinan (zero-copy);
+# halaman hanya membaca hasil tersebut dan tidak boleh mengubahnya secara in-place
+HASH_FUNCS = {Dataset: lambda dataset: dataset.version, SharedDataset: lambda dataset: dataset.version,
+              StreamingDataset: lambda dataset: dataset.version}
+
+# Mode streaming: orders, order_items, dan order_reviews tidak pernah dimuat utuh, hanya dibaca per
+# potongan ke agregat inkremental; halaman hanya memuat tabel dimensi. Memori pembacaan tidak
+# bergantung pada ukuran file, tetapi agregat per pesanan (lihat incremental.FRAME_SCHEMAS) tetap
+# bertambah sebanding jumlah pesanan
+STREAMING_MODE = os.environ.get('DASHBOARD_STREAMING') == '1'
+
+# Mesin eksekusi fungsi analisis: 'pandas' (mesin referensi) atau 'duckdb' (query SQL langsung atas
+# cache kolumnar, lihat sql_engine.py). Mesin SQL membaca file sumber utuh, sehingga tidak dipakai
+# pada mode streaming maupun dataset bersama
+ENGINE = os.environ.get('DASHBOARD_ENGINE', 'pandas')
+if ENGINE not in ENGINES:
+    st.error(f"DASHBOARD_ENGINE harus salah satu dari {', '.join(ENGINES)}, bukan '{ENGINE}'.")
+    st.stop()
+if ENGINE == 'duckdb' and duckdb is None:
+    st.error("DASHBOARD_ENGINE=duckdb membutuhkan paket duckdb. Jalankan `pip install duckdb` terlebih dahulu.")
+    st.stop()
+SQL_ENGINE = ENGINE == 'duckdb' and not STREAMING_MODE and not SHARED_DIR
+
+# Mode sketch: galat relatif untuk perkiraan jumlah pelanggan unik (HyperLogLog) dan batas skor RFM
+# (sketch kuantil KLL), lihat sketches.py. Kosong berarti seluruh metrik dihitung secara eksak
+SKETCH_ERROR = os.environ.get('DASHBOARD_SKETCH_ERROR')
+if SKETCH_ERROR is not None:
+    try:
+        SKETCH_ERROR = float(SKETCH_ERROR)
+    except ValueError:
+        SKETCH_ERROR = 0.0
+    if not 0 < SKETCH_ERROR < 1:
+        st.error(f"DASHBOARD_SKETCH_ERROR harus berupa galat relatif antara 0 dan 1 (misalnya 0.01), bukan '{os.environ['DASHBOARD_SKETCH_ERROR']}'.")
+        st.stop()
+
+# Direktori hasil ekspor (lihat export.py); jika diisi, hasil analisis tanpa filter dibaca dari
+# file hasil ekspor selama versinya sama dengan versi dataset saat ini
+PRECOMPUTED_DIR = os.environ.get('DASHBOARD_PRECOMPUTED_DIR')
+
+# Tabel yang dimuat setiap halaman; dengan mesin SQL tidak ada tabel yang perlu dimuat ke pandas,
+# dan dengan hasil ekspor tabel baru dimuat saat filter membutuhkannya.
+# Pada mode streaming dengan sketch, tabel customers hanya dibaca per potongan
+if STREAMING_MODE and SKETCH_ERROR is not None:
+    PAGE_DATA_TABLES = {page: [name for name in tables if name != 'customers'] for page, tables in STREAMING_PAGE_TABLES.items()}
+elif STREAMING_MODE:
+    PAGE_DATA_TABLES = STREAMING_PAGE_TABLES
+elif SQL_ENGINE or PRECOMPUTED_DIR:
+    PAGE_DATA_TABLES = {page: [] for page in PAGE_TABLES}
+else:
+    PAGE_DATA_TABLES = PAGE_TABLES
+
+# Mode inkremental: orders, order_items, dan order_reviews hanya dibaca baris barunya dan
+# digabungkan ke agregat parsial yang tersimpan (lihat incremental.py)
+INCREMENTAL_MODE = os.environ.get('DASHBOARD_INCREMENTAL') == '1' or STREAMING_MODE
+
+# Agregat inkremental bersama untuk seluruh sesi
+@st.cache_resource
+def get_aggregate_store(data_dir):
+    return IncrementalAggregates.load(data_dir)
+
+# Fungsi untuk memperbarui agregat inkremental sampai versi dataset saat ini
+def get_aggregates(data):
+    aggregates = get_aggregate_store(data.data_dir)
+    aggregates.refresh(data.version)
+    return aggregates
+
+# Mesin SQL untuk satu versi dataset, dibagikan ke seluruh sesi
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=2, show_spinner=False)
+def get_engine(data):
+    return SqlEngine(data.data_dir)
+
+# Fungsi untuk menentukan sumber hasil analisis selain dataset: agregat inkremental dan mesin SQL
+def analysis_sources(data):
     return {
-        'customers': customers_df,
-        'geolocation': geolocation_df,
-        'order_items': order_items_df,
-        'order_payments': order_payments_df,
-        'order_reviews': order_reviews_df,
-        'orders': orders_df,
-        'products': products_df,
-        'products_with_category': products_with_category_df,
-        'sellers': sellers_df,
-        'delivered_orders': delivered_orders_df
+        'aggregates': get_aggregates(data) if INCREMENTAL_MODE else None,
+        'engine': get_engine(data) if SQL_ENGINE else None
     }
 
-# Fungsi untuk menghitung metrik utama
-@st.cache_data
+# Hasil ekspor untuk satu versi dataset, dibagikan ke seluruh sesi
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_precomputed(version):
+    return PrecomputedResults(PRECOMPUTED_DIR, version)
+
+# Fungsi untuk membaca hasil ekspor yang sesuai dengan versi dataset (None jika tidak ada, usang,
+# atau bukan berformat parquet)
+def precomputed_results(data):
+    if not PRECOMPUTED_DIR:
+        return None
+    manifest = read_manifest(PRECOMPUTED_DIR)
+    if manifest is None or manifest['version'] != data.version or manifest['format'] != 'parquet':
+        return None
+    return get_precomputed(manifest['version'])
+
+# Dekorator fungsi analisis: jika seluruh argumen selain data bernilai default (tanpa filter) dan
+# hasil ekspor versi ini tersedia, hasilnya dibaca dari file alih-alih dihitung ulang
+def precomputed(func):
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(data, *args, **kwargs):
+        results = precomputed_results(data)
+        if results is not None and func.__name__ in results:
+            arguments = signature.bind(data, *args, **kwargs).arguments
+            if all(arguments[name] == param.default for name, param in signature.parameters.items()
+                   if name in arguments and name != 'data'):
+                cache_miss()
+                return results.result(func.__name__)
+        return func(data, *args, **kwargs)
+    return wrapper
+
+# Fungsi analisis (lihat analysis.py) yang di-cache untuk seluruh sesi. Tanpa spinner karena
+# fungsi-fungsi ini juga dijalankan oleh warm-up di thread latar belakang yang tidak punya sesi.
+# Filter menjadi bagian kunci cache, sehingga setiap fungsi menyimpan paling banyak
+# DASHBOARD_ANALYSIS_CACHE_ENTRIES hasil (yang paling lama tidak dipakai dibuang lebih dulu)
+ANALYSIS_CACHE_ENTRIES = int(os.environ.get('DASHBOARD_ANALYSIS_CACHE_ENTRIES', 16))
+
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def filter_options(data):
+    cache_miss()
+    return analysis.filter_options(data, **analysis_sources(data))
+
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
 def calculate_metrics(data):
-    # Jumlah pelanggan unik
-    unique_customers = data['customers']['customer_unique_id'].nunique()
-    
-    # Jumlah pesanan
-    total_orders = len(data['orders'])
-    
-    # Jumlah produk
-    total_products = len(data['products'])
-    
-    # Total pendapatan
-    data['order_items']['total_price'] = data['order_items']['price'] + data['order_items']['freight_value']
-    total_revenue = data['order_items']['total_price'].sum()
-    
-    # Rating rata-rata
-    avg_rating = data['order_reviews']['review_score'].mean()
-    
-    # Waktu pengiriman rata-rata (dalam hari)
-    avg_delivery_time = data['delivered_orders']['delivery_time_days'].mean()
-    
-    return {
-        'unique_customers': unique_customers,
-        'total_orders': total_orders,
-        'total_products': total_products,
-        'total_revenue': total_revenue,
-        'avg_rating': avg_rating,
-        'avg_delivery_time': avg_delivery_time
-    }
+    cache_miss()
+    return analysis.calculate_metrics(data, **analysis_sources(data), sketch_error=SKETCH_ERROR)
 
-# Fungsi untuk analisis pola pembelian berdasarkan waktu
-@st.cache_data
-def time_analysis(data):
-    # Analisis pola pembelian berdasarkan jam
-    hourly_orders = data['orders']['purchase_hour'].value_counts().sort_index()
-    
-    # Analisis pola pembelian berdasarkan hari
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    daily_orders = data['orders']['purchase_day'].value_counts().reindex(day_order)
-    
-    # Analisis pola pembelian berdasarkan bulan
-    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-    monthly_orders = data['orders']['purchase_month'].value_counts().reindex(month_order)
-    
-    # Analisis tren pembelian berdasarkan waktu (time series)
-    daily_order_counts = data['orders'].groupby('purchase_date').size().reset_index(name='order_count')
-    daily_order_counts['purchase_date'] = pd.to_datetime(daily_order_counts['purchase_date'])
-    
-    return {
-        'hourly_orders': hourly_orders,
-        'daily_orders': daily_orders,
-        'monthly_orders': monthly_orders,
-        'daily_order_counts': daily_order_counts
-    }
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def time_analysis(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.time_analysis(data, start_date, end_date, states, **analysis_sources(data))
 
-# Fungsi untuk analisis kategori produk
-@st.cache_data
-def product_category_analysis(data):
-    # Menggabungkan dataset order_items dengan products_with_category
-    order_items_with_category = data['order_items'].merge(data['products_with_category'], on='product_id', how='left')
-    
-    # Menghitung jumlah produk yang terjual per kategori
-    category_sales_count = order_items_with_category.groupby('product_category_name_english').size().reset_index(name='sales_count')
-    category_sales_count = category_sales_count.sort_values('sales_count', ascending=False)
-    
-    # Menghitung total pendapatan per kategori produk
-    order_items_with_category['total_price'] = order_items_with_category['price'] + order_items_with_category['freight_value']
-    category_revenue = order_items_with_category.groupby('product_category_name_english')['total_price'].sum().reset_index()
-    category_revenue = category_revenue.sort_values('total_price', ascending=False)
-    
-    # Menghitung harga rata-rata per kategori produk
-    category_avg_price = order_items_with_category.groupby('product_category_name_english')['price'].mean().reset_index()
-    category_avg_price = category_avg_price.sort_values('price', ascending=False)
-    
-    return {
-        'order_items_with_category': order_items_with_category,
-        'category_sales_count': category_sales_count,
-        'category_revenue': category_revenue,
-        'category_avg_price': category_avg_price
-    }
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def purchase_pattern_analysis(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.purchase_pattern_analysis(data, start_date, end_date, states, **analysis_sources(data))
 
-# Fungsi untuk analisis performa penjual
-@st.cache_data
-def seller_performance_analysis(data):
-    # Menggabungkan dataset order_items dengan sellers
-    order_items_with_seller = data['order_items'].merge(data['sellers'], on='seller_id', how='left')
-    
-    # Menghitung jumlah penjualan dan pendapatan per penjual
-    seller_performance = order_items_with_seller.groupby('seller_id').agg(
-        sales_count=('order_id', 'count'),
-        total_revenue=('price', 'sum'),
-        avg_price=('price', 'mean'),
-        seller_state=('seller_state', 'first'),
-        seller_city=('seller_city', 'first')
-    ).reset_index()
-    
-    # Menghitung rating rata-rata per pesanan
-    order_ratings = data['order_reviews'].groupby('order_id')['review_score'].mean().reset_index()
-    
-    # Menggabungkan dengan order_items untuk mendapatkan rating per penjual
-    order_items_with_rating = data['order_items'].merge(order_ratings, on='order_id', how='left')
-    seller_ratings = order_items_with_rating.groupby('seller_id')['review_score'].mean().reset_index()
-    
-    # Menggabungkan performa penjual dengan rating
-    seller_performance = seller_performance.merge(seller_ratings, on='seller_id', how='left')
-    
-    # Analisis performa penjual berdasarkan lokasi
-    state_performance = seller_performance.groupby('seller_state').agg(
-        seller_count=('seller_id', 'nunique'),
-        avg_sales=('sales_count', 'mean'),
-        avg_revenue=('total_revenue', 'mean'),
-        avg_rating=('review_score', 'mean')
-    ).reset_index()
-    
-    return {
-        'seller_performance': seller_performance,
-        'state_performance': state_performance
-    }
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def product_category_analysis(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.product_category_analysis(data, start_date, end_date, states, **analysis_sources(data))
 
-# Fungsi untuk analisis RFM
-@st.cache_data
-def rfm_analysis(data):
-    # Menggabungkan dataset orders dengan order_items
-    orders_with_items = data['orders'].merge(data['order_items'], on='order_id', how='left')
-    orders_with_items['total_price'] = orders_with_items['price'] + orders_with_items['freight_value']
-    
-    # Menentukan tanggal referensi (tanggal terakhir dalam dataset + 1 hari)
-    reference_date = data['orders']['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
-    
-    # Menghitung RFM untuk setiap pelanggan
-    rfm = orders_with_items.groupby('customer_id').agg({
-        'order_purchase_timestamp': lambda x: (reference_date - x.max()).days,  # Recency (dalam hari)
-        'order_id': 'nunique',  # Frequency
-        'total_price': 'sum'  # Monetary
-    }).reset_index()
-    
-    rfm.columns = ['customer_id', 'recency', 'frequency', 'monetary']
-    
-    # Membuat skor RFM (1-5, 5 adalah yang terbaik)
-    rfm['r_score'] = pd.qcut(rfm['recency'], 5, labels=[5, 4, 3, 2, 1])
-    rfm['f_score'] = pd.qcut(rfm['frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5])
-    rfm['m_score'] = pd.qcut(rfm['monetary'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5])
-    
-    # Menghitung skor RFM gabungan
-    rfm['rfm_score'] = rfm['r_score'].astype(int) + rfm['f_score'].astype(int) + rfm['m_score'].astype(int)
-    
-    # Membuat segmen pelanggan berdasarkan skor RFM
-    rfm['customer_segment'] = pd.qcut(rfm['rfm_score'], 4, labels=['Bronze', 'Silver', 'Gold', 'Platinum'])
-    
-    # Menghitung jumlah pelanggan per segmen
-    segment_counts = rfm['customer_segment'].value_counts().reset_index()
-    segment_counts.columns = ['customer_segment', 'count']
-    
-    # Analisis karakteristik setiap segmen pelanggan
-    segment_analysis = rfm.groupby('customer_segment').agg({
-        'recency': 'mean',
-        'frequency': 'mean',
-        'monetary': 'mean',
-        'customer_id': 'count'
-    }).reset_index()
-    
-    segment_analysis.columns = ['customer_segment', 'avg_recency', 'avg_frequency', 'avg_monetary', 'customer_count']
-    
-    return {
-        'rfm': rfm,
-        'segment_counts': segment_counts,
-        'segment_analysis': segment_analysis
-    }
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def seller_performance_analysis(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.seller_performance_analysis(data, start_date, end_date, states, **analysis_sources(data))
+
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def delivery_distance_analysis(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.delivery_distance_analysis(data, start_date, end_date, states, engine=analysis_sources(data)['engine'])
+
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def rfm_analysis(data, reference_date=None, bins=5, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.rfm_analysis(data, reference_date, bins, start_date, end_date, states, **analysis_sources(data),
+                                 sketch_error=SKETCH_ERROR)
+
+@instrumented('analysis')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+@precomputed
+def cohort_analysis(data, reference_date=None, bins=5, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return analysis.cohort_analysis(data, reference_date, bins, start_date, end_date, states, engine=analysis_sources(data)['engine'],
+                                    sketch_error=SKETCH_ERROR)
+
+# Grafik setiap halaman (lihat figures.py) di-cache per versi dataset, filter, dan opsi grafik,
+# sehingga rerun dan perpindahan halaman tidak membangun ulang grafik Plotly yang sama. Setiap
+# fungsi menyimpan paling banyak DASHBOARD_FIGURE_CACHE_ENTRIES grafik (yang paling lama tidak
+# dipakai dibuang lebih dulu); grafik yang dibagikan tidak boleh diubah oleh halaman
+FIGURE_CACHE_ENTRIES = int(os.environ.get('DASHBOARD_FIGURE_CACHE_ENTRIES', 32))
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def order_trend_figure(data, granularity, method, start_date=None, end_date=None, states=None):
+    cache_miss()
+    time_data = time_analysis(data, start_date, end_date, states)
+    series, total_points = chart_series(time_data['order_count_resamples'], granularity, method=method)
+    return figures.order_trend_figure(series, granularity), len(series), total_points
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def category_ranking_figure(data, column, n, start_date=None, end_date=None, states=None):
+    cache_miss()
+    product_data = product_category_analysis(data, start_date, end_date, states)
+    return figures.category_ranking_figure(product_data['category_rankings'][column].top(n), column, n)
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def category_relation_figure(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    product_data = product_category_analysis(data, start_date, end_date, states)
+    return figures.category_relation_figure(product_data['category_stats'])
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def purchase_pattern_figures(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return figures.purchase_pattern_figures(time_analysis(data, start_date, end_date, states),
+                                            purchase_pattern_analysis(data, start_date, end_date, states))
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def seller_figures(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return figures.seller_figures(seller_performance_analysis(data, start_date, end_date, states))
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def delivery_distance_figure(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return figures.delivery_distance_figure(delivery_distance_analysis(data, start_date, end_date, states)['distance_ratings'])
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def rfm_figures(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return figures.rfm_figures(rfm_analysis(data, start_date=start_date, end_date=end_date, states=states))
+
+@instrumented('figure')
+@st.cache_resource(hash_funcs=HASH_FUNCS, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def cohort_figures(data, start_date=None, end_date=None, states=None):
+    cache_miss()
+    return figures.cohort_figures(cohort_analysis(data, start_date=start_date, end_date=end_date, states=states))
+
+# Warm-up latar belakang: setiap versi dataset baru dimuat dan seluruh fungsi analisis serta grafik
+# halaman (tanpa filter) dihitung secara paralel, sehingga sesi pertama setelah restart atau data baru
+# tidak menanggung waktu komputasinya (lihat warmup.py). DASHBOARD_WARMUP=0 menonaktifkannya
+WARMUP_ENABLED = os.environ.get('DASHBOARD_WARMUP', '1') != '0'
+WARMUP_WORKERS = int(os.environ.get('DASHBOARD_WARMUP_WORKERS', WARMUP_WORKERS))
+
+# Interval (detik) pemeriksaan data baru oleh warm-up tanpa menunggu rerun; 0 untuk menonaktifkan
+WARMUP_INTERVAL = float(os.environ.get('DASHBOARD_WARMUP_INTERVAL', 60))
+
+# Fungsi analisis yang dihangatkan, yang paling berat lebih dulu
+WARMUP_TASKS = [rfm_analysis, seller_performance_analysis, product_category_analysis, delivery_distance_analysis,
+                time_analysis, purchase_pattern_analysis, calculate_metrics, filter_options,
+                rfm_figures, seller_figures, purchase_pattern_figures, category_relation_figure]
+
+# Analisis kohort membaca tabel fakta, yang tidak dimuat pada mode streaming
+if not STREAMING_MODE:
+    WARMUP_TASKS += [cohort_analysis, cohort_figures]
+
+# Fungsi untuk memuat seluruh tabel halaman dashboard pada satu versi dataset (untuk warm-up)
+def load_all_tables(version):
+    dataset = get_dataset(version)
+    dataset.tables(sorted({name for tables in PAGE_DATA_TABLES.values() for name in tables}))
+    return dataset
+
+# Warm-up bersama untuk seluruh sesi di proses ini
+@st.cache_resource
+def get_warmup():
+    warmup = Warmup(load_all_tables, WARMUP_WORKERS)
+    if WARMUP_INTERVAL > 0:
+        warmup.watch(source_version, WARMUP_INTERVAL)
+    return warmup
+
+# Fungsi untuk memilih dataset yang dibaca rerun ini. Selama versi baru masih dihangatkan, sesi
+# tetap membaca dataset terakhir yang sudah selesai dihangatkan (stale-while-revalidate);
+# sebelum ada yang selesai (misalnya tepat setelah restart), dataset versi saat ini dipakai langsung
+def serving_dataset():
+    version = current_version()
+    if not WARMUP_ENABLED:
+        return get_dataset(version)
+
+    warmup = get_warmup()
+    warmup.submit(version, WARMUP_TASKS)
+    ready = warmup.ready
+    return ready if ready is not None else get_dataset(version)
+
+# Status warm-up di sidebar. Selama warm-up berjalan, status diperiksa ulang secara berkala dan
+# halaman dimuat ulang begitu dataset yang lebih baru selesai dihangatkan
+def warmup_status(data):
+    status = get_warmup().status()
+
+    @st.fragment(run_every=2 if status['pending_version'] else None)
+    def show_status():
+        status = get_warmup().status()
+        if status['ready_version'] is not None and status['ready_version'] != data.version:
+            st.rerun(scope='app')
+
+        if status['pending_version'] is not None:
+            elapsed = time.time() - status['started_at']
+            if status['ready_version'] is None:
+                st.info(f"Menyiapkan hasil analisis di latar belakang ({elapsed:.0f} detik)...")
+            else:
+                st.info(f"Data baru sedang diproses di latar belakang ({elapsed:.0f} detik); "
+                        "halaman ini menampilkan data sebelumnya dan akan diperbarui otomatis.")
+        if status['failed_version'] is not None and status['failed_version'] != data.version:
+            st.warning(f"Data terbaru gagal dimuat ({status['error']}); menampilkan data sebelumnya.")
+
+    show_status()
+
+# Fungsi untuk menampilkan grafik Plotly sambil mengukur serialisasi dan pengirimannya.
+# Saat panel debug aktif, ukuran payload JSON grafik juga dicatat (di luar waktu tahap)
+def plotly_chart(fig):
+    name = fig.layout.title.text or f"{page} #{sum(record['kind'] == 'chart' for record in recorder.records) + 1}"
+    with stage(f'plotly_chart: {name}', 'chart') as record:
+        st.plotly_chart(fig, use_container_width=True)
+    if recorder.trace_memory:
+        record['payload_bytes'] = len(fig.to_json())
 
 # Sidebar
 st.sidebar.title("E-Commerce Dashboard")
@@ -255,19 +407,56 @@ st.sidebar.image("https://img.icons8.com/color/96/000000/shopping-cart--v2.png",
 # Menu navigasi
 page = st.sidebar.radio("Navigasi", ["Beranda", "Pola Pembelian", "Analisis Kategori Produk", "Performa Penjual", "Segmentasi Pelanggan (RFM)", "Insight & Kesimpulan"])
 
-# Memuat data
-data = load_data()
-metrics = calculate_metrics(data)
+# Memuat data yang dibutuhkan halaman ini saja
+data = load_data(PAGE_DATA_TABLES[page])
+
+if WARMUP_ENABLED:
+    with st.sidebar:
+        warmup_status(data)
+
+# Filter rentang tanggal pembelian dan negara bagian pelanggan (tidak dipakai halaman Insight)
+filters = {}
+if page != "Insight & Kesimpulan":
+    options = filter_options(data)
+    st.sidebar.subheader("Filter")
+    date_range = st.sidebar.date_input("Rentang Tanggal Pembelian", value=(options['min_date'], options['max_date']),
+                                       min_value=options['min_date'], max_value=options['max_date'])
+    selected_states = st.sidebar.multiselect("Negara Bagian Pelanggan", options['states'])
+    
+    # Rentang yang belum lengkap atau sama dengan seluruh data dianggap tanpa filter
+    if len(date_range) == 2 and tuple(date_range) != (options['min_date'], options['max_date']):
+        filters['start_date'], filters['end_date'] = date_range
+    if selected_states:
+        filters['states'] = tuple(selected_states)
+
+# Pada mode streaming tabel fakta tidak dimuat, sehingga filter hanya diterapkan pada analisis
+# yang dihitung dari cube jumlah pesanan (tren dan pola pembelian)
+fact_filters = {} if STREAMING_MODE else filters
+if STREAMING_MODE:
+    st.sidebar.caption("Mode streaming: file dibaca per potongan, tetapi agregat per pesanan tetap bertambah "
+                       "sebanding jumlah pesanan, sehingga memori tidak sepenuhnya terbatas.")
+if STREAMING_MODE and filters and page != "Pola Pembelian":
+    st.sidebar.caption("Mode streaming: filter hanya diterapkan pada tren dan pola pembelian.")
+
+# Hasil ekspor hanya dipakai untuk analisis tanpa filter; analisis yang difilter tetap dihitung
+precomputed_data = precomputed_results(data)
+if precomputed_data is not None:
+    st.sidebar.caption(f"Hasil analisis tanpa filter dibaca dari ekspor {precomputed_data.manifest['exported_at']}.")
+elif PRECOMPUTED_DIR:
+    st.sidebar.caption(f"Belum ada ekspor parquet untuk data ini di {PRECOMPUTED_DIR}; hasil analisis dihitung langsung.")
 
 # Halaman Beranda
 if page == "Beranda":
     st.title("Dashboard Analisis E-Commerce")
     st.markdown("Dashboard ini menyajikan analisis komprehensif dari dataset e-commerce publik, mencakup pola pembelian, kategori produk, performa penjual, dan segmentasi pelanggan.")
     
+    metrics = calculate_metrics(data)
+    
     # Metrik utama
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Jumlah Pelanggan", f"{metrics['unique_customers']:,}")
+        st.metric("Jumlah Pelanggan", f"{metrics['unique_customers']:,}",
+                  help="Perkiraan HyperLogLog" if SKETCH_ERROR is not None and precomputed_data is None else None)
         st.metric("Jumlah Pesanan", f"{metrics['total_orders']:,}")
     
     with col2:
@@ -279,264 +468,162 @@ if page == "Beranda":
         st.metric("Waktu Pengiriman Rata-rata", f"{metrics['avg_delivery_time']:.1f} hari")
     
     # Grafik tren pesanan harian
-    st.subheader("Tren Pesanan Harian")
-    time_data = time_analysis(data)
-    fig = px.line(time_data['daily_order_counts'], x='purchase_date', y='order_count',
-                 title='Tren Jumlah Pesanan Harian')
-    fig.update_layout(xaxis_title='Tanggal', yaxis_title='Jumlah Pesanan')
-    st.plotly_chart(fig, use_container_width=True)
+    st.subheader("Tren Pesanan")
+    
+    # Jumlah titik grafik dibatasi: mode Otomatis memakai data harian pada rentang tanggal yang
+    # dipilih dan men-downsample-nya jika terlalu panjang
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.radio("Granularitas", ['Otomatis'] + list(RESAMPLE_RULES), horizontal=True)
+    with col2:
+        method = st.radio("Metode downsampling", ['lttb', 'minmax'], horizontal=True,
+                          format_func={'lttb': 'LTTB', 'minmax': 'Min-Max'}.get)
+    fig, shown_points, total_points = order_trend_figure(data, granularity, method, **filters)
+    plotly_chart(fig)
+    if shown_points < total_points:
+        st.caption(f"Menampilkan {shown_points:,} dari {total_points:,} titik (downsampling {method.upper()}).")
     
     # Grafik kategori produk terlaris
     st.subheader("Kategori Produk Terlaris")
-    product_data = product_category_analysis(data)
-    fig = px.bar(product_data['category_sales_count'].head(10), 
-                x='sales_count', y='product_category_name_english',
-                title='10 Kategori Produk Terlaris',
-                labels={'sales_count': 'Jumlah Penjualan', 'product_category_name_english': 'Kategori Produk'},
-                orientation='h')
-    fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(category_ranking_figure(data, 'sales_count', 10, **fact_filters))
 
 # Halaman Pola Pembelian
 elif page == "Pola Pembelian":
     st.title("Analisis Pola Pembelian")
     st.markdown("Analisis pola pembelian pelanggan berdasarkan waktu (jam, hari, bulan) dan lokasi geografis.")
     
-    time_data = time_analysis(data)
+    pattern_figures = purchase_pattern_figures(data, **filters)
     
     # Pola pembelian berdasarkan jam
     st.subheader("Pola Pembelian Berdasarkan Jam")
-    fig = px.bar(x=time_data['hourly_orders'].index, y=time_data['hourly_orders'].values,
-                labels={'x': 'Jam (0-23)', 'y': 'Jumlah Pesanan'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(pattern_figures['hourly_orders'])
     
     # Pola pembelian berdasarkan hari
     st.subheader("Pola Pembelian Berdasarkan Hari")
-    fig = px.bar(x=time_data['daily_orders'].index, y=time_data['daily_orders'].values,
-                labels={'x': 'Hari', 'y': 'Jumlah Pesanan'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(pattern_figures['daily_orders'])
     
     # Pola pembelian berdasarkan bulan
     st.subheader("Pola Pembelian Berdasarkan Bulan")
-    fig = px.bar(x=time_data['monthly_orders'].index, y=time_data['monthly_orders'].values,
-                labels={'x': 'Bulan', 'y': 'Jumlah Pesanan'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(pattern_figures['monthly_orders'])
     
     # Heatmap jam vs hari
     st.subheader("Pola Pembelian: Jam vs Hari")
-    orders_df = data['orders']
-    orders_df['purchase_day_num'] = orders_df['order_purchase_timestamp'].dt.dayofweek
-    hour_day_pivot = pd.crosstab(index=orders_df['purchase_hour'], columns=orders_df['purchase_day_num'])
-    hour_day_pivot.columns = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
-    
-    fig = px.imshow(hour_day_pivot, 
-                   labels=dict(x="Hari", y="Jam", color="Jumlah Pesanan"),
-                   x=hour_day_pivot.columns,
-                   y=hour_day_pivot.index,
-                   color_continuous_scale='Viridis')
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(pattern_figures['hour_day'])
     
     # Analisis pola pembelian berdasarkan lokasi geografis
     st.subheader("Pola Pembelian Berdasarkan Lokasi")
-    
-    # Menggabungkan dataset orders dengan customers
-    orders_with_location = data['orders'].merge(data['customers'], on='customer_id', how='left')
-    
-    # Menghitung jumlah pesanan per negara bagian
-    state_orders = orders_with_location['customer_state'].value_counts().reset_index()
-    state_orders.columns = ['customer_state', 'order_count']
-    
-    fig = px.bar(state_orders.head(10), 
-                x='customer_state', 
-                y='order_count',
-                title='10 Negara Bagian dengan Jumlah Pesanan Tertinggi',
-                labels={'customer_state': 'Negara Bagian', 'order_count': 'Jumlah Pesanan'},
-                color='order_count',
-                color_continuous_scale='Viridis')
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(pattern_figures['state_orders'])
 
 # Halaman Analisis Kategori Produk
 elif page == "Analisis Kategori Produk":
     st.title("Analisis Kategori Produk")
     st.markdown("Analisis kategori produk yang paling populer dan menghasilkan pendapatan tertinggi.")
     
-    product_data = product_category_analysis(data)
-    
     # Kategori produk terlaris
     st.subheader("Kategori Produk Terlaris")
-    fig = px.bar(product_data['category_sales_count'].head(15), 
-                x='sales_count', y='product_category_name_english',
-                title='15 Kategori Produk Terlaris',
-                labels={'sales_count': 'Jumlah Penjualan', 'product_category_name_english': 'Kategori Produk'},
-                orientation='h')
-    fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(category_ranking_figure(data, 'sales_count', 15, **fact_filters))
     
     # Kategori dengan pendapatan tertinggi
     st.subheader("Kategori dengan Pendapatan Tertinggi")
-    fig = px.bar(product_data['category_revenue'].head(15), 
-                x='total_price', y='product_category_name_english',
-                title='15 Kategori Produk dengan Pendapatan Tertinggi',
-                labels={'total_price': 'Total Pendapatan (R$)', 'product_category_name_english': 'Kategori Produk'},
-                orientation='h')
-    fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(category_ranking_figure(data, 'total_price', 15, **fact_filters))
     
     # Kategori dengan harga rata-rata tertinggi
     st.subheader("Kategori dengan Harga Rata-rata Tertinggi")
-    fig = px.bar(product_data['category_avg_price'].head(15), 
-                x='price', y='product_category_name_english',
-                title='15 Kategori Produk dengan Harga Rata-rata Tertinggi',
-                labels={'price': 'Harga Rata-rata (R$)', 'product_category_name_english': 'Kategori Produk'},
-                orientation='h')
-    fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(category_ranking_figure(data, 'price', 15, **fact_filters))
     
     # Hubungan antara jumlah penjualan dan pendapatan
     st.subheader("Hubungan antara Jumlah Penjualan dan Pendapatan")
-    
-    # Menggabungkan informasi jumlah penjualan dan pendapatan
-    category_analysis = product_data['category_sales_count'].merge(product_data['category_revenue'], on='product_category_name_english', how='inner')
-    category_analysis = category_analysis.rename(columns={'total_price': 'total_revenue'})
-    
-    fig = px.scatter(category_analysis, 
-                    x='sales_count', 
-                    y='total_revenue',
-                    title='Hubungan antara Jumlah Penjualan dan Total Pendapatan per Kategori',
-                    labels={'sales_count': 'Jumlah Penjualan', 'total_revenue': 'Total Pendapatan (R$)'},
-                    hover_name='product_category_name_english',
-                    size='sales_count',
-                    color='total_revenue',
-                    color_continuous_scale='Viridis')
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(category_relation_figure(data, **fact_filters))
 
 # Halaman Performa Penjual
 elif page == "Performa Penjual":
     st.title("Analisis Performa Penjual")
     st.markdown("Analisis performa penjual berdasarkan lokasi, volume penjualan, dan rating pelanggan.")
     
-    seller_data = seller_performance_analysis(data)
+    seller_data = seller_performance_analysis(data, **fact_filters)
+    seller_charts = seller_figures(data, **fact_filters)
     
     # Jumlah penjual per negara bagian
     st.subheader("Jumlah Penjual per Negara Bagian")
-    top_seller_states = seller_data['state_performance'].sort_values('seller_count', ascending=False).head(10)
-    
-    fig = px.bar(top_seller_states, 
-                x='seller_state', 
-                y='seller_count',
-                title='10 Negara Bagian dengan Jumlah Penjual Tertinggi',
-                labels={'seller_state': 'Negara Bagian', 'seller_count': 'Jumlah Penjual'},
-                color='avg_rating',
-                color_continuous_scale='RdYlGn',
-                text='avg_rating')
-    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(seller_charts['seller_states'])
     
     # Hubungan antara volume penjualan dan rating
     st.subheader("Hubungan antara Volume Penjualan dan Rating")
-    
-    # Menambahkan kategori berdasarkan volume penjualan
-    seller_data['seller_performance']['sales_category'] = pd.qcut(seller_data['seller_performance']['sales_count'], 4, labels=['Low', 'Medium-Low', 'Medium-High', 'High'])
-    
-    # Menghitung rating rata-rata per kategori volume penjualan
-    sales_category_ratings = seller_data['seller_performance'].groupby('sales_category')['review_score'].agg(['mean', 'count']).reset_index()
-    
-    fig = px.bar(sales_category_ratings, 
-                x='sales_category', 
-                y='mean',
-                title='Rating Rata-rata Berdasarkan Volume Penjualan',
-                labels={'sales_category': 'Kategori Volume Penjualan', 'mean': 'Rating Rata-rata'},
-                color='mean',
-                color_continuous_scale='RdYlGn',
-                text='count')
-    fig.update_traces(texttemplate='%{text} penjual', textposition='outside')
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(seller_charts['sales_category_ratings'])
     
     # Analisis waktu pengiriman dan pengaruhnya terhadap rating
     st.subheader("Pengaruh Waktu Pengiriman terhadap Rating")
+    plotly_chart(seller_charts['delivery_time_ratings'])
+    
+    # Analisis jarak penjual ke pelanggan dan pengaruhnya terhadap waktu pengiriman dan rating
+    st.subheader("Pengaruh Jarak Pengiriman terhadap Waktu Pengiriman dan Rating")
+    
+    if STREAMING_MODE:
+        st.info("Analisis jarak pengiriman membutuhkan tabel fakta sehingga tidak tersedia pada mode streaming.")
+    else:
+        plotly_chart(delivery_distance_figure(data, **fact_filters))
+        st.caption("Jarak dihitung dengan rumus haversine antara centroid prefix kode pos penjual dan pelanggan.")
+    
+    # Peringkat penjual per halaman (hanya prefix peringkat yang dibutuhkan yang diurutkan)
+    st.subheader("Penjual Teratas")
+    ranking_labels = {
+        'sales_count': 'Jumlah Penjualan',
+        'total_revenue': 'Total Pendapatan',
+        'review_score': 'Rating Rata-rata'
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        ranking_column = st.selectbox("Urutkan berdasarkan", list(ranking_labels), format_func=ranking_labels.get)
+    ranking = seller_data['seller_rankings'][ranking_column]
+    with col2:
+        ranking_page = st.number_input("Halaman", min_value=1, max_value=ranking.n_pages(), value=1, step=1)
     
-    # Menggabungkan dataset orders dengan order_reviews
-    delivery_reviews = data['delivered_orders'].merge(data['order_reviews'], on='order_id', how='inner')
-    
-    # Mengelompokkan waktu pengiriman menjadi beberapa kategori
-    delivery_reviews['delivery_time_category'] = pd.cut(delivery_reviews['delivery_time_days'], 
-                                                      bins=[0, 7, 14, 21, 28, float('inf')],
-                                                      labels=['1 week', '2 weeks', '3 weeks', '4 weeks', '> 4 weeks'])
-    
-    # Menghitung rating rata-rata per kategori waktu pengiriman
-    delivery_time_ratings = delivery_reviews.groupby('delivery_time_category')['review_score'].agg(['mean', 'count']).reset_index()
-    
-    fig = px.bar(delivery_time_ratings, 
-                x='delivery_time_category', 
-                y='mean',
-                title='Rating Rata-rata Berdasarkan Waktu Pengiriman',
-                labels={'delivery_time_category': 'Waktu Pengiriman', 'mean': 'Rating Rata-rata'},
-                color='mean',
-                color_continuous_scale='RdYlGn',
-                text='count')
-    fig.update_traces(texttemplate='%{text} pesanan', textposition='outside')
-    st.plotly_chart(fig, use_container_width=True)
+    with stage('ranking: seller_page', 'page'):
+        seller_page = ranking.page(int(ranking_page) - 1)
+    st.dataframe(seller_page[['seller_id', 'seller_state', 'seller_city', 'sales_count', 'total_revenue', 'review_score']],
+                 hide_index=True)
+    st.caption(f"Halaman {int(ranking_page)} dari {ranking.n_pages()} ({len(ranking):,} penjual)")
 
 # Halaman Segmentasi Pelanggan (RFM)
 elif page == "Segmentasi Pelanggan (RFM)":
     st.title("Segmentasi Pelanggan (RFM Analysis)")
     st.markdown("Analisis RFM (Recency, Frequency, Monetary) untuk segmentasi pelanggan.")
+    if SKETCH_ERROR is not None and (fact_filters or precomputed_data is None):
+        st.caption(f"Batas skor RFM diperkirakan dengan sketch kuantil (galat rank sekitar {SKETCH_ERROR:.1%}).")
     
-    rfm_data = rfm_analysis(data)
+    rfm_charts = rfm_figures(data, **fact_filters)
     
     # Distribusi segmen pelanggan
     st.subheader("Distribusi Segmen Pelanggan")
-    fig = px.pie(rfm_data['segment_counts'], 
-                values='count', 
-                names='customer_segment',
-                title='Segmentasi Pelanggan Berdasarkan Analisis RFM',
-                color='customer_segment',
-                color_discrete_map={'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'})
-    fig.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Karakteristik segmen pelanggan
-    st.subheader("Karakteristik Segmen Pelanggan")
+    plotly_chart(rfm_charts['segments'])
     
-    # Recency
-    fig = px.bar(rfm_data['segment_analysis'], 
-                x='customer_segment', 
-                y='avg_recency',
-                title='Rata-rata Recency per Segmen (hari)',
-                labels={'customer_segment': 'Segmen Pelanggan', 'avg_recency': 'Rata-rata Recency (hari)'},
-                color='customer_segment',
-                color_discrete_map={'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'})
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Frequency
-    fig = px.bar(rfm_data['segment_analysis'], 
-                x='customer_segment', 
-                y='avg_frequency',
-                title='Rata-rata Frequency per Segmen (pesanan)',
-                labels={'customer_segment': 'Segmen Pelanggan', 'avg_frequency': 'Rata-rata Frequency (pesanan)'},
-                color='customer_segment',
-                color_discrete_map={'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'})
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Monetary
-    fig = px.bar(rfm_data['segment_analysis'], 
-                x='customer_segment', 
-                y='avg_monetary',
-                title='Rata-rata Monetary per Segmen (R$)',
-                labels={'customer_segment': 'Segmen Pelanggan', 'avg_monetary': 'Rata-rata Monetary (R$)'},
-                color='customer_segment',
-                color_discrete_map={'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'})
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Jumlah pelanggan per segmen
-    fig = px.bar(rfm_data['segment_analysis'], 
-                x='customer_segment', 
-                y='customer_count',
-                title='Jumlah Pelanggan per Segmen',
-                labels={'customer_segment': 'Segmen Pelanggan', 'customer_count': 'Jumlah Pelanggan'},
-                color='customer_segment',
-                color_discrete_map={'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'})
-    st.plotly_chart(fig, use_container_width=True)
+    # Karakteristik segmen pelanggan: recency, frequency, monetary, dan jumlah pelanggan per segmen
+    st.subheader("Karakteristik Segmen Pelanggan")
+    for column in ['avg_recency', 'avg_frequency', 'avg_monetary', 'customer_count']:
+        plotly_chart(rfm_charts[column])
+
+    # Kohort dan pembelian ulang per customer_unique_id: customer_id di atas unik per pesanan,
+    # sehingga frequency-nya hampir selalu 1
+    st.subheader("Kohort & Pembelian Ulang")
+    if STREAMING_MODE:
+        st.info("Analisis kohort membutuhkan tabel fakta, sehingga tidak tersedia pada mode streaming.")
+    else:
+        cohort_data = cohort_analysis(data, **fact_filters)
+        cohort_charts = cohort_figures(data, **fact_filters)
+        summary = cohort_data['repeat_summary']
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Pelanggan Unik", f"{summary['customers']:,}")
+        with col2:
+            st.metric("Pelanggan Berbelanja Ulang", f"{summary['repeat_customers']:,}", f"{summary['repeat_rate']:.1%}", delta_color="off")
+        with col3:
+            days = summary['median_days_to_second_purchase']
+            st.metric("Median Hari ke Pesanan Kedua", f"{days:.0f}" if days is not None else "-")
+
+        plotly_chart(cohort_charts['retention'])
+        plotly_chart(cohort_charts['order_frequency'])
+        plotly_chart(cohort_charts['segments'])
 
 # Halaman Insight & Kesimpulan
 elif page == "Insight & Kesimpulan":
@@ -605,5 +692,25 @@ elif page == "Insight & Kesimpulan":
 st.sidebar.markdown("---")
 st.sidebar.info("Dashboard ini dibuat sebagai bagian dari Proyek Analisis Data E-Commerce.")
 
+# Panel debug instrumentasi
+recorder.close()
+metrics_registry = get_metrics_registry()
+metrics_registry.add(recorder.records)
+if METRICS_FILE:
+    metrics_registry.write_prometheus(METRICS_FILE)
+
+st.sidebar.checkbox("Panel debug", key='debug_panel', help="Tampilkan waktu, memori, dan status cache setiap tahap")
+if st.session_state.get('debug_panel'):
+    with st.sidebar.expander("Instrumentasi rerun ini", expanded=True):
+        records = pd.DataFrame(recorder.records)
+        records['stage'] = ['  ' * depth + name for depth, name in zip(records['depth'], records['stage'])]
+        st.dataframe(records.drop(columns='depth'), hide_index=True)
+        st.caption(f"Total {records.loc[records['depth'] == 0, 'wall_time_s'].sum():.3f} s")
+        if WARMUP_ENABLED and get_warmup().task_seconds:
+            st.caption("Warm-up terakhir: " + ", ".join(f"{name} {seconds:.2f} s" for name, seconds in get_warmup().task_seconds.items()))
+        st.download_button("Unduh JSON (rerun ini)", recorder.to_json(), file_name='instrumentation.json', mime='application/json')
+        st.download_button("Unduh JSON (kumulatif)", metrics_registry.to_json(), file_name='instrumentation-total.json', mime='application/json')
+        st.download_button("Unduh Prometheus", metrics_registry.to_prometheus(), file_name='dashboard-metrics.prom', mime='text/plain')
+
 if __name__ == "__main__":
     pass
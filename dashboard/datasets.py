@@ -0,0 +1,202 @@
+import threading
+
+import pandas as pd
+
+from cube import build_order_cube
+from geo import build_zip_centroids
+from incremental import INCREMENTAL_TABLES
+from ingest import DATA_DIR, TABLE_SCHEMAS, dataset_fingerprint, prepare_caches, read_table
+from star import build_dim_categories, build_dim_customers, build_dim_sellers, build_fact_items
+
+# Copy-on-write agar tabel bersama bisa dibagikan sebagai view tanpa salinan
+# (sudah selalu aktif mulai pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+# Fungsi untuk menambahkan informasi waktu dari order_purchase_timestamp
+def add_purchase_time_features(orders_df):
+    orders_df['purchase_hour'] = orders_df['order_purchase_timestamp'].dt.hour
+    orders_df['purchase_day'] = orders_df['order_purchase_timestamp'].dt.day_name()
+    orders_df['purchase_month'] = orders_df['order_purchase_timestamp'].dt.month_name()
+    orders_df['purchase_year'] = orders_df['order_purchase_timestamp'].dt.year
+    orders_df['purchase_date'] = orders_df['order_purchase_timestamp'].dt.date
+    orders_df['purchase_day_num'] = orders_df['order_purchase_timestamp'].dt.dayofweek
+    return orders_df
+
+
+# Fungsi untuk menghitung total harga (harga + ongkos kirim) setiap item pesanan
+def add_total_price(order_items_df):
+    order_items_df['total_price'] = order_items_df['price'] + order_items_df['freight_value']
+    return order_items_df
+
+
+# Fungsi untuk menangani nilai yang hilang pada dataset products
+def fill_product_category(products_df):
+    products_df['product_category_name'] = products_df['product_category_name'].fillna('unknown')
+    return products_df
+
+
+# Fungsi untuk menggabungkan dataset products dengan category_name_translation
+def build_products_with_category(dataset):
+    products_with_category_df = dataset['products'].merge(dataset['category_name_translation'], on='product_category_name', how='left')
+    products_with_category_df['product_category_name_english'] = products_with_category_df['product_category_name_english'].fillna(products_with_category_df['product_category_name'])
+    return products_with_category_df
+
+
+# Fungsi untuk menghitung waktu pengiriman untuk pesanan yang telah dikirim
+def build_delivered_orders(dataset):
+    orders_df = dataset['orders']
+    delivered_orders_df = orders_df[orders_df['order_status'] == 'delivered']
+    delivered_orders_df['delivery_time_days'] = (delivered_orders_df['order_delivered_customer_date'] -
+                                                delivered_orders_df['order_purchase_timestamp']).dt.days
+    delivered_orders_df['delivery_vs_estimate_days'] = (delivered_orders_df['order_delivered_customer_date'] -
+                                                      delivered_orders_df['order_estimated_delivery_date']).dt.days
+    return delivered_orders_df
+
+
+# Transformasi yang langsung diterapkan pada tabel dasar setelah dibaca
+TABLE_TRANSFORMS = {
+    'orders': add_purchase_time_features,
+    'order_items': add_total_price,
+    'products': fill_product_category
+}
+
+# Kolom ID (UUID 32 karakter) yang dikodekan menjadi kategori dengan kamus bersama lintas tabel,
+# beserta tabel sumber kamusnya. Kode kategori (int32 untuk kamus besar) dipakai untuk join dan
+# group-by, sedangkan kamus (categories) menjadi tabel lookup untuk menampilkan ID aslinya.
+# Nilai di tabel lain yang tidak ada di kamus menjadi NaN (tidak punya pasangan untuk di-join)
+ID_COLUMNS = {
+    'order_id': ['orders', 'order_items'],
+    'customer_id': ['customers', 'orders'],
+    'customer_unique_id': ['customers'],
+    'product_id': ['products', 'order_items'],
+    'seller_id': ['sellers', 'order_items']
+}
+
+# Tabel turunan yang dihitung dari tabel lain saat pertama kali diakses
+DERIVED_TABLES = {
+    'products_with_category': build_products_with_category,
+    'delivered_orders': build_delivered_orders,
+    'dim_customers': build_dim_customers,
+    'dim_sellers': build_dim_sellers,
+    'dim_categories': build_dim_categories,
+    'zip_centroids': build_zip_centroids,
+    'fact_items': build_fact_items,
+    'order_cube': build_order_cube
+}
+
+# Tabel yang dibaca langsung oleh setiap tabel turunan
+DERIVED_SOURCES = {
+    'products_with_category': ['products', 'category_name_translation'],
+    'delivered_orders': ['orders'],
+    'dim_customers': ['customers'],
+    'dim_sellers': ['sellers'],
+    'dim_categories': ['products_with_category'],
+    'zip_centroids': ['geolocation'],
+    'fact_items': ['orders', 'order_items', 'products_with_category', 'dim_categories', 'order_reviews',
+                   'customers', 'sellers', 'zip_centroids'],
+    'order_cube': ['orders', 'dim_customers']
+}
+
+
+# Fungsi untuk menentukan seluruh tabel sumber (file CSV) yang dibaca saat memuat tabel-tabel,
+# termasuk (jika ids) tabel sumber kamus kolom ID-nya. Tabel pada exclude tidak ditelusuri
+def source_tables(names, ids=True, exclude=()):
+    sources = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in DERIVED_TABLES:
+            stack.extend(DERIVED_SOURCES[name])
+        elif name not in sources and name not in exclude:
+            sources.add(name)
+            if ids:
+                stack.extend(table for col in TABLE_SCHEMAS[name]['dtypes'] if col in ID_COLUMNS for table in ID_COLUMNS[col])
+    return sorted(sources)
+
+
+# Registry dataset yang memuat tabel secara lazy: tabel hanya dibaca (dan tabel turunan
+# hanya dihitung) saat pertama kali diminta, lalu disimpan untuk permintaan berikutnya.
+# Atribut version adalah fingerprint file sumber saat registry dibuat dan menjadi kunci cache
+# hasil analisis, sehingga isi tabel tidak perlu di-hash.
+# Setiap akses mengembalikan shallow copy: dengan copy-on-write data tidak disalin, tetapi
+# penambahan kolom oleh pemanggil tidak mengubah tabel yang dipakai bersama
+class Dataset:
+    def __init__(self, data_dir=DATA_DIR, version=None):
+        self.data_dir = data_dir
+        self.version = version or dataset_fingerprint(data_dir)
+        self._tables = {}
+        self._id_categories = {}
+        # RLock karena tabel turunan memuat tabel lain dari dalam _load
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        table = self._tables.get(name)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(name)
+                if table is None:
+                    table = self._load(name)
+                    self._tables[name] = table
+        return table.copy(deep=False)
+
+    def __contains__(self, name):
+        return name in self._tables
+
+    def _load(self, name):
+        if name in DERIVED_TABLES:
+            return DERIVED_TABLES[name](self)
+
+        table = read_table(name, self.data_dir)
+        for col in ID_COLUMNS:
+            if col in table.columns:
+                table[col] = pd.Categorical(table[col], categories=self.id_categories(col))
+
+        if name in TABLE_TRANSFORMS:
+            table = TABLE_TRANSFORMS[name](table)
+        return table
+
+    # Tabel sumber kamus satu kolom ID
+    def id_sources(self, col):
+        return ID_COLUMNS[col]
+
+    # Kamus terurut untuk satu kolom ID; hanya kolom tersebut yang dibaca dari cache kolumnar
+    def id_categories(self, col):
+        categories = self._id_categories.get(col)
+        if categories is None:
+            with self._lock:
+                categories = self._id_categories.get(col)
+                if categories is None:
+                    values = [read_table(name, self.data_dir, columns=[col])[col] for name in self.id_sources(col)]
+                    categories = pd.Index(pd.concat(values, ignore_index=True).dropna().unique()).sort_values()
+                    self._id_categories[col] = categories
+        return categories
+
+    # Sebelum tabel dimuat satu per satu, seluruh file CSV sumbernya yang belum punya cache
+    # di-parse paralel sekaligus (lihat ingest.prepare_caches)
+    def tables(self, names):
+        with self._lock:
+            missing = [name for name in names if name not in self._tables]
+            if missing:
+                self._prepare(missing)
+        return {name: self[name] for name in names}
+
+    def _prepare(self, names):
+        prepare_caches(source_tables(names), self.data_dir)
+
+
+# Dataset untuk mode streaming: orders, order_items, dan order_reviews (beserta tabel turunannya)
+# tidak pernah dimuat utuh karena hanya dibaca per potongan oleh agregat inkremental, sehingga
+# yang dimuat hanya tabel dimensi. Kamus kolom ID juga hanya dibangun dari tabel dimensi
+class StreamingDataset(Dataset):
+    def _load(self, name):
+        if set(source_tables([name], ids=False)) & set(INCREMENTAL_TABLES):
+            raise KeyError(f"Tabel {name} tidak dimuat pada mode streaming")
+        return super()._load(name)
+
+    def _prepare(self, names):
+        prepare_caches(source_tables(names, exclude=INCREMENTAL_TABLES), self.data_dir)
+
+    def id_sources(self, col):
+        return [name for name in ID_COLUMNS[col] if name not in INCREMENTAL_TABLES]
@@ -0,0 +1,228 @@
+import argparse
+import concurrent.futures
+import datetime as dt
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from datasets import Dataset
+from ingest import DATA_DIR, dataset_fingerprint
+from ranking import Ranking
+from shared_store import SharedDataset, default_shared_dir, publish, read_manifest
+
+# Fungsi analisis yang diekspor (lihat analysis.py); seluruhnya dijalankan tanpa filter
+EXPORT_FUNCTIONS = ['filter_options', 'calculate_metrics', 'time_analysis', 'purchase_pattern_analysis',
+                    'product_category_analysis', 'seller_performance_analysis', 'delivery_distance_analysis',
+                    'rfm_analysis', 'cohort_analysis']
+
+# Tabel terurut yang ditulis sebagai file tersendiri untuk konsumen ekspor (di direktori views/):
+# nama tabel -> (fungsi analisis, kunci Ranking di dalam hasilnya)
+EXPORT_VIEWS = {
+    'category_revenue': ('product_category_analysis', ['category_rankings', 'total_price'])
+}
+
+# Format file tabel hasil ekspor; hanya parquet yang dapat dibaca kembali oleh dashboard
+# (CSV tidak menyimpan tipe kolom seperti kategori dan tanggal)
+EXPORT_FORMATS = ['parquet', 'csv']
+
+
+# Fungsi untuk menulis satu tabel hasil analisis ke base_dir/path; indeks hanya ditulis jika bukan
+# RangeIndex biasa. Label kolom yang bukan string (misalnya nomor hari pada pivot) disimpan di manifest
+def write_frame(frame, base_dir, path, fmt):
+    entry = {'file': f'{path}.{fmt}'}
+    if not all(isinstance(col, str) for col in frame.columns):
+        entry['columns'] = [col.item() if isinstance(col, np.generic) else col for col in frame.columns]
+        entry['columns_name'] = frame.columns.name
+        frame = frame.set_axis([str(col) for col in frame.columns], axis=1)
+
+    if fmt == 'parquet':
+        frame.to_parquet(os.path.join(base_dir, entry['file']))
+    else:
+        frame.to_csv(os.path.join(base_dir, entry['file']), index=not isinstance(frame.index, pd.RangeIndex))
+    return entry
+
+
+# Fungsi untuk menulis hasil satu fungsi analisis (dict bersarang berisi tabel, Series, Ranking,
+# dan nilai skalar) ke base_dir/path. Mengembalikan deskripsi strukturnya untuk manifest (path file
+# relatif terhadap base_dir); tabel yang sama (misalnya frame beberapa Ranking) hanya ditulis sekali
+def write_result(value, base_dir, path, fmt, written=None):
+    written = {} if written is None else written
+    if isinstance(value, dict):
+        os.makedirs(os.path.join(base_dir, path), exist_ok=True)
+        return {'kind': 'dict', 'items': {key: write_result(item, base_dir, os.path.join(path, key), fmt, written)
+                                          for key, item in value.items()}}
+    if isinstance(value, Ranking):
+        if id(value.frame) not in written:
+            written[id(value.frame)] = write_frame(value.frame, base_dir, path, fmt)
+        return {'kind': 'ranking', 'frame': written[id(value.frame)], 'column': value.column, 'ascending': value.ascending}
+    if isinstance(value, pd.DataFrame):
+        if id(value) not in written:
+            written[id(value)] = write_frame(value, base_dir, path, fmt)
+        return {'kind': 'frame', 'frame': written[id(value)]}
+    if isinstance(value, pd.Series):
+        return {'kind': 'series', 'frame': write_frame(value.to_frame('value'), base_dir, path, fmt), 'name': value.name}
+    if isinstance(value, dt.date):
+        return {'kind': 'date', 'value': value.isoformat()}
+    return {'kind': 'value', 'value': value.item() if isinstance(value, np.generic) else value}
+
+
+# Fungsi untuk membaca satu tabel hasil ekspor parquet (frame yang sama dibaca sekali)
+def read_frame(entry, base_dir, frames):
+    path = os.path.join(base_dir, entry['file'])
+    if path not in frames:
+        frame = pd.read_parquet(path)
+        if 'columns' in entry:
+            frame.columns = pd.Index(entry['columns'], name=entry['columns_name'])
+        frames[path] = frame
+    return frames[path]
+
+
+# Fungsi untuk menyusun kembali hasil fungsi analysis dari deskripsi strukturnya di manifest
+def read_result(entry, base_dir, frames=None):
+    frames = {} if frames is None else frames
+    kind = entry['kind']
+    if kind == 'dict':
+        return {key: read_result(item, base_dir, frames) for key, item in entry['items'].items()}
+    if kind == 'ranking':
+        return Ranking(read_frame(entry['frame'], base_dir, frames), entry['column'], entry['ascending'])
+    if kind == 'frame':
+        return read_frame(entry['frame'], base_dir, frames)
+    if kind == 'series':
+        return read_frame(entry['frame'], base_dir, frames)['value'].rename(entry['name'])
+    if kind == 'date':
+        return dt.date.fromisoformat(entry['value'])
+    return entry['value']
+
+
+# Fungsi untuk menulis tabel EXPORT_VIEWS milik satu fungsi analisis: seluruh baris Ranking-nya
+# dalam urutan peringkat. Mengembalikan deskripsinya untuk manifest (file dan asal datanya)
+def write_views(name, result, export_dir, fmt):
+    views = {}
+    for view, (function, keys) in EXPORT_VIEWS.items():
+        if function != name:
+            continue
+        ranking = result
+        for key in keys:
+            ranking = ranking[key]
+        os.makedirs(os.path.join(export_dir, 'views'), exist_ok=True)
+        entry = write_frame(ranking.top(len(ranking)).reset_index(drop=True), export_dir, os.path.join('views', view), fmt)
+        views[view] = {**entry, 'source': '.'.join([function, *keys]), 'sort_by': ranking.column, 'ascending': ranking.ascending}
+    return views
+
+
+# Fungsi untuk menjalankan satu fungsi analisis dan menulis hasilnya ke direktori ekspor
+def export_analysis(name, dataset, export_dir, fmt):
+    start = time.perf_counter()
+    result = getattr(analysis, name)(dataset)
+    entry = write_result(result, export_dir, name, fmt)
+    return entry, write_views(name, result, export_dir, fmt), time.perf_counter() - start
+
+
+# Fungsi untuk dijalankan di proses worker: dataset dibaca dari penyimpanan bersama (di-memory-map)
+# sehingga tabel turunan seperti fact_items tidak dibangun ulang oleh setiap proses
+def export_shared_analysis(name, shared_dir, data_dir, export_dir, fmt):
+    return export_analysis(name, SharedDataset(shared_dir, read_manifest(shared_dir), data_dir), export_dir, fmt)
+
+
+# Fungsi untuk mengekspor hasil seluruh fungsi analisis dashboard ke direktori output. Dengan lebih
+# dari satu worker, dataset dipublikasikan sekali ke penyimpanan bersama (lihat shared_store.py)
+# lalu setiap fungsi dijalankan di proses terpisah. Hasil ditulis ke direktori versi baru, lalu
+# current.json diganti secara atomik sehingga pembaca tidak pernah melihat ekspor setengah jadi
+def export_all(output_dir, data_dir=DATA_DIR, fmt='parquet', workers=None, shared_dir=None, functions=EXPORT_FUNCTIONS):
+    workers = min(workers or os.cpu_count() or 1, len(functions))
+    version = dataset_fingerprint(data_dir)
+    version_dir = os.path.join(output_dir, version)
+    tmp_dir = os.path.abspath(f'{version_dir}.{os.getpid()}.tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    if workers <= 1:
+        dataset = Dataset(data_dir, version)
+        results = {name: export_analysis(name, dataset, tmp_dir, fmt) for name in functions}
+    else:
+        shared_dir = shared_dir or default_shared_dir(data_dir)
+        os.makedirs(shared_dir, exist_ok=True)
+        manifest = read_manifest(shared_dir)
+        if manifest is None or manifest['version'] != version:
+            publish(shared_dir, data_dir)
+
+        # spawn agar worker tidak mewarisi lock dari thread lain (lihat ingest.parse_csvs)
+        context = multiprocessing.get_context('spawn')
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context) as executor:
+            futures = {name: executor.submit(export_shared_analysis, name, shared_dir, data_dir, tmp_dir, fmt)
+                       for name in functions}
+            results = {name: future.result() for name, future in futures.items()}
+
+    manifest = {
+        'version': version,
+        'format': fmt,
+        'exported_at': dt.datetime.now().isoformat(timespec='seconds'),
+        'results': {name: entry for name, (entry, _, _) in results.items()},
+        'views': {view: entry for _, views, _ in results.values() for view, entry in views.items()},
+        'seconds': {name: seconds for name, (_, _, seconds) in results.items()}
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(version_dir):
+        shutil.rmtree(version_dir)
+    os.replace(tmp_dir, version_dir)
+
+    current = {key: manifest[key] for key in ['version', 'format', 'exported_at']}
+    tmp_path = os.path.join(output_dir, f'current.json.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(current, f)
+    os.replace(tmp_path, os.path.join(output_dir, 'current.json'))
+
+    # Hapus versi lama (hanya direktori hasil ekspor, ditandai dengan manifest.json)
+    for entry in os.listdir(output_dir):
+        path = os.path.join(output_dir, entry)
+        if entry != version and os.path.isfile(os.path.join(path, 'manifest.json')):
+            shutil.rmtree(path, ignore_errors=True)
+
+    return manifest
+
+
+# Hasil analisis yang sudah diekspor untuk satu versi dataset, dibaca dari file saat pertama kali
+# dibutuhkan lalu disimpan (lihat mode agregat precomputed pada dashboard.py)
+class PrecomputedResults:
+    def __init__(self, export_dir, version):
+        self.version_dir = os.path.join(export_dir, version)
+        with open(os.path.join(self.version_dir, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        if self.manifest['format'] != 'parquet':
+            raise ValueError(f"Ekspor berformat {self.manifest['format']} tidak dapat dibaca kembali; ekspor ulang dengan --format parquet")
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.manifest['results']
+
+    def result(self, name):
+        with self._lock:
+            if name not in self._results:
+                self._results[name] = read_result(self.manifest['results'][name], self.version_dir)
+            return self._results[name]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekspor hasil seluruh fungsi analisis dashboard ke file tanpa Streamlit")
+    parser.add_argument('output_dir')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='parquet')
+    parser.add_argument('--workers', type=int, default=None, help="jumlah proses (default: jumlah core)")
+    parser.add_argument('--shared-dir', default=None, help="direktori penyimpanan bersama untuk proses worker")
+    parser.add_argument('--functions', nargs='+', choices=EXPORT_FUNCTIONS, default=EXPORT_FUNCTIONS)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = export_all(args.output_dir, args.data_dir, args.format, args.workers, args.shared_dir, args.functions)
+    for name, seconds in manifest['seconds'].items():
+        print(f"{name:<30} {seconds:8.3f} s")
+    print(f"Hasil dataset versi {manifest['version']} diekspor ke {os.path.join(args.output_dir, manifest['version'])}")
@@ -0,0 +1,206 @@
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Fungsi-fungsi pembuat grafik Plotly dari hasil analisis (lihat analysis.py), tanpa ketergantungan
+# pada Streamlit. Grafik yang dihasilkan di-cache dan dibagikan oleh dashboard, sehingga tidak
+# boleh diubah setelah dibuat
+
+# Warna setiap segmen pelanggan RFM
+SEGMENT_COLORS = {'Bronze': '#CD7F32', 'Silver': '#C0C0C0', 'Gold': '#FFD700', 'Platinum': '#E5E4E2'}
+
+# Judul dan label sumbu grafik peringkat kategori produk per kolom peringkat
+CATEGORY_RANKING_LABELS = {
+    'sales_count': ('Kategori Produk Terlaris', 'Jumlah Penjualan'),
+    'total_price': ('Kategori Produk dengan Pendapatan Tertinggi', 'Total Pendapatan (R$)'),
+    'price': ('Kategori Produk dengan Harga Rata-rata Tertinggi', 'Harga Rata-rata (R$)')
+}
+
+# Nama hari pada heatmap jam vs hari (Senin-Minggu)
+DAY_LABELS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+
+# Fungsi untuk membuat grafik tren jumlah pesanan dari deret waktu (lihat timeseries.chart_series)
+def order_trend_figure(series, granularity):
+    title_granularity = 'Harian' if granularity == 'Otomatis' else granularity
+    fig = px.line(series, x='purchase_date', y='order_count',
+                 title=f'Tren Jumlah Pesanan {title_granularity}')
+    fig.update_layout(xaxis_title='Tanggal', yaxis_title='Jumlah Pesanan')
+    return fig
+
+
+# Fungsi untuk membuat grafik n kategori produk teratas menurut kolom peringkat
+def category_ranking_figure(top_categories, column, n):
+    title, label = CATEGORY_RANKING_LABELS[column]
+    fig = px.bar(top_categories,
+                x=column, y='product_category_name_english',
+                title=f'{n} {title}',
+                labels={column: label, 'product_category_name_english': 'Kategori Produk'},
+                orientation='h')
+    fig.update_layout(yaxis={'categoryorder':'total ascending'})
+    return fig
+
+
+# Fungsi untuk membuat grafik hubungan jumlah penjualan dan pendapatan per kategori produk
+def category_relation_figure(category_stats):
+    # Jumlah penjualan dan pendapatan sudah tersedia dalam satu tabel per kategori
+    category_analysis = category_stats.rename(columns={'total_price': 'total_revenue'})
+
+    return px.scatter(category_analysis,
+                    x='sales_count',
+                    y='total_revenue',
+                    title='Hubungan antara Jumlah Penjualan dan Total Pendapatan per Kategori',
+                    labels={'sales_count': 'Jumlah Penjualan', 'total_revenue': 'Total Pendapatan (R$)'},
+                    hover_name='product_category_name_english',
+                    size='sales_count',
+                    color='total_revenue',
+                    color_continuous_scale='Viridis')
+
+
+# Fungsi untuk membuat grafik pola pembelian berdasarkan jam, hari, bulan, jam vs hari, dan lokasi
+def purchase_pattern_figures(time_data, pattern_data):
+    figures = {}
+
+    # Pola pembelian berdasarkan jam, hari, dan bulan
+    for name, label in [('hourly_orders', 'Jam (0-23)'), ('daily_orders', 'Hari'), ('monthly_orders', 'Bulan')]:
+        figures[name] = px.bar(x=time_data[name].index, y=time_data[name].values,
+                              labels={'x': label, 'y': 'Jumlah Pesanan'})
+
+    # Heatmap jam vs hari
+    hour_day_pivot = pattern_data['hour_day_pivot'].copy()
+    hour_day_pivot.columns = DAY_LABELS
+
+    figures['hour_day'] = px.imshow(hour_day_pivot,
+                                   labels=dict(x="Hari", y="Jam", color="Jumlah Pesanan"),
+                                   x=hour_day_pivot.columns,
+                                   y=hour_day_pivot.index,
+                                   color_continuous_scale='Viridis')
+
+    # Jumlah pesanan per negara bagian (irisan cube)
+    figures['state_orders'] = px.bar(pattern_data['state_orders'].head(10),
+                                     x='customer_state',
+                                     y='order_count',
+                                     title='10 Negara Bagian dengan Jumlah Pesanan Tertinggi',
+                                     labels={'customer_state': 'Negara Bagian', 'order_count': 'Jumlah Pesanan'},
+                                     color='order_count',
+                                     color_continuous_scale='Viridis')
+    return figures
+
+
+# Fungsi untuk membuat grafik performa penjual: jumlah penjual per negara bagian, rating per
+# kategori volume penjualan, dan rating per kategori waktu pengiriman
+def seller_figures(seller_data):
+    figures = {}
+
+    # Jumlah penjual per negara bagian
+    top_seller_states = seller_data['state_performance'].sort_values('seller_count', ascending=False).head(10)
+
+    figures['seller_states'] = px.bar(top_seller_states,
+                                      x='seller_state',
+                                      y='seller_count',
+                                      title='10 Negara Bagian dengan Jumlah Penjual Tertinggi',
+                                      labels={'seller_state': 'Negara Bagian', 'seller_count': 'Jumlah Penjual'},
+                                      color='avg_rating',
+                                      color_continuous_scale='RdYlGn',
+                                      text='avg_rating')
+    figures['seller_states'].update_traces(texttemplate='%{text:.2f}', textposition='outside')
+
+    # Rating rata-rata per kategori volume penjualan
+    sales_category_ratings = seller_data['seller_performance'].groupby('sales_category')['review_score'].agg(['mean', 'count']).reset_index()
+
+    figures['sales_category_ratings'] = px.bar(sales_category_ratings,
+                                               x='sales_category',
+                                               y='mean',
+                                               title='Rating Rata-rata Berdasarkan Volume Penjualan',
+                                               labels={'sales_category': 'Kategori Volume Penjualan', 'mean': 'Rating Rata-rata'},
+                                               color='mean',
+                                               color_continuous_scale='RdYlGn',
+                                               text='count')
+    figures['sales_category_ratings'].update_traces(texttemplate='%{text} penjual', textposition='outside')
+
+    # Rating rata-rata per kategori waktu pengiriman
+    figures['delivery_time_ratings'] = px.bar(seller_data['delivery_time_ratings'],
+                                              x='delivery_time_category',
+                                              y='mean',
+                                              title='Rating Rata-rata Berdasarkan Waktu Pengiriman',
+                                              labels={'delivery_time_category': 'Waktu Pengiriman', 'mean': 'Rating Rata-rata'},
+                                              color='mean',
+                                              color_continuous_scale='RdYlGn',
+                                              text='count')
+    figures['delivery_time_ratings'].update_traces(texttemplate='%{text} pesanan', textposition='outside')
+    return figures
+
+
+# Fungsi untuk membuat grafik waktu pengiriman (batang) dan rating (garis) per kategori jarak
+def delivery_distance_figure(distance_ratings):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(x=distance_ratings['distance_category'], y=distance_ratings['avg_delivery_time_days'],
+                         name='Waktu Pengiriman Rata-rata (hari)', text=distance_ratings['item_count'],
+                         texttemplate='%{text} item', textposition='outside'))
+    fig.add_trace(go.Scatter(x=distance_ratings['distance_category'], y=distance_ratings['avg_rating'],
+                             name='Rating Rata-rata', mode='lines+markers'), secondary_y=True)
+    fig.update_layout(title='Waktu Pengiriman dan Rating Berdasarkan Jarak Penjual ke Pelanggan',
+                      xaxis_title='Jarak Penjual ke Pelanggan')
+    fig.update_yaxes(title_text='Waktu Pengiriman Rata-rata (hari)', secondary_y=False)
+    fig.update_yaxes(title_text='Rating Rata-rata', secondary_y=True)
+    return fig
+
+
+# Fungsi untuk membuat grafik distribusi segmen pelanggan RFM dan karakteristik setiap segmen
+def rfm_figures(rfm_data):
+    figures = {}
+
+    # Distribusi segmen pelanggan
+    figures['segments'] = px.pie(rfm_data['segment_counts'],
+                                 values='count',
+                                 names='customer_segment',
+                                 title='Segmentasi Pelanggan Berdasarkan Analisis RFM',
+                                 color='customer_segment',
+                                 color_discrete_map=SEGMENT_COLORS)
+    figures['segments'].update_traces(textposition='inside', textinfo='percent+label')
+
+    # Karakteristik segmen pelanggan dari tabel segment_analysis yang sama
+    for column, title, label in [('avg_recency', 'Rata-rata Recency per Segmen (hari)', 'Rata-rata Recency (hari)'),
+                                 ('avg_frequency', 'Rata-rata Frequency per Segmen (pesanan)', 'Rata-rata Frequency (pesanan)'),
+                                 ('avg_monetary', 'Rata-rata Monetary per Segmen (R$)', 'Rata-rata Monetary (R$)'),
+                                 ('customer_count', 'Jumlah Pelanggan per Segmen', 'Jumlah Pelanggan')]:
+        figures[column] = px.bar(rfm_data['segment_analysis'],
+                                 x='customer_segment',
+                                 y=column,
+                                 title=title,
+                                 labels={'customer_segment': 'Segmen Pelanggan', column: label},
+                                 color='customer_segment',
+                                 color_discrete_map=SEGMENT_COLORS)
+    return figures
+
+
+# Fungsi untuk membuat grafik analisis kohort: heatmap retensi kohort bulanan, distribusi jumlah
+# pesanan per pelanggan, dan distribusi segmen RFM per customer_unique_id
+def cohort_figures(cohort_data):
+    figures = {}
+
+    # Bulan ke-0 selalu 100%, sehingga heatmap dimulai dari bulan pertama setelah akuisisi
+    retention = cohort_data['retention'].iloc[:, 1:] * 100
+    figures['retention'] = px.imshow(retention,
+                                     labels=dict(x="Bulan Setelah Pembelian Pertama", y="Kohort", color="Retensi (%)"),
+                                     x=retention.columns,
+                                     y=retention.index.strftime('%Y-%m'),
+                                     title='Retensi Kohort Bulanan (% Pelanggan yang Kembali Berbelanja)',
+                                     color_continuous_scale='Viridis',
+                                     aspect='auto')
+
+    figures['order_frequency'] = px.bar(cohort_data['order_frequency'],
+                                        x='frequency',
+                                        y='customer_count',
+                                        title='Distribusi Jumlah Pesanan per Pelanggan',
+                                        labels={'frequency': 'Jumlah Pesanan', 'customer_count': 'Jumlah Pelanggan'},
+                                        log_y=True)
+
+    figures['segments'] = px.pie(cohort_data['segment_counts'],
+                                 values='count',
+                                 names='customer_segment',
+                                 title='Segmentasi RFM per Pelanggan Unik (customer_unique_id)',
+                                 color='customer_segment',
+                                 color_discrete_map=SEGMENT_COLORS)
+    figures['segments'].update_traces(textposition='inside', textinfo='percent+label')
+    return figures
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from ingest import read_table
+
+# Batas wilayah Brasil (lintang dan bujur); titik geolocation di luar batas ini dianggap salah input
+BRAZIL_LAT = (-33.75, 5.27)
+BRAZIL_LNG = (-73.99, -34.79)
+
+# Radius rata-rata bumi (km) untuk rumus haversine
+EARTH_RADIUS_KM = 6371.0
+
+# Kategori jarak penjual ke pelanggan (km), interval tertutup di kiri [a, b)
+DISTANCE_BINS = [0, 100, 500, 1000, 2000, float('inf')]
+DISTANCE_LABELS = ['< 100 km', '100-500 km', '500-1000 km', '1000-2000 km', '> 2000 km']
+
+
+# Fungsi untuk membuat tabel centroid per prefix kode pos dari tabel geolocation (sekitar 1 juta
+# baris menjadi satu baris per prefix): rata-rata koordinat setiap prefix, tanpa titik di luar
+# wilayah Brasil. Terurut menurut prefix sehingga dapat dicari dengan binary search.
+# geolocation dibaca langsung dari cache kolumnar (hanya tiga kolom) dan tidak disimpan di
+# dataset, sehingga yang tetap di memori hanya tabel centroid
+def build_zip_centroids(dataset):
+    geolocation = read_table('geolocation', dataset.data_dir,
+                             columns=['geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng'])
+    lat, lng = geolocation['geolocation_lat'], geolocation['geolocation_lng']
+    in_bounds = lat.between(*BRAZIL_LAT) & lng.between(*BRAZIL_LNG)
+
+    centroids = geolocation[in_bounds].groupby('geolocation_zip_code_prefix')[['geolocation_lat', 'geolocation_lng']].mean()
+    return pd.DataFrame({
+        'zip_code_prefix': centroids.index.to_numpy().astype('int32'),
+        'lat': centroids['geolocation_lat'].to_numpy(),
+        'lng': centroids['geolocation_lng'].to_numpy()
+    })
+
+
+# Fungsi untuk mengambil koordinat centroid sejumlah prefix kode pos dengan binary search pada
+# tabel centroid (NaN jika prefix tidak ada). Mengembalikan array lintang dan bujur
+def centroid_lookup(centroids, zip_prefixes):
+    prefixes = centroids['zip_code_prefix'].to_numpy()
+    zip_prefixes = np.asarray(zip_prefixes)
+    if len(prefixes) == 0:
+        missing = np.full(len(zip_prefixes), np.nan)
+        return missing, missing.copy()
+
+    positions = np.minimum(np.searchsorted(prefixes, zip_prefixes), len(prefixes) - 1)
+    found = prefixes[positions] == zip_prefixes
+    lat = np.where(found, centroids['lat'].to_numpy()[positions], np.nan)
+    lng = np.where(found, centroids['lng'].to_numpy()[positions], np.nan)
+    return lat, lng
+
+
+# Fungsi untuk menghitung jarak lingkaran besar (km) antara pasangan koordinat secara tervektorisasi
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(values, dtype='float64')) for values in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+# Fungsi untuk mengelompokkan jarak menjadi kategori DISTANCE_LABELS
+def distance_category(distance_km):
+    return pd.cut(distance_km, bins=DISTANCE_BINS, labels=DISTANCE_LABELS, right=False)
@@ -0,0 +1,486 @@
+import argparse
+import calendar
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from analysis import DELIVERY_TIME_LABELS, delivery_time_category
+from cube import CUBE_DIMENSIONS
+from ingest import CACHE_DIR_NAME, DATA_DIR, TABLE_SCHEMAS, iter_csv_tail, read_table
+from ranking import TOP_K, merge_top_k, top_k_positions
+
+# Tabel yang dibaca secara inkremental; file CSV-nya diasumsikan append-only
+INCREMENTAL_TABLES = ['orders', 'order_items', 'order_reviews']
+
+# Direktori penyimpanan agregat parsial (di dalam direktori cache)
+STATE_DIR_NAME = 'aggregates'
+
+# Versi format agregat tersimpan; naikkan jika FRAME_SCHEMAS berubah agar agregat dibangun ulang
+STATE_VERSION = 3
+
+# Skema setiap frame agregat parsial: kolom kunci, kolom nilai beserta tipe dan reducer-nya.
+# Reducer menentukan cara menggabungkan dua agregat parsial (sum atau max)
+FRAME_SCHEMAS = {
+    # Pemetaan pesanan ke pelanggan, untuk mengatribusikan item ke pelanggan
+    'order_customers': (['order_id'], {'customer_id': ('str', 'first')}),
+    # Jumlah dan total skor ulasan per pesanan, untuk rating rata-rata per pesanan
+    'order_reviews': (['order_id'], {'review_sum': ('float64', 'sum'), 'review_count': ('int64', 'sum')}),
+    # Total nilai item yang pesanannya belum tercatat (item datang lebih dulu dari pesanannya);
+    # diatribusikan ke pelanggan saat pesanannya masuk
+    'pending_items': (['order_id'], {'total_price': ('float64', 'sum')}),
+    # Jumlah item per pasangan pesanan dan penjual, untuk rating per penjual
+    'order_sellers': (['order_id', 'seller_id'], {'n_items': ('int64', 'sum')}),
+    # Jumlah pesanan per tanggal dan jam pembelian
+    'order_times': (['purchase_date', 'purchase_hour'], {'order_count': ('int64', 'sum')}),
+    # Cube jumlah pesanan dengan dimensi yang sama seperti cube.build_order_cube
+    'order_cube': (CUBE_DIMENSIONS, {'order_count': ('int64', 'sum')}),
+    # Waktu pengiriman pesanan yang sudah dikirim, untuk rating per kategori waktu pengiriman
+    'order_delivery': (['order_id'], {'delivery_time_days': ('float64', 'first')}),
+    # Jumlah dan total skor ulasan per kategori waktu pengiriman
+    'delivery_ratings': (['delivery_time_category'], {'review_sum': ('float64', 'sum'), 'review_count': ('int64', 'sum')}),
+    # Agregat RFM per pelanggan
+    'customers': (['customer_id'], {'last_purchase': ('datetime64[ns]', 'max'),
+                                    'frequency': ('int64', 'sum'),
+                                    'monetary': ('float64', 'sum')}),
+    # Agregat penjualan dan rating per penjual
+    'sellers': (['seller_id'], {'sales_count': ('int64', 'sum'),
+                                'price_sum': ('float64', 'sum'),
+                                'rating_sum': ('float64', 'sum'),
+                                'rating_count': ('int64', 'sum')}),
+    # Agregat penjualan per produk (dipetakan ke kategori saat dibaca)
+    'products': (['product_id'], {'sales_count': ('int64', 'sum'),
+                                  'total_price_sum': ('float64', 'sum'),
+                                  'price_sum': ('float64', 'sum')})
+}
+
+# Agregat skalar; metrik rata-rata disimpan sebagai pasangan sum/count agar tetap eksak
+EMPTY_TOTALS = {
+    'order_count': 0,
+    'revenue_sum': 0.0,
+    'review_sum': 0.0,
+    'review_count': 0,
+    'delivery_sum': 0.0,
+    'delivery_count': 0
+}
+
+# Peringkat penjual yang dipelihara secara inkremental: kolom performa penjual -> kolom agregat
+TOP_SELLER_COLUMNS = {
+    'sales_count': 'sales_count',
+    'total_revenue': 'price_sum'
+}
+
+
+# Fungsi untuk membuat frame agregat kosong sesuai skemanya
+def empty_frame(name):
+    keys, columns = FRAME_SCHEMAS[name]
+    key_dtypes = {'purchase_date': 'datetime64[ns]', 'purchase_hour': 'int64', 'purchase_day_num': 'int64'}
+    frame = pd.DataFrame({col: pd.Series(dtype=key_dtypes.get(col, 'str')) for col in keys})
+    for col, (dtype, _) in columns.items():
+        frame[col] = pd.Series(dtype=dtype)
+    return frame.set_index(keys)
+
+
+# Fungsi untuk menggabungkan agregat parsial lama dengan agregat dari data baru
+def merge_partials(name, state, delta):
+    if delta is None or len(delta) == 0:
+        return state
+    keys, columns = FRAME_SCHEMAS[name]
+    delta = delta[list(columns)].rename_axis(keys)
+    if len(state) == 0:
+        return delta
+
+    reducers = {col: reducer for col, (_, reducer) in columns.items()}
+    return pd.concat([state, delta]).groupby(level=keys, sort=False, dropna=False).agg(reducers)
+
+
+# Agregat parsial yang diperbarui secara inkremental dari baris baru pada orders, order_items,
+# dan order_reviews. Baris baru ditentukan dari posisi terakhir setiap file (offset byte) yang
+# disimpan bersama agregat, sehingga refresh hanya membaca data baru. Pesanan yang datang
+# terlambat (waktu pembeliannya lebih lama dari pesanan yang sudah tercatat) tetap digabungkan
+# karena agregat parsial tidak bergantung pada urutan baris; watermark (waktu pembelian terbaru
+# yang sudah tercatat) hanya disimpan sebagai informasi kesegaran data
+class IncrementalAggregates:
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.frames = {name: empty_frame(name) for name in FRAME_SCHEMAS}
+        self.totals = dict(EMPTY_TOTALS)
+        self.offsets = {name: 0 for name in INCREMENTAL_TABLES}
+        self.watermark = None
+        self.top = {}
+        self._customer_states = None
+        self._new_orders = []
+        self._new_order_ids = pd.Index([], dtype='str')
+        self.generation = 0
+        self.version = None
+        self._lock = threading.Lock()
+
+    @property
+    def state_dir(self):
+        return os.path.join(self.data_dir, CACHE_DIR_NAME, STATE_DIR_NAME)
+
+    # Memuat agregat yang tersimpan; jika belum ada, mulai dari agregat kosong
+    @classmethod
+    def load(cls, data_dir=DATA_DIR):
+        aggregates = cls(data_dir)
+        state_path = os.path.join(aggregates.state_dir, 'state.json')
+        if not os.path.exists(state_path):
+            return aggregates
+
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get('state_version') != STATE_VERSION:
+            return aggregates
+
+        generation_dir = os.path.join(aggregates.state_dir, str(state['generation']))
+        for name, (keys, _) in FRAME_SCHEMAS.items():
+            frame = feather.read_feather(os.path.join(generation_dir, f'{name}.feather'))
+            aggregates.frames[name] = frame.set_index(keys)
+
+        aggregates.totals = state['totals']
+        aggregates.offsets = state['offsets']
+        aggregates.watermark = pd.Timestamp(state['watermark']) if state['watermark'] else None
+        aggregates.generation = state['generation']
+        return aggregates
+
+    # Menyimpan agregat ke direktori generasi baru, lalu mengganti state.json sebagai penanda
+    # generasi yang aktif sehingga pembaca tidak pernah melihat agregat setengah tersimpan
+    def save(self):
+        generation = self.generation + 1
+        generation_dir = os.path.join(self.state_dir, str(generation))
+        os.makedirs(generation_dir, exist_ok=True)
+
+        for name, frame in self.frames.items():
+            feather.write_feather(frame.reset_index(), os.path.join(generation_dir, f'{name}.feather'))
+
+        state = {
+            'state_version': STATE_VERSION,
+            'generation': generation,
+            'totals': self.totals,
+            'offsets': self.offsets,
+            'watermark': self.watermark.isoformat() if self.watermark is not None else None
+        }
+        tmp_path = os.path.join(self.state_dir, f'state.json.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(self.state_dir, 'state.json'))
+
+        # Hapus generasi lama
+        for entry in os.listdir(self.state_dir):
+            if entry.isdigit() and int(entry) != generation:
+                shutil.rmtree(os.path.join(self.state_dir, entry), ignore_errors=True)
+        self.generation = generation
+
+    # Memperbarui agregat dengan baris baru sejak refresh terakhir. Baris baru dibaca dan diproses
+    # per potongan (lihat ingest.iter_csv_tail), sehingga memori pembacaan tidak bergantung pada
+    # ukuran file (mode streaming); frame per pesanan tetap bertambah sebanding jumlah pesanan.
+    # Jika salah satu file sumber lebih kecil dari offset yang tersimpan (file ditulis ulang),
+    # agregat dibangun ulang dari awal. final menandakan feed sudah selesai ditulis, sehingga record
+    # terakhir tanpa baris baru penutup ikut dibaca
+    def refresh(self, version=None, final=False):
+        with self._lock:
+            if version is not None and version == self.version:
+                return False
+
+            sizes = {name: os.path.getsize(os.path.join(self.data_dir, TABLE_SCHEMAS[name]['file']))
+                     for name in INCREMENTAL_TABLES}
+            if any(sizes[name] < self.offsets[name] for name in INCREMENTAL_TABLES):
+                self.frames = {name: empty_frame(name) for name in FRAME_SCHEMAS}
+                self.totals = dict(EMPTY_TOTALS)
+                self.offsets = {name: 0 for name in INCREMENTAL_TABLES}
+                self.watermark = None
+                self.top = {}
+
+            # Urutan penting: pesanan dulu, lalu item (butuh pelanggan dari pesanan),
+            # lalu ulasan (butuh penjual dari item)
+            changed = False
+            self._customer_states = None
+            for name, apply in [('orders', self._apply_orders),
+                                ('order_items', self._apply_items),
+                                ('order_reviews', self._apply_reviews)]:
+                for new_rows, offset in iter_csv_tail(name, self.offsets[name], self.data_dir, final=final):
+                    if len(new_rows):
+                        apply(new_rows)
+                        changed = True
+                    self.offsets[name] = offset
+                self._flush_orders()
+
+            if changed:
+                try:
+                    self.save()
+                except OSError:
+                    pass
+
+            self.version = version
+            return changed
+
+    # Negara bagian setiap pelanggan (tabel dimensi), dibaca sekali per refresh
+    def customer_states(self):
+        if self._customer_states is None:
+            customers = read_table('customers', self.data_dir, columns=['customer_id', 'customer_state'])
+            customers = customers.drop_duplicates('customer_id')
+            self._customer_states = pd.Series(customers['customer_state'].astype('str').to_numpy(),
+                                              index=customers['customer_id'].astype('str'))
+        return self._customer_states
+
+    # Menggabungkan pemetaan pesanan ke pelanggan dari seluruh potongan refresh ini sekaligus,
+    # sehingga frame yang terakumulasi tidak disalin ulang di setiap potongan
+    def _flush_orders(self):
+        if self._new_orders:
+            self.frames['order_customers'] = pd.concat([self.frames['order_customers'], *self._new_orders])
+        self._new_orders = []
+        self._new_order_ids = pd.Index([], dtype='str')
+
+    def _apply_orders(self, orders_df):
+        # Lewati pesanan yang sudah pernah diproses (baris yang dikirim ulang), baik yang sudah
+        # tersimpan maupun dari potongan sebelumnya pada refresh ini. Indeks tersimpan tidak berubah
+        # selama refresh, sehingga hash get_indexer-nya cukup dibangun sekali
+        known = self.frames['order_customers'].index
+        orders_df = orders_df[known.get_indexer(orders_df['order_id']) < 0].drop_duplicates('order_id')
+        orders_df = orders_df[~orders_df['order_id'].isin(self._new_order_ids)]
+        if len(orders_df) == 0:
+            return
+        self._new_order_ids = self._new_order_ids.append(pd.Index(orders_df['order_id']))
+
+        purchase = orders_df['order_purchase_timestamp']
+        watermark = purchase.max()
+        if self.watermark is None or watermark > self.watermark:
+            self.watermark = watermark
+
+        delivered = orders_df[orders_df['order_status'] == 'delivered']
+        delivery_days = (delivered['order_delivered_customer_date'] - delivered['order_purchase_timestamp']).dt.days
+        self.totals['order_count'] += int(len(orders_df))
+        self.totals['delivery_sum'] += float(delivery_days.sum())
+        self.totals['delivery_count'] += int(delivery_days.count())
+
+        order_times = pd.DataFrame({
+            'purchase_date': purchase.dt.normalize(),
+            'purchase_hour': purchase.dt.hour.astype('int64')
+        }).groupby(['purchase_date', 'purchase_hour']).size().to_frame('order_count')
+
+        # Item yang sudah tercatat sebelum pesanannya masuk menyumbang nilai monetary pelanggannya
+        pending_items = self.frames['pending_items']
+        pending_price = orders_df['order_id'].map(pending_items['total_price']).fillna(0.0)
+        customers = orders_df.assign(monetary=pending_price).groupby('customer_id').agg(
+            last_purchase=('order_purchase_timestamp', 'max'),
+            frequency=('order_id', 'size'),
+            monetary=('monetary', 'sum')
+        )
+        if len(pending_items):
+            self.frames['pending_items'] = pending_items.drop(orders_df['order_id'], errors='ignore')
+
+        order_customers = orders_df.set_index('order_id')[['customer_id']]
+
+        # Nilai kosong tetap menjadi kunci agar total setiap irisan sama dengan jumlah pesanan
+        order_cube = pd.DataFrame({
+            'purchase_date': purchase.dt.normalize(),
+            'purchase_hour': purchase.dt.hour.astype('int64'),
+            'purchase_day_num': purchase.dt.dayofweek.astype('int64'),
+            'customer_state': orders_df['customer_id'].map(self.customer_states()),
+            'order_status': orders_df['order_status'].astype('str')
+        }).groupby(CUBE_DIMENSIONS, dropna=False).size().to_frame('order_count')
+
+        # Ulasan yang sudah tercatat sebelum pesanannya masuk dihitung ke kategori waktu pengirimannya
+        order_delivery = pd.DataFrame({'delivery_time_days': delivery_days.astype('float64').to_numpy()},
+                                      index=delivered['order_id'])
+        reviews = self.frames['order_reviews'].reindex(order_delivery.index).dropna()
+        delivery_ratings = reviews.groupby(delivery_time_category(order_delivery.loc[reviews.index, 'delivery_time_days']),
+                                           observed=True)[['review_sum', 'review_count']].sum()
+
+        self.frames['order_cube'] = merge_partials('order_cube', self.frames['order_cube'], order_cube)
+        self.frames['order_delivery'] = merge_partials('order_delivery', self.frames['order_delivery'], order_delivery)
+        self.frames['delivery_ratings'] = merge_partials('delivery_ratings', self.frames['delivery_ratings'],
+                                                         delivery_ratings.set_axis(delivery_ratings.index.astype('str')))
+        self.frames['order_times'] = merge_partials('order_times', self.frames['order_times'], order_times)
+        self.frames['customers'] = merge_partials('customers', self.frames['customers'], customers)
+        self._new_orders.append(order_customers)
+
+    def _apply_items(self, order_items_df):
+        order_items_df = order_items_df.assign(total_price=order_items_df['price'] + order_items_df['freight_value'])
+        self.totals['revenue_sum'] += float(order_items_df['total_price'].sum())
+
+        # Rating rata-rata pesanan yang sudah punya ulasan; setiap item menyumbang satu rating
+        order_reviews = self.frames['order_reviews']
+        order_rating = order_items_df['order_id'].map(order_reviews['review_sum'] / order_reviews['review_count'])
+
+        sellers = order_items_df.assign(order_rating=order_rating).groupby('seller_id').agg(
+            sales_count=('order_id', 'count'),
+            price_sum=('price', 'sum'),
+            rating_sum=('order_rating', 'sum'),
+            rating_count=('order_rating', 'count')
+        )
+
+        products = order_items_df.groupby('product_id').agg(
+            sales_count=('order_id', 'size'),
+            total_price_sum=('total_price', 'sum'),
+            price_sum=('price', 'sum')
+        )
+
+        order_sellers = order_items_df.groupby(['order_id', 'seller_id']).size().to_frame('n_items')
+
+        # Nilai monetary diatribusikan ke pelanggan melalui pesanannya; nilai item yang pesanannya
+        # belum tercatat disimpan per pesanan sampai pesanannya masuk (lihat _apply_orders)
+        customer_id = order_items_df['order_id'].map(self.frames['order_customers']['customer_id']).rename('customer_id')
+        monetary = order_items_df['total_price'].groupby(customer_id).sum()
+        pending_items = order_items_df[customer_id.isna()].groupby('order_id')[['total_price']].sum()
+        customers = pd.DataFrame({
+            'last_purchase': pd.Series(pd.NaT, index=monetary.index, dtype='datetime64[ns]'),
+            'frequency': 0,
+            'monetary': monetary
+        })
+
+        self.frames['sellers'] = merge_partials('sellers', self.frames['sellers'], sellers)
+        self._update_top_sellers(sellers.index)
+        self.frames['products'] = merge_partials('products', self.frames['products'], products)
+        self.frames['order_sellers'] = merge_partials('order_sellers', self.frames['order_sellers'], order_sellers)
+        self.frames['customers'] = merge_partials('customers', self.frames['customers'], customers)
+        self.frames['pending_items'] = merge_partials('pending_items', self.frames['pending_items'], pending_items)
+
+    # Top-k penjual hanya diperbarui dengan penjual yang mendapat item baru; jumlah penjualan dan
+    # pendapatan hanya bisa naik sehingga hasilnya tetap eksak (lihat ranking.merge_top_k)
+    def _update_top_sellers(self, seller_ids):
+        for name, column in TOP_SELLER_COLUMNS.items():
+            if name in self.top:
+                updated = self.frames['sellers'].loc[seller_ids, column]
+                self.top[name] = merge_top_k(self.top[name], updated)
+
+    def _apply_reviews(self, order_reviews_df):
+        self.totals['review_sum'] += float(order_reviews_df['review_score'].sum())
+        self.totals['review_count'] += int(order_reviews_df['review_score'].count())
+
+        delta = order_reviews_df.groupby('order_id').agg(
+            review_sum=('review_score', 'sum'),
+            review_count=('review_score', 'count')
+        ).astype({'review_sum': 'float64'})
+
+        # Rating rata-rata pesanan sebelum dan sesudah ulasan baru
+        before = self.frames['order_reviews'].reindex(delta.index)
+        old_count = before['review_count'].fillna(0)
+        old_mean = (before['review_sum'] / before['review_count']).fillna(0)
+        new_mean = (before['review_sum'].fillna(0) + delta['review_sum']) / (old_count + delta['review_count'])
+
+        # Item yang sudah tercatat pada pesanan tersebut menyumbang selisih rating ke penjualnya
+        order_sellers = self.frames['order_sellers']
+        affected = order_sellers[delta.index.get_indexer(order_sellers.index.get_level_values('order_id')) >= 0].reset_index()
+        if len(affected):
+            order_id = affected['order_id']
+            affected['rating_sum'] = affected['n_items'] * (order_id.map(new_mean) - order_id.map(old_mean))
+            affected['rating_count'] = affected['n_items'] * (order_id.map(old_count) == 0)
+            sellers = affected.groupby('seller_id')[['rating_sum', 'rating_count']].sum()
+            sellers['sales_count'] = 0
+            sellers['price_sum'] = 0.0
+            self.frames['sellers'] = merge_partials('sellers', self.frames['sellers'], sellers)
+
+        # Ulasan pesanan yang sudah dikirim dihitung ke kategori waktu pengirimannya
+        delivery_time_days = delta.index.to_series().map(self.frames['order_delivery']['delivery_time_days'])
+        delivery_ratings = delta.groupby(delivery_time_category(delivery_time_days), observed=True)[['review_sum', 'review_count']].sum()
+        self.frames['delivery_ratings'] = merge_partials('delivery_ratings', self.frames['delivery_ratings'],
+                                                         delivery_ratings.set_axis(delivery_ratings.index.astype('str')))
+
+        self.frames['order_reviews'] = merge_partials('order_reviews', self.frames['order_reviews'], delta)
+
+    # Metrik utama dari agregat (selain metrik yang dihitung dari customers dan products)
+    def metric_totals(self):
+        totals = self.totals
+        return {
+            'total_orders': totals['order_count'],
+            'total_revenue': totals['revenue_sum'],
+            'avg_rating': totals['review_sum'] / totals['review_count'] if totals['review_count'] else np.nan,
+            'avg_delivery_time': totals['delivery_sum'] / totals['delivery_count'] if totals['delivery_count'] else np.nan
+        }
+
+    # Hasil analisis waktu dengan struktur yang sama seperti time_analysis
+    def time_results(self):
+        order_times = self.frames['order_times'].reset_index()
+        dates = order_times['purchase_date']
+
+        hourly_orders = order_times.groupby('purchase_hour')['order_count'].sum().rename_axis('purchase_hour')
+        daily_orders = order_times.groupby(dates.dt.day_name())['order_count'].sum().reindex(list(calendar.day_name))
+        monthly_orders = order_times.groupby(dates.dt.month_name())['order_count'].sum().reindex(list(calendar.month_name)[1:])
+
+        daily_order_counts = order_times.groupby('purchase_date')['order_count'].sum().reset_index()
+
+        return {
+            'hourly_orders': hourly_orders.rename('count'),
+            'daily_orders': daily_orders.rename_axis('purchase_day').rename('count'),
+            'monthly_orders': monthly_orders.rename_axis('purchase_month').rename('count'),
+            'daily_order_counts': daily_order_counts
+        }
+
+    # Top-k penjual menurut kolom performa penjual (Series berindeks seller_id, terurut menurun).
+    # Dihitung dari seluruh agregat saat pertama kali dibutuhkan, lalu dipelihara oleh refresh
+    def top_sellers(self, name, k=TOP_K):
+        with self._lock:
+            if name not in self.top:
+                sellers = self.frames['sellers'][TOP_SELLER_COLUMNS[name]].sort_index()
+                self.top[name] = sellers.iloc[top_k_positions(sellers.to_numpy(), TOP_K)]
+            return self.top[name].iloc[:k]
+
+    # Agregat penjualan per kategori produk (tanpa pengurutan; lihat product_category_analysis)
+    def category_stats(self, products_with_category_df):
+        products = self.frames['products'].reset_index()
+        category = products['product_id'].map(products_with_category_df.set_index('product_id')['product_category_name_english'])
+        categories = products.groupby(category)[['sales_count', 'total_price_sum', 'price_sum']].sum()
+        categories.index.name = 'product_category_name_english'
+
+        return pd.DataFrame({
+            'sales_count': categories['sales_count'],
+            'total_price': categories['total_price_sum'],
+            'price': categories['price_sum'] / categories['sales_count']
+        }).reset_index()
+
+    # Performa per penjual dengan kolom yang sama seperti seller_performance_analysis
+    def seller_performance(self, sellers_df):
+        sellers = self.frames['sellers'].sort_index()
+        seller_info = sellers_df.drop_duplicates('seller_id').set_index('seller_id').reindex(sellers.index)
+
+        return pd.DataFrame({
+            'sales_count': sellers['sales_count'],
+            'total_revenue': sellers['price_sum'],
+            'avg_price': sellers['price_sum'] / sellers['sales_count'],
+            'seller_state': seller_info['seller_state'],
+            'seller_city': seller_info['seller_city'],
+            'review_score': sellers['rating_sum'] / sellers['rating_count'].where(sellers['rating_count'] > 0)
+        }).rename_axis('seller_id').reset_index()
+
+    # Cube jumlah pesanan dengan struktur yang sama seperti cube.build_order_cube (terurut menurut
+    # dimensinya, sehingga filter tanggal cukup berupa binary search)
+    def order_cube(self):
+        cube = self.frames['order_cube'].reset_index()
+        cube = cube.sort_values(CUBE_DIMENSIONS, na_position='last', ignore_index=True)
+        for col in ['purchase_hour', 'purchase_day_num']:
+            cube[col] = cube[col].astype('int32')
+        for col in ['customer_state', 'order_status']:
+            cube[col] = cube[col].astype('category')
+        return cube
+
+    # Rating rata-rata per kategori waktu pengiriman dengan struktur yang sama seperti
+    # delivery_time_rating_analysis
+    def delivery_time_ratings(self):
+        ratings = self.frames['delivery_ratings'].reindex(DELIVERY_TIME_LABELS).dropna()
+        return pd.DataFrame({
+            'delivery_time_category': pd.Categorical(ratings.index, categories=DELIVERY_TIME_LABELS, ordered=True),
+            'mean': ratings['review_sum'] / ratings['review_count'],
+            'count': ratings['review_count'].astype('int64')
+        }).reset_index(drop=True)
+
+    # Agregat RFM per pelanggan (last_purchase, frequency, monetary)
+    def customer_aggregates(self):
+        return self.frames['customers'].sort_index().reset_index()
+
+
+if __name__ == "__main__":
+    # Refresh agregat dari baris baru, misalnya dijalankan terjadwal setelah data feed diperbarui
+    parser = argparse.ArgumentParser(description="Perbarui agregat inkremental dari baris baru")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--final', action='store_true',
+                        help="feed sudah selesai ditulis; baca juga record terakhir tanpa baris baru penutup")
+    args = parser.parse_args()
+
+    aggregates = IncrementalAggregates.load(args.data_dir)
+    changed = aggregates.refresh(final=args.final)
+    print(f"Agregat {'diperbarui' if changed else 'tidak berubah'}; watermark: {aggregates.watermark}")
@@ -0,0 +1,369 @@
+import concurrent.futures
+import hashlib
+import io
+import multiprocessing
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Direktori dataset dan direktori cache kolumnar
+DATA_DIR = 'data'
+CACHE_DIR_NAME = '.cache'
+
+# Versi skema; naikkan jika TABLE_SCHEMAS berubah agar cache lama tidak dipakai
+SCHEMA_VERSION = 1
+
+# Format timestamp yang digunakan di seluruh file CSV dataset e-commerce
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Ukuran potongan (byte) untuk mem-parsing satu file CSV besar secara paralel
+CHUNK_BYTES = 32 << 20
+
+# Tabel yang boleh dipotong per baris fisik: tidak punya field teks yang bisa berisi baris baru
+# (berbeda dengan komentar pada order_reviews)
+SPLITTABLE_TABLES = ['geolocation', 'order_items', 'orders']
+
+# Skema setiap tabel: nama file, tipe kolom eksplisit, dan kolom timestamp
+TABLE_SCHEMAS = {
+    'customers': {
+        'file': 'customers_dataset.csv',
+        'dtypes': {
+            'customer_id': 'str',
+            'customer_unique_id': 'str',
+            'customer_zip_code_prefix': 'int32',
+            'customer_city': 'category',
+            'customer_state': 'category'
+        },
+        'timestamps': []
+    },
+    'geolocation': {
+        'file': 'geolocation_dataset.csv',
+        'dtypes': {
+            'geolocation_zip_code_prefix': 'int32',
+            'geolocation_lat': 'float64',
+            'geolocation_lng': 'float64',
+            'geolocation_city': 'category',
+            'geolocation_state': 'category'
+        },
+        'timestamps': []
+    },
+    'order_items': {
+        'file': 'order_items_dataset.csv',
+        'dtypes': {
+            'order_id': 'str',
+            'order_item_id': 'int16',
+            'product_id': 'str',
+            'seller_id': 'str',
+            'price': 'float64',
+            'freight_value': 'float64'
+        },
+        'timestamps': ['shipping_limit_date']
+    },
+    'order_payments': {
+        'file': 'order_payments_dataset.csv',
+        'dtypes': {
+            'order_id': 'str',
+            'payment_sequential': 'int16',
+            'payment_type': 'category',
+            'payment_installments': 'int16',
+            'payment_value': 'float64'
+        },
+        'timestamps': []
+    },
+    'order_reviews': {
+        'file': 'order_reviews_dataset.csv',
+        'dtypes': {
+            'review_id': 'str',
+            'order_id': 'str',
+            'review_score': 'int8',
+            'review_comment_title': 'str',
+            'review_comment_message': 'str'
+        },
+        'timestamps': ['review_creation_date', 'review_answer_timestamp']
+    },
+    'orders': {
+        'file': 'orders_dataset.csv',
+        'dtypes': {
+            'order_id': 'str',
+            'customer_id': 'str',
+            'order_status': 'category'
+        },
+        'timestamps': ['order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+                       'order_delivered_customer_date', 'order_estimated_delivery_date']
+    },
+    'products': {
+        'file': 'products_dataset.csv',
+        'dtypes': {
+            'product_id': 'str',
+            'product_category_name': 'str',
+            'product_name_lenght': 'float32',
+            'product_description_lenght': 'float32',
+            'product_photos_qty': 'float32',
+            'product_weight_g': 'float32',
+            'product_length_cm': 'float32',
+            'product_height_cm': 'float32',
+            'product_width_cm': 'float32'
+        },
+        'timestamps': []
+    },
+    'sellers': {
+        'file': 'sellers_dataset.csv',
+        'dtypes': {
+            'seller_id': 'str',
+            'seller_zip_code_prefix': 'int32',
+            'seller_city': 'category',
+            'seller_state': 'category'
+        },
+        'timestamps': []
+    },
+    'category_name_translation': {
+        'file': 'product_category_name_translation.csv',
+        'dtypes': {
+            'product_category_name': 'str',
+            'product_category_name_english': 'str'
+        },
+        'timestamps': []
+    }
+}
+
+
+# Fungsi untuk membuat fingerprint file sumber (ukuran + waktu modifikasi, opsional hash isi)
+def source_fingerprint(path, content_hash=False):
+    stat = os.stat(path)
+    digest = hashlib.sha1(f'{SCHEMA_VERSION}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+
+    if content_hash:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+    return digest.hexdigest()[:16]
+
+
+# Fungsi untuk membuat fingerprint seluruh dataset; hanya memanggil os.stat sehingga cukup murah
+# untuk dihitung pada setiap rerun dan dipakai sebagai kunci cache hasil analisis
+def dataset_fingerprint(data_dir=DATA_DIR):
+    digest = hashlib.sha1(str(SCHEMA_VERSION).encode())
+
+    for name, schema in sorted(TABLE_SCHEMAS.items()):
+        path = os.path.join(data_dir, schema['file'])
+        fingerprint = source_fingerprint(path) if os.path.exists(path) else 'missing'
+        digest.update(f'{name}:{fingerprint};'.encode())
+
+    return digest.hexdigest()[:16]
+
+
+# Fungsi untuk mengonversi kolom timestamp sesuai skema tabel
+def convert_timestamps(df, name):
+    for col in TABLE_SCHEMAS[name]['timestamps']:
+        df[col] = pd.to_datetime(df[col], format=TIMESTAMP_FORMAT)
+    return df
+
+
+# Fungsi untuk mem-parsing blok baris CSV (diawali header) sesuai skema tabel
+def parse_csv_block(name, header, block):
+    df = pd.read_csv(io.BytesIO(header + block), dtype=TABLE_SCHEMAS[name]['dtypes'])
+    return convert_timestamps(df, name)
+
+
+# Fungsi untuk membaca dan mem-parsing satu file CSV sesuai skemanya
+def parse_csv(name, data_dir=DATA_DIR):
+    schema = TABLE_SCHEMAS[name]
+    df = pd.read_csv(os.path.join(data_dir, schema['file']), dtype=schema['dtypes'])
+    return convert_timestamps(df, name)
+
+
+# Fungsi untuk membagi isi file CSV (tanpa header) menjadi rentang byte berukuran sekitar
+# chunk_bytes; setiap batas digeser ke akhir baris sehingga tidak ada baris yang terpotong
+def csv_ranges(path, chunk_bytes=CHUNK_BYTES):
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        start = len(f.readline())
+        ranges = []
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+# Fungsi untuk mem-parsing satu rentang byte file CSV (dijalankan di proses worker), termasuk
+# konversi timestamp
+def parse_csv_range(name, data_dir, start, end):
+    with open(os.path.join(data_dir, TABLE_SCHEMAS[name]['file']), 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        block = f.read(end - start)
+    return parse_csv_block(name, header, block)
+
+
+# Fungsi untuk menggabungkan potongan hasil parsing; kolom kategori digabung dengan kamus
+# gabungan terurut agar sama dengan hasil parsing satu file utuh
+def concat_chunks(chunks):
+    if len(chunks) == 1:
+        return chunks[0]
+
+    df = pd.concat(chunks, ignore_index=True)
+    for col in df.columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            df[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
+    return df
+
+
+# Fungsi untuk mem-parsing beberapa file CSV sekaligus dengan pool proses: seluruh file dibaca
+# bersamaan, dan file besar pada SPLITTABLE_TABLES dipotong per rentang byte yang di-parse
+# paralel lalu digabungkan. Mengembalikan dict nama tabel -> DataFrame
+def parse_csvs(names, data_dir=DATA_DIR, workers=None, chunk_bytes=CHUNK_BYTES):
+    workers = workers or os.cpu_count() or 1
+    tasks = {}
+    for name in names:
+        path = os.path.join(data_dir, TABLE_SCHEMAS[name]['file'])
+        if name in SPLITTABLE_TABLES and os.path.getsize(path) > chunk_bytes:
+            tasks[name] = csv_ranges(path, chunk_bytes)
+        else:
+            tasks[name] = None
+
+    n_tasks = sum(len(ranges) if ranges else 1 for ranges in tasks.values())
+    if workers <= 1 or n_tasks <= 1:
+        return {name: parse_csv(name, data_dir) for name in names}
+
+    # spawn agar worker tidak mewarisi lock dari thread lain pada proses server (misalnya Streamlit)
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(min(workers, n_tasks), mp_context=context) as executor:
+        futures = {}
+        for name, ranges in tasks.items():
+            if ranges is None:
+                futures[name] = [executor.submit(parse_csv, name, data_dir)]
+            else:
+                futures[name] = [executor.submit(parse_csv_range, name, data_dir, start, end) for start, end in ranges]
+        return {name: concat_chunks([future.result() for future in chunk_futures])
+                for name, chunk_futures in futures.items()}
+
+
+# Fungsi untuk mencari posisi akhir record CSV lengkap terakhir dalam blok yang diawali batas
+# record (0 jika belum ada); baris baru di dalam field yang dikutip ("...") bukan akhir record
+def last_record_end(block):
+    pos = block.rfind(b'\n')
+    while pos >= 0 and block.count(b'"', 0, pos) % 2:
+        pos = block.rfind(b'\n', 0, pos)
+    return pos + 1
+
+
+# Generator untuk membaca record-record baru yang ditambahkan ke file CSV sejak posisi byte
+# `start`, per potongan sekitar chunk_bytes sehingga memori yang dipakai tidak bergantung pada
+# ukuran file. Menghasilkan DataFrame setiap potongan beserta posisi byte akhirnya (selalu di
+# akhir record lengkap). Record terakhir tanpa baris baru penutup mungkin masih ditulis, sehingga
+# dibaca berikutnya; hanya jika final (file sudah selesai ditulis, misalnya tabel statis atau feed
+# yang sudah ditutup) record tersebut dibaca, asalkan tanda kutipnya seimbang
+def iter_csv_tail(name, start, data_dir=DATA_DIR, chunk_bytes=CHUNK_BYTES, final=False):
+    with open(os.path.join(data_dir, TABLE_SCHEMAS[name]['file']), 'rb') as f:
+        header = f.readline()
+        start = max(start, len(header))
+        f.seek(start)
+
+        pending = b''
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                if final and pending.strip() and pending.count(b'"') % 2 == 0:
+                    start += len(pending)
+                    yield parse_csv_block(name, header, pending), start
+                return
+            pending += data
+            end = last_record_end(pending)
+            if end:
+                block, pending = pending[:end], pending[end:]
+                start += len(block)
+                yield parse_csv_block(name, header, block), start
+
+
+# Fungsi untuk menentukan lokasi file cache kolumnar sebuah tabel
+def cache_path(name, fingerprint, data_dir=DATA_DIR):
+    return os.path.join(data_dir, CACHE_DIR_NAME, f'{name}-{fingerprint}.feather')
+
+
+# Fungsi untuk menulis cache kolumnar (Feather/Arrow IPC tanpa kompresi agar bisa di-memory-map)
+def write_cache(df, path):
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Tulis ke file sementara lalu ganti secara atomik agar proses lain tidak membaca file setengah jadi
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+    # Hapus cache versi lama dari tabel yang sama
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry.endswith('.feather') and os.path.join(cache_dir, entry) != path:
+            os.remove(os.path.join(cache_dir, entry))
+
+
+# Fungsi untuk membaca cache kolumnar dengan memory-map (opsional hanya kolom tertentu)
+def read_cache(path, columns=None):
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas(split_blocks=True)
+
+
+# Fungsi untuk menyiapkan cache kolumnar beberapa tabel sekaligus: tabel yang cache-nya belum ada
+# di-parse secara paralel (lihat parse_csvs) lalu disimpan, sehingga read_table berikutnya cukup
+# membaca cache. Tidak dijalankan jika direktori data read-only (hasil parsing tidak bisa disimpan)
+def prepare_caches(names, data_dir=DATA_DIR, workers=None, content_hash=False):
+    if not os.access(data_dir, os.W_OK):
+        return []
+
+    paths = {}
+    for name in names:
+        source = os.path.join(data_dir, TABLE_SCHEMAS[name]['file'])
+        path = cache_path(name, source_fingerprint(source, content_hash), data_dir)
+        if not os.path.exists(path):
+            paths[name] = path
+    if not paths:
+        return []
+
+    for name, df in parse_csvs(list(paths), data_dir, workers).items():
+        try:
+            write_cache(df, paths[name])
+        except OSError:
+            pass
+    return list(paths)
+
+
+# Fungsi untuk memuat satu tabel: pakai cache jika masih valid, jika tidak parse CSV lalu simpan cache
+def read_table(name, data_dir=DATA_DIR, content_hash=False, columns=None):
+    source = os.path.join(data_dir, TABLE_SCHEMAS[name]['file'])
+    path = cache_path(name, source_fingerprint(source, content_hash), data_dir)
+
+    if os.path.exists(path):
+        return read_cache(path, columns)
+
+    df = parse_csv(name, data_dir)
+
+    # Direktori data bisa saja read-only; dalam kasus itu cukup kembalikan hasil parsing
+    try:
+        write_cache(df, path)
+    except OSError:
+        pass
+
+    return df if columns is None else df[columns]
+
+
+# Fungsi untuk memuat satu tabel sebagai tabel Arrow tanpa konversi ke pandas (cache kolumnar
+# di-memory-map), untuk dibaca langsung oleh mesin query (lihat sql_engine.py)
+def read_arrow_table(name, data_dir=DATA_DIR, content_hash=False):
+    source = os.path.join(data_dir, TABLE_SCHEMAS[name]['file'])
+    path = cache_path(name, source_fingerprint(source, content_hash), data_dir)
+
+    if os.path.exists(path):
+        return feather.read_table(path, memory_map=True)
+
+    # Cache belum ada (atau direktori data read-only): parse CSV, yang sekaligus menyimpan cache
+    return pa.Table.from_pandas(read_table(name, data_dir, content_hash), preserve_index=False)
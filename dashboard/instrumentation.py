@@ -0,0 +1,175 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Recorder milik rerun yang sedang berjalan (setiap sesi Streamlit berjalan di thread sendiri)
+_current_recorder = contextvars.ContextVar('recorder', default=None)
+
+
+# Pencatat waktu dan memori setiap tahap dalam satu rerun. Pengukuran waktu selalu aktif
+# (cukup perf_counter); pengukuran memori memakai tracemalloc dan hanya aktif jika trace_memory,
+# karena tracemalloc memperlambat alokasi
+class Recorder:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        self._started_tracing = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextlib.contextmanager
+    def stage(self, name, kind='stage'):
+        record = {'stage': name, 'kind': kind, 'depth': len(self._stack), 'cache': None}
+        frame = {'record': record, 'peak': 0, 'start_memory': 0, 'miss_at': None}
+
+        # Puncak memori tahap induk dicatat dulu sebelum puncak direset untuk tahap ini
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_memory'] = current
+
+        # Dicatat saat tahap dimulai agar urutan record mengikuti urutan eksekusi (induk sebelum anak)
+        self.records.append(record)
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            record['wall_time_s'] = end - start
+
+            # Untuk fungsi yang di-cache: waktu sebelum body dijalankan adalah overhead hashing
+            # argumen dan lookup cache; body hanya dijalankan jika cache miss
+            if frame['miss_at'] is not None:
+                record['cache'] = 'miss'
+                record['cache_overhead_s'] = frame['miss_at'] - start
+            elif kind in ('load', 'analysis', 'figure'):
+                record['cache'] = 'hit'
+
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame['peak'], peak)
+                record['peak_memory_mb'] = (peak - frame['start_memory']) / 2**20
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+    # Menandai bahwa body fungsi yang di-cache pada tahap saat ini benar-benar dijalankan
+    def mark_cache_miss(self):
+        if self._stack and self._stack[-1]['miss_at'] is None:
+            self._stack[-1]['miss_at'] = time.perf_counter()
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_json(self):
+        return json.dumps({'records': self.records}, indent=2, default=str)
+
+
+# Fungsi untuk memulai recorder baru untuk rerun saat ini
+def start_rerun(trace_memory=False):
+    # Rerun sebelumnya bisa berhenti di tengah jalan (st.stop) tanpa menutup recorder-nya
+    previous = _current_recorder.get()
+    if previous is not None:
+        previous.close()
+
+    recorder = Recorder(trace_memory)
+    _current_recorder.set(recorder)
+    return recorder
+
+
+# Fungsi untuk mengambil recorder rerun saat ini (None di luar dashboard, misalnya pada benchmark)
+def current_recorder():
+    return _current_recorder.get()
+
+
+# Context manager untuk mengukur satu tahap pada recorder saat ini (tanpa efek jika tidak ada)
+def stage(name, kind='stage'):
+    recorder = current_recorder()
+    if recorder is None:
+        return contextlib.nullcontext({})
+    return recorder.stage(name, kind)
+
+
+# Fungsi untuk dipanggil di awal body fungsi yang di-cache (lihat Recorder.mark_cache_miss)
+def cache_miss():
+    recorder = current_recorder()
+    if recorder is not None:
+        recorder.mark_cache_miss()
+
+
+# Decorator untuk mengukur setiap pemanggilan fungsi sebagai satu tahap
+def instrumented(kind):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(func.__name__, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Agregat kumulatif seluruh rerun di satu proses, untuk diekspor ke sistem monitoring
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def add(self, records):
+        with self._lock:
+            for record in records:
+                metrics = self.stages.setdefault((record['stage'], record['kind']), {
+                    'count': 0, 'seconds_sum': 0.0, 'seconds_max': 0.0, 'cache_hits': 0, 'cache_misses': 0
+                })
+                metrics['count'] += 1
+                metrics['seconds_sum'] += record['wall_time_s']
+                metrics['seconds_max'] = max(metrics['seconds_max'], record['wall_time_s'])
+                if record['cache'] == 'hit':
+                    metrics['cache_hits'] += 1
+                elif record['cache'] == 'miss':
+                    metrics['cache_misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [{'stage': name, 'kind': kind, **metrics} for (name, kind), metrics in sorted(self.stages.items())]
+
+    def to_json(self):
+        return json.dumps({'stages': self.snapshot()}, indent=2)
+
+    # Format teks eksposisi Prometheus
+    def to_prometheus(self, prefix='dashboard'):
+        metrics = [
+            ('stage_seconds_sum', 'counter', 'Total waktu setiap tahap (detik)', 'seconds_sum'),
+            ('stage_seconds_max', 'gauge', 'Waktu terlama setiap tahap (detik)', 'seconds_max'),
+            ('stage_calls_total', 'counter', 'Jumlah eksekusi setiap tahap', 'count'),
+            ('cache_hits_total', 'counter', 'Jumlah cache hit fungsi yang di-cache', 'cache_hits'),
+            ('cache_misses_total', 'counter', 'Jumlah cache miss fungsi yang di-cache', 'cache_misses')
+        ]
+        snapshot = self.snapshot()
+        lines = []
+        for name, metric_type, help_text, key in metrics:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for metrics_row in snapshot:
+                stage_name = metrics_row['stage'].replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{prefix}_{name}{{stage="{stage_name}",kind="{metrics_row["kind"]}"}} {metrics_row[key]}')
+        return '\n'.join(lines) + '\n'
+
+    # Menulis teks Prometheus secara atomik (untuk textfile collector node_exporter)
+    def write_prometheus(self, path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Jumlah peringkat teratas yang dipelihara secara inkremental (lihat incremental.py)
+TOP_K = 100
+
+
+# Fungsi untuk mengambil posisi k nilai terbesar (atau terkecil) tanpa mengurutkan seluruh nilai:
+# kandidat dipilih dengan np.partition dalam O(n), lalu hanya k kandidat itu yang diurutkan.
+# NaN selalu di urutan terakhir dan nilai yang sama diurutkan menurut posisinya, sehingga hasilnya
+# sama dengan sort_values(kind='stable').head(k)
+def top_k_positions(values, k, ascending=False):
+    values = np.asarray(values, dtype='float64')
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype='int64')
+
+    keys = values if ascending else -values
+    keys = np.where(np.isnan(keys), np.inf, keys)
+
+    # Nilai ke-k sebagai ambang; dari nilai yang sama dengan ambang diambil posisi terkecil
+    kth = np.partition(keys, k - 1)[k - 1]
+    better = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - len(better)]
+    candidates = np.concatenate([better, ties])
+
+    return candidates[np.lexsort((candidates, keys[candidates]))]
+
+
+# Fungsi untuk memperbarui top-k (Series berindeks kunci) dengan nilai terbaru dari kunci yang
+# berubah. Hasilnya eksak selama nilai hanya bisa naik (misalnya jumlah penjualan pada data
+# append-only): kunci di luar top-k lama yang tidak berubah tidak mungkin masuk top-k baru.
+# Nilai yang sama diurutkan menurut kuncinya
+def merge_top_k(top, updated, k=TOP_K):
+    combined = pd.concat([top[~top.index.isin(updated.index)], updated]).sort_index()
+    return combined.iloc[top_k_positions(combined.to_numpy(), k)]
+
+
+# Peringkat baris sebuah tabel menurut satu kolom untuk ditampilkan per halaman. Urutan hanya
+# dihitung untuk prefix yang dibutuhkan (top-k), lalu disimpan; prefix diperpanjang minimal dua
+# kali lipat saat halaman yang diminta melewatinya, sehingga tabel tidak pernah diurutkan penuh
+# untuk setiap halaman. order dapat diisi urutan prefix yang sudah diketahui (misalnya top-k
+# yang dipelihara secara inkremental)
+class Ranking:
+    def __init__(self, frame, column, ascending=False, order=None):
+        self.frame = frame
+        self.column = column
+        self.ascending = ascending
+        self._order = np.empty(0, dtype='int64') if order is None else np.asarray(order, dtype='int64')
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _positions(self, k):
+        k = min(k, len(self.frame))
+        order = self._order
+        if len(order) < k:
+            with self._lock:
+                if len(self._order) < k:
+                    size = max(k, 2 * len(self._order))
+                    self._order = top_k_positions(self.frame[self.column].to_numpy(), size, self.ascending)
+                order = self._order
+        return order
+
+    # k baris teratas
+    def top(self, k):
+        return self.frame.iloc[self._positions(k)[:k]]
+
+    # Satu halaman peringkat (halaman pertama = 0)
+    def page(self, page, page_size=10):
+        end = (page + 1) * page_size
+        return self.frame.iloc[self._positions(end)[page * page_size:end]]
+
+    def n_pages(self, page_size=10):
+        return max(-(-len(self.frame) // page_size), 1)
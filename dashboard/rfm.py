@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from sketches import KllSketch, histogram_quantiles
+
+# Label segmen pelanggan dari skor RFM gabungan (terendah ke tertinggi)
+SEGMENT_LABELS = ['Bronze', 'Silver', 'Gold', 'Platinum']
+
+
+# Fungsi untuk membagi nilai ke dalam q kuantil, setara dengan pd.qcut(values, q, labels=False)
+# tetapi menggunakan np.quantile + np.searchsorted dan tidak gagal jika batas kuantil duplikat
+def quantile_bins(values, q):
+    values = np.asarray(values, dtype='float64')
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.intp)
+    edges = np.quantile(values, np.linspace(0, 1, q + 1))
+
+    # Interval kuantil tertutup di kanan (a, b], sehingga nilai yang sama dengan batas
+    # masuk ke kuantil di sebelah kiri
+    return np.searchsorted(edges[1:-1], values, side='left')
+
+
+# Fungsi untuk menghitung ranking urutan kemunculan, setara dengan rank(method='first')
+def first_rank(values):
+    order = np.argsort(np.asarray(values), kind='stable')
+    ranks = np.empty(len(order), dtype='int64')
+    ranks[order] = np.arange(1, len(order) + 1)
+    return ranks
+
+
+# Fungsi untuk membagi rank 1..n ke dalam q kuantil, setara dengan quantile_bins(ranks, q) jika ranks
+# adalah permutasi 1..n, tanpa perlu seluruh nilai (batas kuantil cukup dihitung dari n)
+def rank_bins(ranks, n, q):
+    edges = 1 + (n - 1) * np.linspace(0, 1, q + 1)
+    return np.searchsorted(edges[1:-1], ranks, side='left')
+
+
+# Fungsi untuk memperkirakan first_rank dari sketch kuantil: jumlah nilai yang lebih kecil menurut
+# sketch ditambah urutan kemunculan di antara nilai yang sama (tanpa mengurutkan seluruh nilai)
+def sketch_first_rank(values, sketch):
+    values = pd.Series(np.asarray(values, dtype='float64'))
+    ties = values.groupby(values, sort=False).cumcount().to_numpy()
+    return np.clip(sketch.rank(values) + ties + 1, 1, sketch.n)
+
+
+# Fungsi untuk membuat sketch kuantil KLL agregat per pelanggan yang menentukan batas skor RFM.
+# Waktu pembelian terakhir disimpan dalam hari sejak epoch, sehingga sketch tidak bergantung pada
+# tanggal referensi dan sketch dari beberapa partisi pelanggan dapat digabungkan (KllSketch.merge)
+def rfm_sketches(customers, error):
+    last_purchase_days = (customers['last_purchase'] - pd.Timestamp(0)) / pd.Timedelta(days=1)
+    return {
+        'last_purchase': KllSketch.for_error(error).update(last_purchase_days),
+        'frequency': KllSketch.for_error(error).update(customers['frequency']),
+        'monetary': KllSketch.for_error(error).update(customers['monetary'])
+    }
+
+
+# Fungsi untuk menghitung agregat per pelanggan: waktu pembelian terakhir, jumlah pesanan,
+# dan total nilai pesanan
+def aggregate_customers(orders_df, order_items_df):
+    # Total nilai setiap pesanan dihitung di level item lalu dipetakan ke pesanan,
+    # sehingga tidak perlu menggabungkan seluruh orders dengan order_items
+    order_totals = order_items_df.groupby('order_id', sort=False)['total_price'].sum()
+    orders = pd.DataFrame({
+        'customer_id': orders_df['customer_id'],
+        'order_id': orders_df['order_id'],
+        'order_purchase_timestamp': orders_df['order_purchase_timestamp'],
+        'total_price': orders_df['order_id'].map(order_totals)
+    })
+
+    # Agregasi native per pelanggan (tanpa lambda Python per grup)
+    return orders.groupby('customer_id').agg(
+        last_purchase=('order_purchase_timestamp', 'max'),
+        frequency=('order_id', 'nunique'),
+        monetary=('total_price', 'sum')
+    ).reset_index()
+
+
+# Fungsi untuk menghitung agregat per pelanggan dari tabel fakta (lihat star.py)
+def aggregate_customer_facts(fact_items, dim_customers):
+    # Hanya baris yang berasal dari pesanan (item tanpa pesanan tidak punya pelanggan)
+    order_rows = fact_items[fact_items['customer_key'] >= 0]
+
+    customers = order_rows.groupby('customer_key').agg(
+        last_purchase=('order_purchase_timestamp', 'max'),
+        frequency=('order_key', 'nunique'),
+        monetary=('total_price', 'sum')
+    ).reset_index()
+
+    customers.insert(0, 'customer_id', dim_customers['customer_id'].to_numpy()[customers.pop('customer_key')])
+    return customers
+
+
+# Fungsi untuk menghitung skor dan segmen RFM dari agregat per pelanggan (kolom id_column sebagai
+# identitas pelanggan). Jika sketches diisi (lihat rfm_sketches), batas skor diambil dari sketch
+# kuantil alih-alih dari pengurutan seluruh pelanggan
+def score_rfm(customers, reference_date=None, bins=5, sketches=None, id_column='customer_id'):
+    # Tanggal referensi default: tanggal terakhir dalam dataset + 1 hari
+    if reference_date is None:
+        reference_date = customers['last_purchase'].max() + pd.Timedelta(days=1)
+
+    rfm = customers[[id_column, 'frequency', 'monetary']].copy()
+
+    # Recency dalam hari penuh sejak pembelian terakhir
+    rfm.insert(1, 'recency', (pd.Timestamp(reference_date) - customers['last_purchase']).dt.days)
+
+    # Membuat skor RFM (1-bins, bins adalah yang terbaik); recency yang kecil mendapat skor tinggi
+    if sketches is None:
+        rfm['r_score'] = bins - quantile_bins(rfm['recency'], bins)
+        rfm['f_score'] = quantile_bins(first_rank(rfm['frequency']), bins) + 1
+        rfm['m_score'] = quantile_bins(first_rank(rfm['monetary']), bins) + 1
+    else:
+        # Kuantil recency adalah kebalikan kuantil waktu pembelian terakhir
+        probs = np.linspace(0, 1, bins + 1)[1:-1]
+        last_purchase_edges = pd.Timestamp(0) + pd.to_timedelta(sketches['last_purchase'].quantiles(1 - probs), unit='D')
+        recency_edges = (pd.Timestamp(reference_date) - last_purchase_edges).days
+        rfm['r_score'] = bins - np.searchsorted(recency_edges, rfm['recency'], side='left')
+        for col, score in [('frequency', 'f_score'), ('monetary', 'm_score')]:
+            sketch = sketches[col]
+            rfm[score] = rank_bins(sketch_first_rank(rfm[col], sketch), sketch.n, bins) + 1
+
+    # Menghitung skor RFM gabungan
+    rfm['rfm_score'] = rfm['r_score'] + rfm['f_score'] + rfm['m_score']
+
+    # Membuat segmen pelanggan berdasarkan skor RFM; pada mode sketch batasnya dihitung dari
+    # histogram skor gabungan (bilangan bulat kecil, sehingga tetap eksak dan dapat digabungkan)
+    if sketches is None:
+        segments = quantile_bins(rfm['rfm_score'], len(SEGMENT_LABELS))
+    else:
+        edges = histogram_quantiles(np.bincount(rfm['rfm_score']), np.linspace(0, 1, len(SEGMENT_LABELS) + 1))
+        segments = np.searchsorted(edges[1:-1], rfm['rfm_score'], side='left')
+    rfm['customer_segment'] = pd.Categorical.from_codes(segments, categories=SEGMENT_LABELS, ordered=True)
+
+    return rfm
+
+
+# Fungsi untuk menghitung nilai Recency, Frequency, dan Monetary setiap pelanggan
+def compute_rfm(orders_df, order_items_df, reference_date=None, bins=5):
+    return score_rfm(aggregate_customers(orders_df, order_items_df), reference_date=reference_date, bins=bins)
+
+
+# Fungsi untuk meringkas jumlah dan karakteristik setiap segmen pelanggan
+def summarize_segments(rfm, id_column='customer_id'):
+    segment_counts = rfm['customer_segment'].value_counts().reset_index()
+    segment_counts.columns = ['customer_segment', 'count']
+
+    segment_analysis = rfm.groupby('customer_segment', observed=False).agg(
+        avg_recency=('recency', 'mean'),
+        avg_frequency=('frequency', 'mean'),
+        avg_monetary=('monetary', 'mean'),
+        customer_count=(id_column, 'count')
+    ).reset_index()
+
+    return segment_counts, segment_analysis
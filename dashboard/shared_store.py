@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from datasets import ID_COLUMNS, Dataset
+from ingest import CACHE_DIR_NAME, DATA_DIR, dataset_fingerprint, read_cache
+
+# Tabel yang dipublikasikan ke penyimpanan bersama: seluruh tabel yang dipakai halaman dashboard
+# (geolocation hanya dipakai untuk menghitung jarak pada fact_items, order_payments tidak dipakai)
+SHARED_TABLES = ['customers', 'orders', 'products', 'order_items', 'order_reviews', 'sellers',
+                 'products_with_category', 'delivered_orders',
+                 'dim_customers', 'dim_sellers', 'dim_categories', 'fact_items', 'order_cube']
+
+
+# Direktori default: /dev/shm (memori bersama) jika tersedia, jika tidak direktori cache
+def default_shared_dir(data_dir=DATA_DIR):
+    if os.path.isdir('/dev/shm'):
+        return '/dev/shm/ecommerce-dashboard'
+    return os.path.join(data_dir, CACHE_DIR_NAME, 'shared')
+
+
+# Fungsi untuk membaca manifest versi yang sedang aktif (None jika belum ada yang dipublikasikan)
+def read_manifest(shared_dir):
+    try:
+        with open(os.path.join(shared_dir, 'current.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# Fungsi untuk menulis satu tabel sebagai file Arrow IPC tanpa kompresi; kolom ID disimpan
+# sebagai kode int32 saja (kamusnya disimpan sekali per kolom ID). Mengembalikan kolom ID
+# yang dikodekan
+def write_shared_table(df, path):
+    columns = {}
+    encoded = []
+    for col in df.columns:
+        if col in ID_COLUMNS and isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = df[col].cat.codes.astype('int32')
+            encoded.append(col)
+        else:
+            columns[col] = df[col]
+    feather.write_feather(pd.DataFrame(columns), path, compression='uncompressed')
+    return encoded
+
+
+# Fungsi untuk mempublikasikan tabel dataset ke direktori bersama. Tabel ditulis ke direktori
+# versi baru, lalu current.json diganti secara atomik; proses yang masih memakai versi lama
+# tetap bisa membaca file yang sudah di-memory-map walaupun direktorinya dihapus
+def publish(shared_dir, data_dir=DATA_DIR, tables=SHARED_TABLES):
+    dataset = Dataset(data_dir)
+    version_dir = os.path.join(shared_dir, dataset.version)
+    tmp_dir = f'{version_dir}.{os.getpid()}.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    encoded = {name: write_shared_table(dataset[name], os.path.join(tmp_dir, f'{name}.arrow')) for name in tables}
+
+    ids = sorted({col for cols in encoded.values() for col in cols})
+    for col in ids:
+        feather.write_feather(pa.table({col: pa.array(dataset.id_categories(col))}),
+                              os.path.join(tmp_dir, f'ids-{col}.arrow'), compression='uncompressed')
+
+    if os.path.exists(version_dir):
+        shutil.rmtree(version_dir)
+    os.replace(tmp_dir, version_dir)
+
+    manifest = {'version': dataset.version, 'tables': list(tables), 'ids': ids, 'encoded': encoded}
+    tmp_path = os.path.join(shared_dir, f'current.json.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(shared_dir, 'current.json'))
+
+    # Hapus versi lama
+    for entry in os.listdir(shared_dir):
+        path = os.path.join(shared_dir, entry)
+        if entry != dataset.version and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+    return manifest
+
+
+# Dataset yang membaca tabel dari penyimpanan bersama yang sudah dipublikasikan. File di-memory-map
+# sehingga halaman memori dipakai bersama oleh seluruh proses dashboard (zero-copy untuk kolom
+# numerik). Tabel yang tidak dipublikasikan tetap dimuat dengan cara biasa
+class SharedDataset(Dataset):
+    def __init__(self, shared_dir, manifest, data_dir=DATA_DIR):
+        super().__init__(data_dir, version=manifest['version'])
+        self.shared_dir = shared_dir
+        self.manifest = manifest
+        self._id_dtypes = {}
+
+    @property
+    def version_dir(self):
+        return os.path.join(self.shared_dir, self.manifest['version'])
+
+    def _load(self, name):
+        if name not in self.manifest['tables']:
+            return super()._load(name)
+
+        table = read_cache(os.path.join(self.version_dir, f'{name}.arrow'))
+        for col in self.manifest['encoded'][name]:
+            table[col] = pd.Categorical.from_codes(table[col].to_numpy(), dtype=self._id_dtype(col))
+        return table
+
+    # Hanya tabel yang tidak dipublikasikan yang dibaca dari file CSV
+    def _prepare(self, names):
+        super()._prepare([name for name in names if name not in self.manifest['tables']])
+
+    def id_categories(self, col):
+        if col not in self.manifest['ids']:
+            return super().id_categories(col)
+        return self._id_dtype(col).categories
+
+    # Satu CategoricalDtype per kolom ID untuk seluruh tabel, sehingga join tetap pada kode integer
+    def _id_dtype(self, col):
+        dtype = self._id_dtypes.get(col)
+        if dtype is None:
+            with self._lock:
+                dtype = self._id_dtypes.get(col)
+                if dtype is None:
+                    categories = read_cache(os.path.join(self.version_dir, f'ids-{col}.arrow'))[col]
+                    dtype = pd.CategoricalDtype(pd.Index(categories.array))
+                    self._id_dtypes[col] = dtype
+        return dtype
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publikasikan dataset dashboard ke penyimpanan bersama")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--shared-dir', default=None)
+    parser.add_argument('--watch', type=float, default=None,
+                        help="Periksa perubahan file sumber setiap N detik dan publikasikan ulang")
+    args = parser.parse_args()
+
+    shared_dir = args.shared_dir or default_shared_dir(args.data_dir)
+    os.makedirs(shared_dir, exist_ok=True)
+
+    while True:
+        manifest = read_manifest(shared_dir)
+        if manifest is None or manifest['version'] != dataset_fingerprint(args.data_dir):
+            manifest = publish(shared_dir, args.data_dir)
+            print(f"Dataset versi {manifest['version']} dipublikasikan ke {shared_dir}")
+        if args.watch is None:
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,232 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Sketch untuk perkiraan jumlah nilai unik (HyperLogLog) dan kuantil (KLL). Keduanya dibangun dalam
+# satu kali baca data, memakai memori yang tidak bergantung pada jumlah baris, dan dapat
+# digabungkan (merge) antar potongan data, partisi, atau batch inkremental
+
+# Batas presisi HyperLogLog (jumlah register = 2^precision)
+HLL_PRECISION_RANGE = (4, 18)
+
+# Ukuran minimum compactor KLL
+KLL_MIN_K = 8
+
+# Rasio kapasitas compactor KLL antar level yang berurutan
+KLL_CAPACITY_RATIO = 2 / 3
+
+
+# Fungsi untuk menghitung hash 64-bit nilai (NaN diabaikan). Hash bergantung pada nilai, bukan
+# pada dtype, sehingga kategori dan string dengan nilai yang sama menghasilkan hash yang sama
+def hash_values(values):
+    values = pd.Series(values).dropna()
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+# Fungsi untuk menghitung jumlah bit (posisi bit 1 tertinggi) setiap bilangan uint64 secara tervektorisasi
+def bit_length(values):
+    values = np.asarray(values, dtype='uint64')
+    length = np.zeros(len(values), dtype='int64')
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        length += high * shift
+        values = np.where(high, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+# Fungsi untuk menentukan presisi HyperLogLog dari galat relatif yang diinginkan
+# (galat standar sekitar 1.04 / sqrt(2^precision))
+def hll_precision(error):
+    precision = int(np.ceil(np.log2((1.04 / error) ** 2)))
+    return min(max(precision, HLL_PRECISION_RANGE[0]), HLL_PRECISION_RANGE[1])
+
+
+# Fungsi untuk menentukan parameter k KLL dari galat rank ternormalisasi yang diinginkan
+# (perkiraan galat rank dengan keyakinan 99%: 2.296 / k^0.9723)
+def kll_k(error):
+    return max(int(np.ceil((2.296 / error) ** (1 / 0.9723))), KLL_MIN_K)
+
+
+# Sketch HyperLogLog: setiap nilai di-hash, bit teratas hash memilih register dan register
+# menyimpan jumlah nol di depan maksimum dari sisa bit hash. Penggabungan cukup berupa
+# maksimum per register
+class HyperLogLog:
+    def __init__(self, precision=14):
+        if not HLL_PRECISION_RANGE[0] <= precision <= HLL_PRECISION_RANGE[1]:
+            raise ValueError(f"precision harus antara {HLL_PRECISION_RANGE[0]} dan {HLL_PRECISION_RANGE[1]}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype='uint8')
+
+    @classmethod
+    def for_error(cls, error):
+        return cls(hll_precision(error))
+
+    # Galat relatif standar dari presisi sketch ini
+    @property
+    def error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        hashes = hash_values(values)
+        if len(hashes) == 0:
+            return self
+
+        registers = (hashes >> np.uint64(64 - self.precision)).astype('int64')
+        remainder = hashes << np.uint64(self.precision)
+        ranks = np.minimum(65 - bit_length(remainder), 65 - self.precision).astype('uint8')
+        np.maximum.at(self.registers, registers, ranks)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Hanya HyperLogLog dengan presisi yang sama yang dapat digabungkan")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    # Perkiraan jumlah nilai unik; untuk jumlah kecil dipakai linear counting dari register kosong
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype('float64')))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty > 0:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+# Sketch kuantil KLL: hierarki compactor, item pada level h mewakili 2^h nilai asli. Jika sebuah
+# level melebihi kapasitasnya, itemnya diurutkan dan separuhnya (posisi ganjil atau genap, dipilih
+# acak) dinaikkan ke level berikutnya. Jumlah bobot selalu sama dengan jumlah nilai (n), dan
+# galat rank tidak bergantung pada n. Seed tetap sehingga hasilnya deterministik
+class KllSketch:
+    def __init__(self, k=200, seed=0):
+        if k < KLL_MIN_K:
+            raise ValueError(f"k minimal {KLL_MIN_K}")
+        self.k = k
+        self.n = 0
+        self.levels = [np.zeros(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, error, seed=0):
+        return cls(kll_k(error), seed)
+
+    # Galat rank ternormalisasi dari parameter k sketch ini
+    @property
+    def error(self):
+        return 2.296 / self.k ** 0.9723
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * KLL_CAPACITY_RATIO ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Hanya KllSketch dengan k yang sama yang dapat digabungkan")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    # Memadatkan level terendah yang melebihi kapasitas sampai seluruh level muat
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self.capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+
+            # Jika jumlah item ganjil, satu item terbesar tetap di level ini
+            items = np.sort(items)
+            even = len(items) - len(items) % 2
+            offset = int(self._rng.integers(2))
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset:even:2]])
+            self.levels[level] = items[even:]
+            level = 0
+
+    # Item yang tersimpan (terurut) beserta bobot kumulatifnya
+    def _cumulative(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 1 << level, dtype='int64')
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    # Perkiraan kuantil: item terkecil yang rank inklusifnya minimal q * n
+    def quantiles(self, probs):
+        probs = np.asarray(probs, dtype='float64')
+        if self.n == 0:
+            return np.full(len(probs), np.nan)
+        items, cumulative = self._cumulative()
+        positions = np.searchsorted(cumulative, probs * self.n, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    # Perkiraan rank: jumlah nilai yang lebih kecil dari (atau, jika inclusive, tidak lebih dari) values
+    def rank(self, values, inclusive=False):
+        if self.n == 0:
+            return np.zeros(len(values), dtype='int64')
+        items, cumulative = self._cumulative()
+        positions = np.searchsorted(items, np.asarray(values, dtype='float64'), side='right' if inclusive else 'left')
+        return np.where(positions > 0, cumulative[np.maximum(positions - 1, 0)], 0)
+
+
+# Fungsi untuk menghitung kuantil dari histogram nilai bilangan bulat (counts[v] = jumlah nilai v),
+# setara dengan np.quantile pada seluruh nilai tersebut (interpolasi linear). Histogram dapat
+# digabungkan cukup dengan menjumlahkan counts
+def histogram_quantiles(counts, probs):
+    cumulative = np.cumsum(counts)
+    n = cumulative[-1] if len(cumulative) else 0
+    if n == 0:
+        return np.full(len(probs), np.nan)
+    positions = (n - 1) * np.asarray(probs, dtype='float64')
+    lower = np.floor(positions)
+    lower_values = np.searchsorted(cumulative, lower, side='right')
+    upper_values = np.searchsorted(cumulative, np.minimum(lower + 1, n - 1), side='right')
+    return lower_values + (positions - lower) * (upper_values - lower_values)
+
+
+if __name__ == "__main__":
+    # Membandingkan metrik dan skor RFM mode sketch dengan hasil eksak pada sebuah dataset
+    from analysis import calculate_metrics, rfm_analysis
+    from datasets import Dataset
+    from ingest import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Bandingkan hasil mode sketch dengan hasil eksak")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--error', type=float, default=0.01, help="galat relatif sketch")
+    args = parser.parse_args()
+
+    # Tabel dimuat lebih dulu sehingga waktu yang diukur hanya waktu analisis
+    dataset = Dataset(args.data_dir)
+    dataset.tables(['customers', 'fact_items', 'dim_customers'])
+    results = {}
+    for name, sketch_error in [('eksak', None), ('sketch', args.error)]:
+        start = time.perf_counter()
+        metrics = calculate_metrics(dataset, sketch_error=sketch_error)
+        rfm = rfm_analysis(dataset, sketch_error=sketch_error)['rfm']
+        results[name] = (metrics['unique_customers'], rfm, time.perf_counter() - start)
+
+    exact_unique, exact_rfm, exact_time = results['eksak']
+    unique, rfm, sketch_time = results['sketch']
+    print(f"Pelanggan unik: eksak {exact_unique:,}, sketch {unique:,} "
+          f"(galat {abs(unique - exact_unique) / exact_unique:.2%})")
+    for col in ['r_score', 'f_score', 'm_score', 'customer_segment']:
+        agreement = (rfm[col].to_numpy() == exact_rfm[col].to_numpy()).mean()
+        print(f"{col}: {agreement:.2%} pelanggan mendapat nilai yang sama")
+    print(f"Waktu: eksak {exact_time:.3f} s, sketch {sketch_time:.3f} s")
@@ -0,0 +1,329 @@
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from analysis import DELIVERY_TIME_BINS, DELIVERY_TIME_LABELS
+from geo import BRAZIL_LAT, BRAZIL_LNG, DISTANCE_BINS, DISTANCE_LABELS, EARTH_RADIUS_KM
+from ingest import DATA_DIR, prepare_caches, read_arrow_table
+
+# DuckDB opsional: hanya dibutuhkan jika mesin SQL dipilih (DASHBOARD_ENGINE=duckdb)
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Pilihan mesin eksekusi fungsi analisis; pandas adalah mesin referensi
+ENGINES = ['pandas', 'duckdb']
+
+# Tabel sumber yang dibaca mesin SQL langsung dari cache kolumnar
+SQL_TABLES = ['category_name_translation', 'customers', 'geolocation', 'order_items', 'order_reviews', 'orders',
+              'products', 'sellers']
+
+# Tabel dimensi yang diberi kolom nomor baris (_row) agar baris pertama per ID dapat dipilih
+# seperti drop_duplicates pada mesin pandas
+NUMBERED_TABLES = ['category_name_translation', 'customers', 'products', 'sellers']
+
+# View SQL yang setara dengan tabel turunan pada datasets.py dan star.py
+VIEWS = {
+    # Lokasi pelanggan per customer_id (setara star.build_dim_customers)
+    'dim_customers': """
+        SELECT customer_id, customer_unique_id, customer_state, customer_zip_code_prefix FROM customers
+        QUALIFY row_number() OVER (PARTITION BY customer_id ORDER BY _row) = 1""",
+    # Lokasi penjual per seller_id (setara star.build_dim_sellers)
+    'dim_sellers': """
+        SELECT seller_id, seller_state, seller_city, seller_zip_code_prefix FROM sellers
+        QUALIFY row_number() OVER (PARTITION BY seller_id ORDER BY _row) = 1""",
+    # Kategori produk dalam bahasa Inggris (setara datasets.build_products_with_category)
+    'product_categories': """
+        SELECT p.product_id,
+               coalesce(t.product_category_name_english, coalesce(p.product_category_name, 'unknown')) AS product_category_name_english
+        FROM products p
+        LEFT JOIN category_name_translation t ON t.product_category_name = coalesce(p.product_category_name, 'unknown')
+        WHERE p.product_id IS NOT NULL
+        QUALIFY row_number() OVER (PARTITION BY p.product_id ORDER BY p._row, t._row) = 1""",
+    # Item pesanan beserta total harga (setara datasets.add_total_price)
+    'items': """
+        SELECT order_id, seller_id, product_id, price, price + freight_value AS total_price, TRUE AS is_item
+        FROM order_items""",
+    # Waktu pengiriman pesanan yang sudah dikirim dalam hari penuh (setara datasets.build_delivered_orders)
+    'delivered_orders': """
+        SELECT order_id,
+               floor((epoch_us(order_delivered_customer_date) - epoch_us(order_purchase_timestamp)) / 86400000000.0) AS delivery_time_days
+        FROM orders WHERE order_status = 'delivered'""",
+    # Centroid koordinat per prefix kode pos (setara geo.build_zip_centroids)
+    'zip_centroids': f"""
+        SELECT geolocation_zip_code_prefix AS zip_code_prefix,
+               fsum(geolocation_lat) / count(geolocation_lat) AS lat, fsum(geolocation_lng) / count(geolocation_lng) AS lng
+        FROM geolocation
+        WHERE geolocation_lat BETWEEN {BRAZIL_LAT[0]} AND {BRAZIL_LAT[1]} AND geolocation_lng BETWEEN {BRAZIL_LNG[0]} AND {BRAZIL_LNG[1]}
+        GROUP BY 1""",
+    # Pesanan beserta negara bagian dan prefix kode pos pelanggannya
+    'orders_with_state': """
+        SELECT o.*, c.customer_unique_id, c.customer_state, c.customer_zip_code_prefix FROM orders o LEFT JOIN dim_customers c USING (customer_id)""",
+    # Tabel fakta level item (setara star.build_fact_items): pesanan tanpa item dan item tanpa
+    # pesanan tetap tercatat, beserta rating rata-rata ulasan pesanannya
+    'fact': """
+        SELECT coalesce(o.order_id, i.order_id) AS order_id, o.customer_id, o.customer_unique_id, o.customer_state, o.customer_zip_code_prefix,
+               o.order_purchase_timestamp,
+               i.seller_id, i.product_id, i.price, i.total_price, coalesce(i.is_item, FALSE) AS has_item, r.order_rating
+        FROM orders_with_state o
+        FULL OUTER JOIN items i ON i.order_id = o.order_id
+        LEFT JOIN (SELECT order_id, avg(review_score) AS order_rating FROM order_reviews GROUP BY order_id) r
+            ON r.order_id = coalesce(o.order_id, i.order_id)"""
+}
+
+# Kategori waktu pengiriman sebagai indeks DELIVERY_TIME_LABELS (interval tertutup di kanan, setara pd.cut)
+DELIVERY_TIME_CASE = 'CASE {} END'.format(' '.join(
+    f'WHEN delivery_time_days > {low} THEN {i}' if high == float('inf') else
+    f'WHEN delivery_time_days > {low} AND delivery_time_days <= {high} THEN {i}'
+    for i, (low, high) in enumerate(zip(DELIVERY_TIME_BINS, DELIVERY_TIME_BINS[1:]))
+))
+
+
+# Jarak haversine (km) dari centroid penjual (sc) ke centroid pelanggan (cc), setara geo.haversine_km
+DISTANCE_SQL = f"""2 * {EARTH_RADIUS_KM} * asin(sqrt(least(greatest(
+    pow(sin((radians(cc.lat) - radians(sc.lat)) / 2), 2)
+    + cos(radians(sc.lat)) * cos(radians(cc.lat)) * pow(sin((radians(cc.lng) - radians(sc.lng)) / 2), 2), 0), 1)))"""
+
+# Kategori jarak sebagai indeks DISTANCE_LABELS (interval tertutup di kiri, setara geo.distance_category)
+DISTANCE_CASE = 'CASE {} END'.format(' '.join(
+    f'WHEN distance_km >= {low} THEN {i}' if high == float('inf') else
+    f'WHEN distance_km >= {low} AND distance_km < {high} THEN {i}'
+    for i, (low, high) in enumerate(zip(DISTANCE_BINS, DISTANCE_BINS[1:]))
+))
+
+
+# Fungsi untuk membuat kondisi filter rentang tanggal pembelian dan negara bagian pelanggan
+# (setara star.filter_facts) beserta parameternya; end_date bersifat inklusif
+def filter_clause(start_date=None, end_date=None, states=None):
+    conditions, params = ['TRUE'], []
+    if start_date is not None:
+        conditions.append('order_purchase_timestamp >= ?')
+        params.append(pd.Timestamp(start_date).to_pydatetime())
+    if end_date is not None:
+        conditions.append('order_purchase_timestamp < ?')
+        params.append((pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_pydatetime())
+    if states:
+        conditions.append('list_contains(?, customer_state)')
+        params.append(list(states))
+    return ' AND '.join(conditions), params
+
+
+# Mesin SQL untuk fungsi-fungsi analisis: query DuckDB (tervektorisasi dan multi-thread) langsung
+# atas cache kolumnar yang di-memory-map, tanpa memuat tabel ke pandas. Setiap metode
+# mengembalikan frame yang sama (kolom, urutan baris, dan tipe) dengan bagian yang sesuai pada
+# analysis.py. Satu koneksi dipakai bersama; query dijalankan bergantian karena setiap query
+# sudah diparalelkan oleh DuckDB
+class SqlEngine:
+    def __init__(self, data_dir=DATA_DIR, threads=None):
+        if duckdb is None:
+            raise ImportError("Mesin SQL membutuhkan paket duckdb (pip install duckdb)")
+
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._order_cube = None
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f'SET threads = {int(threads)}')
+
+        prepare_caches(SQL_TABLES, data_dir)
+        self._tables = {}
+        for name in SQL_TABLES:
+            table = read_arrow_table(name, data_dir)
+            if name in NUMBERED_TABLES:
+                table = table.append_column('_row', pa.array(np.arange(table.num_rows, dtype='int64')))
+            self._tables[name] = table
+            self.con.register(name, table)
+        for name, sql in VIEWS.items():
+            self.con.execute(f'CREATE VIEW {name} AS {sql}')
+
+    def query(self, sql, params=None):
+        with self._lock:
+            return self.con.execute(sql, params or []).df()
+
+    # Tipe kategori sebuah kolom pada tabel sumber (kamus yang sama dengan mesin pandas)
+    def category_dtype(self, name, column):
+        return self._tables[name].select([column]).to_pandas()[column].dtype
+
+    # Metrik utama (setara analysis.calculate_metrics); dengan approximate, jumlah pelanggan unik
+    # diperkirakan dengan HyperLogLog bawaan DuckDB (presisinya tetap, tidak mengikuti sketch_error)
+    def metrics(self, approximate=False):
+        distinct = 'approx_count_distinct(customer_unique_id)' if approximate else 'count(DISTINCT customer_unique_id)'
+        metrics = self.query(f"""
+            SELECT (SELECT {distinct} FROM customers) AS unique_customers,
+                   (SELECT count(*) FROM orders) AS total_orders,
+                   (SELECT count(*) FROM products) AS total_products,
+                   (SELECT coalesce(fsum(total_price), 0) FROM items) AS total_revenue,
+                   (SELECT avg(review_score) FROM order_reviews) AS avg_rating,
+                   (SELECT avg(delivery_time_days) FROM delivered_orders) AS avg_delivery_time""").iloc[0]
+        return {
+            'unique_customers': int(metrics['unique_customers']),
+            'total_orders': int(metrics['total_orders']),
+            'total_products': int(metrics['total_products']),
+            'total_revenue': metrics['total_revenue'],
+            'avg_rating': metrics['avg_rating'],
+            'avg_delivery_time': metrics['avg_delivery_time']
+        }
+
+    # Cube jumlah pesanan (setara cube.build_order_cube); dihitung sekali lalu disimpan
+    def order_cube(self):
+        if self._order_cube is None:
+            cube = self.query("""
+                SELECT date_trunc('day', order_purchase_timestamp) AS purchase_date,
+                       CAST(hour(order_purchase_timestamp) AS INTEGER) AS purchase_hour,
+                       CAST(isodow(order_purchase_timestamp) - 1 AS INTEGER) AS purchase_day_num,
+                       customer_state, order_status, count(*) AS order_count
+                FROM orders_with_state
+                GROUP BY ALL
+                ORDER BY 1 NULLS LAST, 2 NULLS LAST, 3 NULLS LAST, 4 NULLS LAST, 5 NULLS LAST""")
+            cube['customer_state'] = pd.Categorical(cube['customer_state'], dtype=self.category_dtype('customers', 'customer_state'))
+            cube['order_status'] = pd.Categorical(cube['order_status'], dtype=self.category_dtype('orders', 'order_status'))
+            self._order_cube = cube
+        return self._order_cube
+
+    # Jumlah penjualan, total pendapatan, dan harga rata-rata per kategori produk
+    def category_stats(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        return self.query(f"""
+            SELECT c.product_category_name_english, count(*) AS sales_count,
+                   coalesce(fsum(f.total_price), 0) AS total_price, fsum(f.price) / count(f.price) AS price
+            FROM fact f JOIN product_categories c USING (product_id)
+            WHERE f.has_item AND {filters}
+            GROUP BY 1 ORDER BY 1""", params)
+
+    # Jumlah penjualan, pendapatan, harga rata-rata, lokasi, dan rating rata-rata per penjual
+    def seller_performance(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        return self.query(f"""
+            SELECT f.seller_id, count(*) AS sales_count, coalesce(fsum(f.price), 0) AS total_revenue,
+                   fsum(f.price) / count(f.price) AS avg_price, any_value(s.seller_state) AS seller_state,
+                   any_value(s.seller_city) AS seller_city, fsum(f.order_rating) / count(f.order_rating) AS review_score
+            FROM fact f LEFT JOIN dim_sellers s USING (seller_id)
+            WHERE f.has_item AND f.seller_id IS NOT NULL AND {filters}
+            GROUP BY f.seller_id ORDER BY f.seller_id""", params)
+
+    # Rating rata-rata per kategori waktu pengiriman; dengan filter, hanya ulasan dari pesanan
+    # yang lolos filter (setara analysis.delivery_time_rating_analysis)
+    def delivery_time_ratings(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        if params:
+            filters = f'r.order_id IN (SELECT order_id FROM orders_with_state WHERE {filters})'
+        ratings = self.query(f"""
+            SELECT {DELIVERY_TIME_CASE} AS delivery_time_category,
+                   fsum(r.review_score) / count(r.review_score) AS mean, count(r.review_score) AS count
+            FROM order_reviews r JOIN delivered_orders d USING (order_id)
+            WHERE delivery_time_category IS NOT NULL AND {filters}
+            GROUP BY 1 ORDER BY 1""", params)
+        ratings['delivery_time_category'] = pd.Categorical.from_codes(ratings['delivery_time_category'].astype('int8'),
+                                                                      categories=DELIVERY_TIME_LABELS, ordered=True)
+        return ratings
+
+    # Jumlah item, jarak rata-rata, waktu pengiriman rata-rata, dan rating rata-rata per kategori
+    # jarak penjual ke pelanggan (setara analysis.delivery_distance_analysis)
+    def delivery_distance(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        distances = self.query(f"""
+            WITH items AS (
+                SELECT {DISTANCE_SQL} AS distance_km, d.delivery_time_days, f.order_rating
+                FROM fact f
+                JOIN dim_sellers s USING (seller_id)
+                JOIN zip_centroids sc ON sc.zip_code_prefix = s.seller_zip_code_prefix
+                JOIN zip_centroids cc ON cc.zip_code_prefix = f.customer_zip_code_prefix
+                LEFT JOIN delivered_orders d ON d.order_id = f.order_id
+                WHERE f.has_item AND {filters}
+            )
+            SELECT {DISTANCE_CASE} AS distance_category, count(*) AS item_count,
+                   fsum(distance_km) / count(distance_km) AS avg_distance_km,
+                   fsum(delivery_time_days) / count(delivery_time_days) AS avg_delivery_time_days,
+                   fsum(order_rating) / count(order_rating) AS avg_rating
+            FROM items
+            GROUP BY 1 ORDER BY 1""", params)
+        distances['distance_category'] = pd.Categorical.from_codes(distances['distance_category'].astype('int8'),
+                                                                   categories=DISTANCE_LABELS, ordered=True)
+        return distances
+
+    # Agregat RFM per pelanggan (setara rfm.aggregate_customer_facts)
+    def customer_aggregates(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        return self.query(f"""
+            SELECT customer_id, max(order_purchase_timestamp) AS last_purchase,
+                   count(DISTINCT order_id) AS frequency, coalesce(fsum(total_price), 0) AS monetary
+            FROM fact
+            WHERE customer_id IS NOT NULL AND {filters}
+            GROUP BY customer_id ORDER BY customer_id""", params)
+
+    # Pesanan per customer_unique_id beserta total nilainya, terurut menurut pelanggan lalu waktu
+    # pembelian (masukan cohorts.unique_customer_order_rows)
+    def unique_customer_orders(self, start_date=None, end_date=None, states=None):
+        filters, params = filter_clause(start_date, end_date, states)
+        return self.query(f"""
+            SELECT customer_unique_id, order_purchase_timestamp, coalesce(fsum(total_price), 0) AS total_price
+            FROM fact
+            WHERE customer_unique_id IS NOT NULL AND {filters}
+            GROUP BY order_id, customer_unique_id, order_purchase_timestamp
+            ORDER BY customer_unique_id, order_purchase_timestamp, order_id""", params)
+
+
+# Fungsi untuk membandingkan hasil fungsi analysis pada kedua mesin untuk satu dataset dan satu
+# kombinasi filter; mengembalikan daftar perbedaan (kosong jika hasilnya sama). Nilai float
+# dibandingkan dengan toleransi relatif karena urutan penjumlahan kedua mesin berbeda
+def compare_engines(dataset, engine, filters=None, rtol=1e-9):
+    import analysis
+
+    filters = filters or {}
+    functions = {
+        'filter_options': {},
+        'calculate_metrics': {},
+        'time_analysis': filters,
+        'purchase_pattern_analysis': filters,
+        'product_category_analysis': filters,
+        'seller_performance_analysis': filters,
+        'delivery_distance_analysis': filters,
+        'rfm_analysis': filters,
+        'cohort_analysis': filters
+    }
+    if filters:
+        functions = {name: kwargs for name, kwargs in functions.items() if kwargs}
+
+    differences = []
+    for name, kwargs in functions.items():
+        func = getattr(analysis, name)
+        expected, actual = func(dataset, **kwargs), func(dataset, engine=engine, **kwargs)
+        for key in expected:
+            try:
+                if isinstance(expected[key], pd.DataFrame):
+                    pd.testing.assert_frame_equal(actual[key], expected[key], rtol=rtol)
+                elif isinstance(expected[key], pd.Series):
+                    pd.testing.assert_series_equal(actual[key], expected[key], rtol=rtol)
+                elif isinstance(expected[key], dict):
+                    # Peringkat dan agregat deret waktu dihitung dari frame yang sudah dibandingkan
+                    continue
+                elif isinstance(expected[key], float):
+                    np.testing.assert_allclose(actual[key], expected[key], rtol=rtol)
+                else:
+                    assert actual[key] == expected[key], (actual[key], expected[key])
+            except AssertionError as e:
+                differences.append(f'{name}.{key}: {e}')
+    return differences
+
+
+if __name__ == "__main__":
+    from datasets import Dataset
+
+    parser = argparse.ArgumentParser(description="Membandingkan hasil mesin SQL (DuckDB) dengan mesin pandas")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--start-date', default=None)
+    parser.add_argument('--end-date', default=None)
+    parser.add_argument('--states', nargs='*', default=None)
+    args = parser.parse_args()
+
+    filters = {key: value for key, value in [('start_date', args.start_date), ('end_date', args.end_date),
+                                             ('states', tuple(args.states) if args.states else None)] if value}
+    differences = compare_engines(Dataset(args.data_dir), SqlEngine(args.data_dir), filters)
+    for difference in differences:
+        print(difference)
+    print("Hasil kedua mesin sama" if not differences else f"{len(differences)} hasil berbeda")
+    raise SystemExit(1 if differences else 0)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from geo import centroid_lookup, haversine_km
+
+
+# Fungsi untuk membuat tabel dimensi: nilai unik kolom kunci yang diurutkan, sehingga kunci
+# integer (posisi baris) memiliki urutan yang sama dengan urutan string aslinya
+def build_dimension(values, name):
+    unique_values = pd.Series(values, name=name).dropna().drop_duplicates().sort_values(ignore_index=True)
+    return unique_values.to_frame()
+
+
+# Fungsi untuk mengambil kunci integer dari kolom ID yang sudah dikodekan (-1 jika kosong)
+def id_keys(values):
+    return values.cat.codes.to_numpy().astype('int32')
+
+
+# Fungsi untuk membuat array lookup berukuran `size` yang berisi `values` pada posisi `keys`
+def values_by_key(keys, values, size, fill_value=np.nan):
+    lookup = np.full(size, fill_value, dtype=np.result_type(np.asarray(values).dtype, type(fill_value)))
+    lookup[np.asarray(keys)] = values
+    return lookup
+
+
+# Fungsi untuk mengambil nilai dari array lookup berdasarkan kunci (kunci -1 menghasilkan fill_value)
+def lookup_by_key(lookup, keys, fill_value=np.nan):
+    keys = np.asarray(keys)
+    return np.where(keys >= 0, lookup[np.maximum(keys, 0)], fill_value)
+
+
+# Fungsi untuk membuat array lookup koordinat centroid kode pos (lintang dan bujur) berdasarkan
+# kode kolom ID, dari tabel customers atau sellers (baris pertama untuk ID yang duplikat)
+def coordinates_by_key(table, id_column, zip_column, centroids):
+    table = table[table[id_column].notna()].drop_duplicates(id_column)
+    keys, size = id_keys(table[id_column]), len(table[id_column].cat.categories)
+    lat, lng = centroid_lookup(centroids, table[zip_column])
+    return values_by_key(keys, lat, size), values_by_key(keys, lng, size)
+
+
+# Dimensi pelanggan: kamus customer_id (kunci = kode kategori) beserta lokasinya dan
+# customer_unique_id (satu pelanggan dapat memiliki customer_id berbeda di setiap pesanan)
+def build_dim_customers(dataset):
+    customers = dataset['customers'].drop_duplicates('customer_id')
+    categories = dataset.id_categories('customer_id')
+    dim_customers = pd.DataFrame({'customer_id': categories})
+    for col in ['customer_state', 'customer_unique_id']:
+        dim_customers[col] = pd.Categorical.from_codes(
+            values_by_key(id_keys(customers['customer_id']), customers[col].cat.codes, len(categories), -1),
+            dtype=customers[col].dtype)
+    return dim_customers
+
+
+# Dimensi penjual: kamus seller_id (kunci = kode kategori) beserta lokasinya
+def build_dim_sellers(dataset):
+    sellers = dataset['sellers'].drop_duplicates('seller_id')
+    categories = dataset.id_categories('seller_id')
+    dim_sellers = pd.DataFrame({'seller_id': categories})
+    for col in ['seller_state', 'seller_city']:
+        dim_sellers[col] = pd.Categorical.from_codes(
+            values_by_key(id_keys(sellers['seller_id']), sellers[col].cat.codes, len(categories), -1),
+            dtype=sellers[col].dtype)
+    return dim_sellers
+
+
+# Dimensi kategori produk (nama kategori dalam bahasa Inggris)
+def build_dim_categories(dataset):
+    return build_dimension(dataset['products_with_category']['product_category_name_english'], 'product_category_name_english')
+
+
+# Tabel fakta pada level item pesanan dengan kunci integer ke pesanan, pelanggan, penjual,
+# dan kategori, serta rating rata-rata ulasan pesanan dan jarak penjual ke pelanggan. Pesanan
+# tanpa item tetap memiliki satu baris (has_item = False) dan item tanpa pesanan tetap tercatat
+# (is_order_row = False), sehingga seluruh analisis dapat membaca dari tabel ini tanpa join ulang
+def build_fact_items(dataset):
+    orders = dataset['orders'][['order_id', 'customer_id', 'order_purchase_timestamp']]
+    order_items = dataset['order_items'][['order_id', 'seller_id', 'product_id', 'price', 'freight_value', 'total_price']]
+
+    # Kolom ID sudah berupa kategori dengan kamus yang sama, sehingga join dilakukan pada kode integer
+    fact = orders.merge(order_items, on='order_id', how='outer', indicator=True)
+
+    # Kunci integer untuk setiap dimensi
+    fact['order_key'] = id_keys(fact['order_id'])
+    fact['customer_key'] = id_keys(fact['customer_id'])
+    fact['seller_key'] = id_keys(fact['seller_id'])
+
+    products = dataset['products_with_category'].drop_duplicates('product_id')
+    category_keys = pd.Index(dataset['dim_categories']['product_category_name_english']).get_indexer(products['product_category_name_english'])
+    product_category_key = values_by_key(id_keys(products['product_id']), category_keys,
+                                         len(products['product_id'].cat.categories), -1)
+    fact['category_key'] = lookup_by_key(product_category_key, id_keys(fact['product_id']), -1).astype('int32')
+
+    # Rating rata-rata per pesanan dari seluruh ulasan pesanan tersebut
+    order_ratings = dataset['order_reviews'].groupby('order_id', observed=True)['review_score'].mean()
+    order_rating_lookup = values_by_key(order_ratings.index.codes, order_ratings.to_numpy(),
+                                        len(order_ratings.index.categories))
+    fact['order_rating'] = lookup_by_key(order_rating_lookup, fact['order_key'])
+
+    # Jarak penjual ke pelanggan (km) antara centroid prefix kode pos keduanya (lihat geo.py);
+    # NaN jika salah satu lokasi tidak diketahui
+    centroids = dataset['zip_centroids']
+    customer_lat, customer_lng = coordinates_by_key(dataset['customers'], 'customer_id', 'customer_zip_code_prefix', centroids)
+    seller_lat, seller_lng = coordinates_by_key(dataset['sellers'], 'seller_id', 'seller_zip_code_prefix', centroids)
+    fact['distance_km'] = haversine_km(lookup_by_key(seller_lat, fact['seller_key']), lookup_by_key(seller_lng, fact['seller_key']),
+                                       lookup_by_key(customer_lat, fact['customer_key']), lookup_by_key(customer_lng, fact['customer_key']))
+
+    # Penanda baris: item yang benar-benar ada, dan satu baris pertama per pesanan
+    fact['has_item'] = (fact['_merge'] != 'left_only').to_numpy()
+    fact['is_order_row'] = ((fact['_merge'] != 'right_only') & ~fact['order_key'].duplicated()).to_numpy()
+
+    # Diurutkan menurut waktu pembelian (item tanpa pesanan di akhir) sehingga filter rentang
+    # tanggal cukup berupa binary search dan slice (lihat filter_facts)
+    fact = fact.sort_values('order_purchase_timestamp', kind='stable', na_position='last', ignore_index=True)
+
+    return fact[['order_key', 'customer_key', 'seller_key', 'category_key', 'order_purchase_timestamp',
+                 'price', 'freight_value', 'total_price', 'order_rating', 'distance_km', 'has_item', 'is_order_row']]
+
+
+# Fungsi untuk mengambil nilai kolom dimensi berdasarkan kunci integer pada tabel fakta
+def dimension_values(dimension, column, keys):
+    return dimension[column].to_numpy()[np.asarray(keys)]
+
+
+# Fungsi untuk mencari rentang posisi [awal, akhir) pada kolom timestamp yang sudah terurut
+# dengan binary search; end_date bersifat inklusif (sampai akhir hari tersebut)
+def time_range(timestamps, start_date=None, end_date=None):
+    start = 0 if start_date is None else timestamps.searchsorted(pd.Timestamp(start_date), side='left')
+    end = len(timestamps) if end_date is None else timestamps.searchsorted(pd.Timestamp(end_date) + pd.Timedelta(days=1), side='left')
+    return int(start), int(end)
+
+
+# Fungsi untuk memfilter tabel fakta menurut rentang tanggal pembelian dan negara bagian pelanggan.
+# Rentang tanggal diambil sebagai slice (tanpa memindai seluruh tabel), lalu filter negara bagian
+# hanya diterapkan pada baris di dalam slice tersebut
+def filter_facts(fact, dim_customers, start_date=None, end_date=None, states=None):
+    if start_date is not None or end_date is not None:
+        start, end = time_range(fact['order_purchase_timestamp'], start_date, end_date)
+        fact = fact.iloc[start:end]
+
+    if states:
+        selected_customers = dim_customers['customer_state'].isin(states).to_numpy()
+        fact = fact[lookup_by_key(selected_customers, fact['customer_key'], False).astype(bool)]
+
+    return fact
@@ -0,0 +1,215 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingest import TABLE_SCHEMAS, TIMESTAMP_FORMAT
+
+# Ukuran dataset Olist asli; skala 1x menghasilkan jumlah baris yang sama
+BASE_SIZES = {'orders': 99441, 'products': 32951, 'sellers': 3095}
+
+# Jumlah kategori produk, kode pos unik, dan rentang waktu pembelian pada dataset asli
+N_CATEGORIES = 71
+N_ZIP_CODES = 19015
+PURCHASE_START = pd.Timestamp('2016-09-04')
+PURCHASE_DAYS = 773
+
+# Negara bagian pelanggan beserta proporsi pesanannya (mendekati dataset asli)
+STATE_WEIGHTS = {
+    'SP': 0.42, 'RJ': 0.13, 'MG': 0.117, 'RS': 0.055, 'PR': 0.051, 'SC': 0.037, 'BA': 0.034,
+    'DF': 0.022, 'ES': 0.02, 'GO': 0.02, 'PE': 0.017, 'CE': 0.013, 'PA': 0.01, 'MT': 0.009,
+    'MA': 0.008, 'MS': 0.007, 'PB': 0.005, 'PI': 0.005, 'RN': 0.005, 'AL': 0.004, 'SE': 0.003,
+    'TO': 0.003, 'RO': 0.003, 'AM': 0.0015, 'AC': 0.001, 'AP': 0.0007, 'RR': 0.0005
+}
+
+# Bobot relatif jam pembelian (0-23)
+HOUR_WEIGHTS = np.array([3, 2, 1, 1, 1, 1, 2, 4, 6, 8, 9, 9, 9, 9, 9, 9, 9, 8, 8, 8, 8, 8, 7, 5])
+
+# Status pesanan selain 'delivered' (sekitar 3% pesanan)
+OTHER_STATUSES = ['shipped', 'canceled', 'unavailable', 'invoiced', 'processing', 'created', 'approved']
+
+# Jumlah pesanan yang dibuat per potongan agar memori tetap terbatas pada skala besar
+CHUNK_ORDERS = 500_000
+
+
+# Fungsi untuk membuat ID heksadesimal 32 karakter (format UUID dataset asli)
+def random_ids(rng, n):
+    return np.frombuffer(rng.bytes(16 * n).hex().encode(), dtype='S32').astype(str)
+
+
+# Fungsi untuk memilih negara bagian secara acak sesuai proporsinya
+def random_states(rng, n):
+    weights = np.array(list(STATE_WEIGHTS.values()))
+    return np.array(list(STATE_WEIGHTS))[rng.choice(len(weights), n, p=weights / weights.sum())]
+
+
+# Fungsi untuk menulis satu tabel ke file CSV sesuai skemanya (append untuk potongan berikutnya)
+def write_table(df, name, out_dir, append=False):
+    path = os.path.join(out_dir, TABLE_SCHEMAS[name]['file'])
+    df.to_csv(path, index=False, mode='a' if append else 'w', header=not append, date_format=TIMESTAMP_FORMAT)
+
+
+# Fungsi untuk membuat tabel statis: kategori, produk, penjual, dan geolokasi per kode pos.
+# Geolokasi tidak diskalakan karena jumlah kode pos tidak bertambah dengan jumlah pesanan
+def generate_static_tables(rng, out_dir, scale):
+    categories = [f'categoria_{i:02d}' for i in range(N_CATEGORIES)]
+    # Satu kategori sengaja tidak punya terjemahan, seperti pada dataset asli
+    translation = pd.DataFrame({'product_category_name': categories[:-1],
+                                'product_category_name_english': [f'category_{i:02d}' for i in range(N_CATEGORIES - 1)]})
+    write_table(translation, 'category_name_translation', out_dir)
+
+    zip_codes = np.sort(rng.choice(np.arange(1000, 100000), N_ZIP_CODES, replace=False))
+    zip_states = random_states(rng, N_ZIP_CODES)
+    zip_cities = np.array([f'cidade_{z}' for z in zip_codes // 100])
+    rows_per_zip = rng.integers(1, 100, N_ZIP_CODES)
+    geo_zip = np.repeat(np.arange(N_ZIP_CODES), rows_per_zip)
+    write_table(pd.DataFrame({
+        'geolocation_zip_code_prefix': zip_codes[geo_zip],
+        'geolocation_lat': rng.uniform(-33.7, 5.3, N_ZIP_CODES)[geo_zip] + rng.normal(0, 0.02, len(geo_zip)),
+        'geolocation_lng': rng.uniform(-73.9, -34.8, N_ZIP_CODES)[geo_zip] + rng.normal(0, 0.02, len(geo_zip)),
+        'geolocation_city': zip_cities[geo_zip],
+        'geolocation_state': zip_states[geo_zip]
+    }), 'geolocation', out_dir)
+
+    n_products = max(int(BASE_SIZES['products'] * scale), 1)
+    # Sebagian kecil produk tidak memiliki kategori, seperti pada dataset asli
+    product_categories = np.array(categories, dtype=object)[rng.zipf(1.3, n_products) % N_CATEGORIES]
+    product_categories[rng.random(n_products) < 0.0185] = None
+    products = pd.DataFrame({
+        'product_id': random_ids(rng, n_products),
+        'product_category_name': product_categories,
+        'product_name_lenght': rng.integers(5, 76, n_products),
+        'product_description_lenght': rng.integers(4, 3992, n_products),
+        'product_photos_qty': rng.integers(1, 20, n_products),
+        'product_weight_g': rng.gamma(1.0, 2276, n_products).round(),
+        'product_length_cm': rng.integers(7, 105, n_products),
+        'product_height_cm': rng.integers(2, 105, n_products),
+        'product_width_cm': rng.integers(6, 118, n_products)
+    })
+    write_table(products, 'products', out_dir)
+
+    n_sellers = max(int(BASE_SIZES['sellers'] * scale), 1)
+    seller_zip = rng.integers(0, N_ZIP_CODES, n_sellers)
+    sellers = pd.DataFrame({
+        'seller_id': random_ids(rng, n_sellers),
+        'seller_zip_code_prefix': zip_codes[seller_zip],
+        'seller_city': zip_cities[seller_zip],
+        'seller_state': zip_states[seller_zip]
+    })
+    write_table(sellers, 'sellers', out_dir)
+
+    return (zip_codes, zip_cities, zip_states), products['product_id'].to_numpy(), sellers['seller_id'].to_numpy()
+
+
+# Fungsi untuk membuat satu potongan pesanan beserta pelanggan, item, pembayaran, dan ulasannya
+def generate_orders_chunk(rng, n_orders, zips, product_ids, seller_ids):
+    zip_codes, zip_cities, zip_states = zips
+
+    # Satu customer_id per pesanan; sekitar 3% pesanan berasal dari pelanggan unik yang berulang
+    order_ids = random_ids(rng, n_orders)
+    customer_ids = random_ids(rng, n_orders)
+    unique_ids = random_ids(rng, int(n_orders * 0.97) + 1)
+    customer_zip = rng.integers(0, len(zip_codes), n_orders)
+    customers = pd.DataFrame({
+        'customer_id': customer_ids,
+        'customer_unique_id': unique_ids[rng.integers(0, len(unique_ids), n_orders)],
+        'customer_zip_code_prefix': zip_codes[customer_zip],
+        'customer_city': zip_cities[customer_zip],
+        'customer_state': zip_states[customer_zip]
+    })
+
+    # Waktu pembelian dengan tren naik dan pola harian (lebih ramai pada siang hingga malam hari)
+    days = (PURCHASE_DAYS * np.sqrt(rng.random(n_orders))).astype('int64')
+    hours = rng.choice(24, n_orders, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    seconds = days * 86400 + hours * 3600 + rng.integers(0, 3600, n_orders)
+    purchase = PURCHASE_START + pd.to_timedelta(seconds, unit='s')
+
+    delivered = rng.random(n_orders) < 0.97
+    status = np.where(delivered, 'delivered', np.array(OTHER_STATUSES)[rng.integers(0, len(OTHER_STATUSES), n_orders)])
+    approved = purchase + pd.to_timedelta(rng.integers(600, 86400, n_orders), unit='s')
+    carrier = approved + pd.to_timedelta(rng.integers(3600, 5 * 86400, n_orders), unit='s')
+    delivered_at = carrier + pd.to_timedelta(rng.gamma(2.0, 4.5, n_orders) * 86400, unit='s').round('s')
+    estimated = (purchase + pd.to_timedelta(rng.integers(10, 40, n_orders), unit='D')).normalize()
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': customer_ids,
+        'order_status': status,
+        'order_purchase_timestamp': purchase,
+        'order_approved_at': approved,
+        'order_delivered_carrier_date': carrier,
+        'order_delivered_customer_date': pd.Series(delivered_at).where(delivered),
+        'order_estimated_delivery_date': estimated
+    })
+
+    # Sebagian besar pesanan berisi satu item
+    n_items = rng.choice([1, 2, 3, 4], n_orders, p=[0.9, 0.075, 0.018, 0.007])
+    item_orders = np.repeat(np.arange(n_orders), n_items)
+    order_items = pd.DataFrame({
+        'order_id': order_ids[item_orders],
+        'order_item_id': np.arange(len(item_orders)) - np.repeat(np.cumsum(n_items) - n_items, n_items) + 1,
+        'product_id': product_ids[rng.zipf(1.5, len(item_orders)) % len(product_ids)],
+        'seller_id': seller_ids[rng.zipf(1.3, len(item_orders)) % len(seller_ids)],
+        'shipping_limit_date': carrier[item_orders],
+        'price': rng.lognormal(4.4, 0.9, len(item_orders)).round(2),
+        'freight_value': rng.lognormal(2.8, 0.5, len(item_orders)).round(2)
+    })
+
+    order_payments = pd.DataFrame({
+        'order_id': order_ids,
+        'payment_sequential': 1,
+        'payment_type': rng.choice(['credit_card', 'boleto', 'voucher', 'debit_card'], n_orders, p=[0.74, 0.19, 0.055, 0.015]),
+        'payment_installments': rng.integers(1, 11, n_orders),
+        'payment_value': np.bincount(item_orders, order_items['price'] + order_items['freight_value'], n_orders).round(2)
+    })
+
+    # Hampir setiap pesanan memiliki satu ulasan; rating turun jika pengiriman lama
+    reviewed = rng.random(n_orders) < 0.99
+    late = (delivered_at - purchase).days.to_numpy() > 20
+    scores = rng.choice([1, 2, 3, 4, 5], n_orders, p=[0.11, 0.03, 0.08, 0.19, 0.59])
+    scores = np.where(late & (rng.random(n_orders) < 0.5), np.minimum(scores, 2), scores)
+    creation = pd.Series(delivered_at.normalize() + pd.Timedelta(days=1)).where(delivered, estimated)
+    order_reviews = pd.DataFrame({
+        'review_id': random_ids(rng, n_orders),
+        'order_id': order_ids,
+        'review_score': scores,
+        'review_comment_title': None,
+        'review_comment_message': None,
+        'review_creation_date': creation,
+        'review_answer_timestamp': creation + pd.to_timedelta(rng.integers(3600, 5 * 86400, n_orders), unit='s')
+    })[reviewed]
+
+    return {
+        'customers': customers,
+        'orders': orders,
+        'order_items': order_items,
+        'order_payments': order_payments,
+        'order_reviews': order_reviews
+    }
+
+
+# Fungsi untuk membuat dataset sintetis berbentuk dataset Olist pada skala tertentu
+# (1 = ukuran dataset asli) di direktori out_dir
+def generate_dataset(out_dir, scale=1, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    zips, product_ids, seller_ids = generate_static_tables(rng, out_dir, scale)
+
+    n_orders = max(int(BASE_SIZES['orders'] * scale), 1)
+    for start in range(0, n_orders, CHUNK_ORDERS):
+        chunk = generate_orders_chunk(rng, min(CHUNK_ORDERS, n_orders - start), zips, product_ids, seller_ids)
+        for name, df in chunk.items():
+            write_table(df, name, out_dir, append=start > 0)
+
+    return n_orders
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat dataset sintetis berbentuk dataset e-commerce Olist")
+    parser.add_argument('out_dir')
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    n_orders = generate_dataset(args.out_dir, args.scale, args.seed)
+    print(f"{n_orders:,} pesanan ditulis ke {args.out_dir}")
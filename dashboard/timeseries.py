@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Jumlah titik maksimum yang dikirim ke satu grafik deret waktu, berapa pun panjang riwayatnya
+MAX_CHART_POINTS = 1000
+
+# Granularitas agregat deret waktu beserta aturan resample pandas (minggu dimulai hari Senin)
+RESAMPLE_RULES = {
+    'Harian': None,
+    'Mingguan': 'W-MON',
+    'Bulanan': 'MS'
+}
+
+
+# Fungsi untuk membuat agregat jumlah pesanan per granularitas dari jumlah pesanan harian
+def resample_order_counts(daily_order_counts):
+    daily = daily_order_counts.set_index('purchase_date')['order_count']
+    resamples = {}
+    for name, rule in RESAMPLE_RULES.items():
+        if rule is None:
+            resamples[name] = daily_order_counts
+        else:
+            counts = daily.resample(rule, label='left', closed='left').sum()
+            resamples[name] = counts.rename_axis('purchase_date').reset_index(name='order_count')
+    return resamples
+
+
+# Fungsi untuk memilih titik dengan algoritma Largest-Triangle-Three-Buckets: titik pertama dan
+# terakhir selalu dipilih, lalu dari setiap bucket dipilih titik yang membentuk segitiga terbesar
+# dengan titik terpilih sebelumnya dan rata-rata bucket berikutnya. Mengembalikan posisi titik
+def lttb(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # n_out - 2 bucket untuk titik di antara titik pertama dan terakhir
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    selected = np.empty(n_out, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+# Fungsi untuk memilih titik minimum dan maksimum dari setiap bucket (menjaga puncak dan lembah).
+# Mengembalikan posisi titik terurut
+def minmax_buckets(y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype='float64')
+    # Setiap bucket menyumbang dua titik, ditambah titik pertama dan terakhir
+    n_buckets = max((n_out - 2) // 2, 1)
+    starts = np.linspace(0, n, n_buckets + 1).astype('int64')[:-1]
+    mins = np.array([start + np.argmin(bucket) for start, bucket in zip(starts, np.split(y, starts[1:]))])
+    maxs = np.array([start + np.argmax(bucket) for start, bucket in zip(starts, np.split(y, starts[1:]))])
+    return np.unique(np.concatenate([mins, maxs, [0, n - 1]]))
+
+
+# Fungsi untuk mengurangi jumlah titik deret waktu menjadi paling banyak max_points
+def downsample(df, x, y, max_points=MAX_CHART_POINTS, method='lttb'):
+    if len(df) <= max_points:
+        return df
+
+    if method == 'lttb':
+        positions = lttb(df[x].to_numpy().astype('int64'), df[y].to_numpy(), max_points)
+    else:
+        positions = minmax_buckets(df[y].to_numpy(), max_points)
+    return df.iloc[positions]
+
+
+# Fungsi untuk memilih agregat deret waktu untuk grafik: pada mode 'Otomatis' dipakai data harian
+# (di-downsample jika melebihi max_points), selain itu agregat granularitas yang dipilih
+def chart_series(resamples, granularity='Otomatis', max_points=MAX_CHART_POINTS, method='lttb'):
+    series = resamples['Harian' if granularity == 'Otomatis' else granularity]
+    return downsample(series, 'purchase_date', 'order_count', max_points, method), len(series)
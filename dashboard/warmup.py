@@ -0,0 +1,116 @@
+import concurrent.futures
+import threading
+import time
+
+# Jumlah worker default untuk menghitung fungsi analisis secara paralel
+WARMUP_WORKERS = 4
+
+
+# Fungsi untuk menjalankan satu tugas warm-up dan mengembalikan lama eksekusinya (detik)
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+# Penghangat cache di latar belakang. Setiap versi dataset baru dimuat oleh load(version), lalu
+# seluruh fungsi analisis halaman dijalankan secara paralel sehingga hasilnya sudah ada di cache
+# saat sesi membukanya. Dataset versi baru baru menjadi ready setelah seluruh tugasnya selesai;
+# sampai saat itu sesi tetap membaca dataset ready sebelumnya (stale-while-revalidate)
+class Warmup:
+    def __init__(self, load, workers=WARMUP_WORKERS):
+        self.load = load
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='warmup')
+        self._lock = threading.Lock()
+        self._tasks = []
+        self._submitted = 0
+        self._ready_seq = 0
+        self._failed_seq = 0
+        self.ready = None
+        self.pending_version = None
+        self.started_at = None
+        self.failed_version = None
+        self.error = None
+        self.task_seconds = {}
+        self.task_errors = {}
+
+    @property
+    def ready_version(self):
+        return self.ready.version if self.ready is not None else None
+
+    # Memulai warm-up untuk satu versi dataset; tanpa efek jika versi tersebut sudah ready, sedang
+    # diproses, atau gagal dimuat. tasks (fungsi yang menerima dataset) disimpan untuk warm-up
+    # berikutnya, termasuk yang dimulai oleh watch
+    def submit(self, version, tasks=None):
+        with self._lock:
+            if tasks is not None:
+                self._tasks = list(tasks)
+            if version is None or version in (self.ready_version, self.pending_version, self.failed_version):
+                return False
+            self._submitted += 1
+            seq = self._submitted
+            self.pending_version = version
+            self.started_at = time.time()
+            tasks = self._tasks
+
+        threading.Thread(target=self._run, args=(version, seq, tasks), name=f'warmup-{seq}', daemon=True).start()
+        return True
+
+    def _run(self, version, seq, tasks):
+        try:
+            dataset = self.load(version)
+        except Exception as e:
+            # Misalnya file sumber sedang ditulis; sesi tetap membaca dataset ready sebelumnya
+            with self._lock:
+                self._failed_seq = seq
+                self.failed_version, self.error = version, f'{type(e).__name__}: {e}'
+                if self.pending_version == version:
+                    self.pending_version = None
+            return
+
+        futures = {task.__name__: self._executor.submit(timed, task, dataset) for task in tasks}
+        task_seconds, task_errors = {}, {}
+        for name, future in futures.items():
+            try:
+                task_seconds[name] = future.result()
+            except Exception as e:
+                # Tugas yang gagal tidak menahan versi baru: sesi akan menjalankannya sendiri
+                # dan menampilkan error yang sama
+                task_errors[name] = f'{type(e).__name__}: {e}'
+
+        with self._lock:
+            # Warm-up versi lama yang selesai belakangan tidak menimpa versi yang lebih baru
+            if seq > self._ready_seq:
+                self._ready_seq = seq
+                self.ready = dataset
+                self.task_seconds, self.task_errors = task_seconds, task_errors
+                # Kegagalan memuat versi yang lebih lama sudah tidak relevan
+                if seq > self._failed_seq:
+                    self.failed_version = self.error = None
+            if self.pending_version == version:
+                self.pending_version = None
+
+    # Memeriksa versi sumber data secara berkala dan memulai warm-up begitu data baru masuk,
+    # tanpa menunggu ada sesi yang membuka dashboard
+    def watch(self, get_version, interval):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.submit(get_version())
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name='warmup-watch', daemon=True).start()
+
+    def status(self):
+        with self._lock:
+            return {
+                'ready_version': self.ready_version,
+                'pending_version': self.pending_version,
+                'started_at': self.started_at,
+                'failed_version': self.failed_version,
+                'error': self.error,
+                'task_seconds': dict(self.task_seconds),
+                'task_errors': dict(self.task_errors)
+            }
@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from benchmark import BENCHMARK_FUNCTIONS  # noqa: E402
+from sql_engine import duckdb  # noqa: E402
+
+ENGINES = ['pandas', pytest.param('duckdb', marks=pytest.mark.skipif(duckdb is None, reason="duckdb tidak terpasang"))]
+
+
+# Menjalankan benchmark.py dari CLI pada dataset sintetis kecil: setiap fungsi analysis harus
+# berjalan pada kedua mesin dan file hasil harus ditulis
+@pytest.mark.parametrize('engine', ENGINES)
+def test_benchmark_runs_end_to_end(tmp_path, engine):
+    output = tmp_path / 'results.json'
+    subprocess.run([sys.executable, os.path.join(DASHBOARD_DIR, 'benchmark.py'), '--scales', '0.05', '--repeat', '1',
+                    '--engine', engine, '--work-dir', str(tmp_path / 'work'), '--output', str(output)],
+                   check=True, cwd=tmp_path)
+
+    with open(output) as f:
+        report = json.load(f)
+    functions = {result['function'] for result in report['results']}
+    assert set(BENCHMARK_FUNCTIONS) <= functions
+    assert all(result['engine'] == engine for result in report['results'])
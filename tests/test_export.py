@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pandas as pd
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from export import PrecomputedResults, export_all  # noqa: E402
+from synthetic import generate_dataset  # noqa: E402
+
+
+# category_revenue ditulis sebagai file tersendiri berisi seluruh kategori terurut menurun menurut
+# pendapatan dan tercatat di manifest, tanpa mengubah hasil yang dibaca kembali oleh dashboard
+def test_export_writes_sorted_category_revenue(tmp_path):
+    data_dir, output_dir = str(tmp_path / 'data'), str(tmp_path / 'exports')
+    generate_dataset(data_dir, scale=0.01)
+    manifest = export_all(output_dir, data_dir, workers=1, functions=['product_category_analysis'])
+
+    view = manifest['views']['category_revenue']
+    assert view['source'] == 'product_category_analysis.category_rankings.total_price'
+    version_dir = os.path.join(output_dir, manifest['version'])
+    category_revenue = pd.read_parquet(os.path.join(version_dir, view['file']))
+
+    category_stats = PrecomputedResults(output_dir, manifest['version']).result('product_category_analysis')['category_stats']
+    assert len(category_revenue) == len(category_stats)
+    assert category_revenue['total_price'].is_monotonic_decreasing
+    assert set(category_revenue['product_category_name_english']) == set(category_stats['product_category_name_english'])
@@ -0,0 +1,59 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from analysis import rfm_analysis  # noqa: E402
+from datasets import Dataset  # noqa: E402
+from incremental import INCREMENTAL_TABLES, IncrementalAggregates  # noqa: E402
+from ingest import TABLE_SCHEMAS  # noqa: E402
+from synthetic import generate_dataset  # noqa: E402
+
+# Bagian baris setiap file yang sudah tersedia pada refresh pertama; item dan ulasan sengaja
+# mendahului pesanannya
+SPLIT_FRACTIONS = {'orders': 0.4, 'order_items': 0.7, 'order_reviews': 0.5}
+
+
+# Fungsi untuk menulis sebagian awal baris file CSV (header selalu ikut)
+def write_head(source, target, fraction):
+    with open(source, 'rb') as f:
+        lines = f.readlines()
+    with open(target, 'wb') as f:
+        f.writelines(lines[:1 + int((len(lines) - 1) * fraction)])
+
+
+# Refresh pada feed yang ditambahkan dalam dua tahap (item dan ulasan datang sebelum pesanannya)
+# harus menghasilkan agregat dan RFM yang sama dengan perhitungan ulang penuh
+def test_split_refresh_matches_full_recompute(tmp_path):
+    full_dir, split_dir = tmp_path / 'full', tmp_path / 'split'
+    generate_dataset(str(full_dir), scale=0.02)
+    shutil.copytree(full_dir, split_dir)
+    for name in INCREMENTAL_TABLES:
+        file = TABLE_SCHEMAS[name]['file']
+        write_head(full_dir / file, split_dir / file, SPLIT_FRACTIONS[name])
+
+    aggregates = IncrementalAggregates(str(split_dir))
+    aggregates.refresh()
+    assert len(aggregates.frames['pending_items'])
+    for name in INCREMENTAL_TABLES:
+        file = TABLE_SCHEMAS[name]['file']
+        shutil.copyfile(full_dir / file, split_dir / file)
+    aggregates.refresh()
+
+    reference = IncrementalAggregates(str(full_dir))
+    reference.refresh()
+    assert len(aggregates.frames['pending_items']) == 0
+    assert aggregates.totals == pytest.approx(reference.totals)
+    for name, frame in reference.frames.items():
+        pd.testing.assert_frame_equal(aggregates.frames[name].sort_index(), frame.sort_index(), check_dtype=False)
+
+    incremental = rfm_analysis(Dataset(str(split_dir)), aggregates=aggregates)
+    recomputed = rfm_analysis(Dataset(str(full_dir)))
+    pd.testing.assert_frame_equal(incremental['segment_counts'], recomputed['segment_counts'])
+    pd.testing.assert_frame_equal(incremental['rfm'].sort_values('customer_id', ignore_index=True),
+                                  recomputed['rfm'].sort_values('customer_id', ignore_index=True), check_dtype=False)
@@ -0,0 +1,53 @@
+import os
+import sys
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from ingest import TABLE_SCHEMAS, iter_csv_tail  # noqa: E402
+
+HEADER = b'review_id,order_id,review_score,review_comment_title,review_comment_message,review_creation_date,review_answer_timestamp\n'
+RECORDS = [b'r1,o1,4,,,2017-07-30 00:00:00,2017-07-31 06:00:00',
+           b'r2,o2,5,,"bagus\nsekali",2017-08-05 00:00:00,2017-08-06 06:00:00',
+           b'r3,o3,2,,,2018-06-20 00:00:00,2018-06-21 06:00:00']
+
+
+# Fungsi untuk menulis file order_reviews dan membaca record barunya sejak posisi byte `start`
+def read_tail(tmp_path, content, start=0, final=False):
+    with open(tmp_path / TABLE_SCHEMAS['order_reviews']['file'], 'wb') as f:
+        f.write(HEADER + content)
+    chunks = list(iter_csv_tail('order_reviews', start, str(tmp_path), chunk_bytes=16, final=final))
+    return [review_id for df, _ in chunks for review_id in df['review_id']], chunks[-1][1] if chunks else start
+
+
+# Pada file yang sudah selesai ditulis, record terakhir tanpa baris baru penutup ikut dibaca dan
+# offset berpindah ke akhir file sehingga record yang ditambahkan kemudian tidak dibaca dua kali
+def test_iter_csv_tail_reads_final_record_without_newline(tmp_path):
+    content = b'\n'.join(RECORDS)
+    review_ids, offset = read_tail(tmp_path, content, final=True)
+    assert review_ids == ['r1', 'r2', 'r3']
+    assert offset == len(HEADER) + len(content)
+
+    review_ids, offset = read_tail(tmp_path, content + b'\nr4,o4,3,,,2018-07-01 00:00:00,2018-07-02 06:00:00\n', offset)
+    assert review_ids == ['r4']
+
+
+# Baris tanpa tanda kutip yang belum diakhiri baris baru mungkin masih ditulis, sehingga baru dibaca
+# utuh setelah baris barunya ada
+def test_iter_csv_tail_waits_for_partly_written_row(tmp_path):
+    content = RECORDS[0] + b'\nr4,o4,3,,,2018-07-0'
+    review_ids, offset = read_tail(tmp_path, content)
+    assert review_ids == ['r1']
+    assert offset == len(HEADER) + len(RECORDS[0]) + 1
+
+    review_ids, _ = read_tail(tmp_path, content + b'1 00:00:00,2018-07-02 06:00:00\n', offset)
+    assert review_ids == ['r4']
+
+
+# Field yang dikutip dan belum ditutup berarti record masih ditulis, sehingga belum dibaca
+# meskipun file ditandai selesai
+def test_iter_csv_tail_waits_for_unterminated_quote(tmp_path):
+    content = RECORDS[0] + b'\n' + RECORDS[1][:RECORDS[1].index(b'\n')]
+    review_ids, offset = read_tail(tmp_path, content, final=True)
+    assert review_ids == ['r1']
+    assert offset == len(HEADER) + len(RECORDS[0]) + 1
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from analysis import rfm_analysis  # noqa: E402
+from datasets import Dataset  # noqa: E402
+from synthetic import generate_dataset  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('synthetic')
+    generate_dataset(str(data_dir), scale=0.02)
+    return Dataset(str(data_dir))
+
+
+# Fungsi untuk menghitung RFM dengan cara semula (merge orders dengan order_items, lambda per
+# pelanggan, dan pd.qcut) sebagai acuan
+def baseline_rfm(orders, order_items):
+    orders_with_items = orders.merge(order_items, on='order_id', how='left')
+    reference_date = orders['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
+
+    rfm = orders_with_items.groupby('customer_id').agg({
+        'order_purchase_timestamp': lambda x: (reference_date - x.max()).days,
+        'order_id': 'nunique',
+        'total_price': 'sum'
+    }).reset_index()
+    rfm.columns = ['customer_id', 'recency', 'frequency', 'monetary']
+
+    rfm['r_score'] = pd.qcut(rfm['recency'], 5, labels=[5, 4, 3, 2, 1]).astype(int)
+    rfm['f_score'] = pd.qcut(rfm['frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    rfm['m_score'] = pd.qcut(rfm['monetary'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    rfm['rfm_score'] = rfm['r_score'] + rfm['f_score'] + rfm['m_score']
+    rfm['customer_segment'] = pd.qcut(rfm['rfm_score'], 4, labels=['Bronze', 'Silver', 'Gold', 'Platinum'])
+    return rfm
+
+
+# RFM tervektorisasi harus sama dengan perhitungan semula untuk setiap pelanggan
+def test_rfm_matches_baseline(data):
+    orders = data['orders'][['order_id', 'customer_id', 'order_purchase_timestamp']].astype({'order_id': 'str', 'customer_id': 'str'})
+    order_items = data['order_items'][['order_id', 'total_price']].astype({'order_id': 'str'})
+    expected = baseline_rfm(orders, order_items).sort_values('customer_id', ignore_index=True)
+    actual = rfm_analysis(data)['rfm'].astype({'customer_id': 'str'}).sort_values('customer_id', ignore_index=True)
+
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False, check_categorical=False)
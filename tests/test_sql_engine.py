@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+from datasets import Dataset  # noqa: E402
+from sql_engine import SqlEngine, compare_engines, duckdb  # noqa: E402
+from synthetic import generate_dataset  # noqa: E402
+
+pytestmark = pytest.mark.skipif(duckdb is None, reason="duckdb tidak terpasang")
+
+# Kombinasi filter sidebar yang dibandingkan (tanpa filter, rentang tanggal, negara bagian, keduanya)
+FILTERS = [
+    {},
+    {'start_date': '2017-03-01', 'end_date': '2017-12-31'},
+    {'states': ('SP', 'RJ', 'MG')},
+    {'start_date': '2017-06-01', 'end_date': '2018-03-31', 'states': ('SP', 'PR')}
+]
+
+
+@pytest.fixture(scope='module')
+def data_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('synthetic')
+    generate_dataset(str(data_dir), scale=0.02)
+    return str(data_dir)
+
+
+# Setiap fungsi analysis harus menghasilkan frame yang sama pada mesin pandas dan DuckDB
+@pytest.mark.parametrize('filters', FILTERS, ids=['all', 'dates', 'states', 'dates_states'])
+def test_engines_return_identical_results(data_dir, filters):
+    assert compare_engines(Dataset(data_dir), SqlEngine(data_dir), filters) == []